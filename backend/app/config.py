@@ -32,6 +32,15 @@ if not MONGO_URL:
     raise RuntimeError("❌ MONGO_URL is missing in environment variables")
 
 
+# Read routing: routes marked @secondary_reads may be served by replica set
+# secondaries at most READ_MAX_STALENESS_SECONDS behind (MongoDB minimum:
+# 90). A user is pinned to the primary for READ_PIN_SECONDS after their own
+# writes so they always see them.
+READ_FROM_SECONDARIES = os.getenv("READ_FROM_SECONDARIES", "true").lower() == "true"
+READ_MAX_STALENESS_SECONDS = max(int(os.getenv("READ_MAX_STALENESS_SECONDS", 90)), 90)
+READ_PIN_SECONDS = int(os.getenv("READ_PIN_SECONDS", READ_MAX_STALENESS_SECONDS))
+
+
 # =========================
 # REDIS CONFIG
 # =========================
@@ -46,7 +55,215 @@ REDIS_ENABLED = os.getenv("REDIS_ENABLED", "true").lower() == "true"
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
 
+# =========================
+# ADMIN
+# =========================
+# Shared key for internal/admin endpoints (sent as X-Admin-Key).
+# Admin endpoints are disabled when this is not set.
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+
+# =========================
+# OTP
+# =========================
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", 600))
+# How long a verified phone may be saved to the profile
+OTP_VERIFIED_TTL_SECONDS = int(os.getenv("OTP_VERIFIED_TTL_SECONDS", 300))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+OTP_RESEND_COOLDOWN_SECONDS = int(os.getenv("OTP_RESEND_COOLDOWN_SECONDS", 60))
+OTP_MAX_SENDS = int(os.getenv("OTP_MAX_SENDS", 5))  # per phone per window
+OTP_SEND_WINDOW_SECONDS = int(os.getenv("OTP_SEND_WINDOW_SECONDS", 3600))
+
+
+# =========================
+# ADDRESSES
+# =========================
+# Address book size per user (embedded array on the user document)
+MAX_ADDRESSES = int(os.getenv("MAX_ADDRESSES", 10))
+
+
+# =========================
+# SERVICEABILITY
+# =========================
+# Delivery zones come from this JSON file (reloaded when it changes) or,
+# when unset, from the service_zones collection. No zones = deliver anywhere
+SERVICE_ZONES_FILE = os.getenv("SERVICE_ZONES_FILE", "")
+SERVICE_ZONES_REFRESH_SECONDS = int(os.getenv("SERVICE_ZONES_REFRESH_SECONDS", 30))
+# Zone cut-off times are local (IST by default)
+SERVICE_UTC_OFFSET_MINUTES = int(os.getenv("SERVICE_UTC_OFFSET_MINUTES", 330))
+SERVICE_CHECK_MAX_PINCODES = int(os.getenv("SERVICE_CHECK_MAX_PINCODES", 500))
+
+
+# =========================
+# ORDER ARCHIVE
+# =========================
+# DELIVERED / CANCELLED orders untouched for this long move to orders_archive
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", 90))
+ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", 1000))
+
+
+# =========================
+# SALES COUNTERS
+# =========================
+# Days of per-day counters kept in Redis (days use SERVICE_UTC_OFFSET_MINUTES)
+SALES_COUNTER_TTL_DAYS = int(os.getenv("SALES_COUNTER_TTL_DAYS", 35))
+
+
+# =========================
+# ANALYTICS SNAPSHOTS
+# =========================
+# Columnar order snapshots for admin reports (scripts/export_analytics.py)
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics")
+# Only orders unchanged for this long are exported (in-flight writes and
+# secondary lag settle first)
+ANALYTICS_EXPORT_LAG_SECONDS = int(os.getenv("ANALYTICS_EXPORT_LAG_SECONDS", 120))
+ANALYTICS_SEGMENT_ROWS = int(os.getenv("ANALYTICS_SEGMENT_ROWS", 500000))
+# More segments than this are merged into one after an export
+ANALYTICS_MAX_SEGMENTS = int(os.getenv("ANALYTICS_MAX_SEGMENTS", 24))
+
+
+# =========================
+# DELIVERY BATCHING
+# =========================
+# Promised delivery = order time + this; orders are batched per zone and
+# window of DELIVERY_WINDOW_MINUTES (local time) of the promised time
+DELIVERY_PROMISE_MINUTES = int(os.getenv("DELIVERY_PROMISE_MINUTES", 45))
+DELIVERY_WINDOW_MINUTES = int(os.getenv("DELIVERY_WINDOW_MINUTES", 30))
+# Rider capacity per batch
+DELIVERY_BATCH_MAX_ORDERS = int(os.getenv("DELIVERY_BATCH_MAX_ORDERS", 12))
+DELIVERY_BATCH_MAX_ITEMS = int(os.getenv("DELIVERY_BATCH_MAX_ITEMS", 40))
+# Incremental refreshes re-read orders updated this long before the last
+# one seen (clock skew between app servers)
+DELIVERY_REFRESH_OVERLAP_SECONDS = int(os.getenv("DELIVERY_REFRESH_OVERLAP_SECONDS", 10))
+
+
+# =========================
+# INVENTORY
+# =========================
+# Per-day stock lives in Redis for this long (days use SERVICE_UTC_OFFSET_MINUTES)
+INVENTORY_KEY_TTL_SECONDS = int(os.getenv("INVENTORY_KEY_TTL_SECONDS", 2 * 24 * 3600))
+
+
+# =========================
+# BOOTSTRAP
+# =========================
+# A /bootstrap section slower than this is returned as null with an error
+BOOTSTRAP_SECTION_TIMEOUT = float(os.getenv("BOOTSTRAP_SECTION_TIMEOUT", 2.0))
+
+
+# =========================
+# COUPONS
+# =========================
+# How often workers check whether the coupon rule table changed
+COUPON_REFRESH_SECONDS = int(os.getenv("COUPON_REFRESH_SECONDS", 30))
+
+
+# =========================
+# REVIEWS
+# =========================
+REVIEW_PAGE_SIZE = int(os.getenv("REVIEW_PAGE_SIZE", 20))
+REVIEW_SUMMARY_LATEST = int(os.getenv("REVIEW_SUMMARY_LATEST", 5))
+
+# Write-behind: POST /reviews appends to a Redis stream and a worker
+# batches the inserts into MongoDB
+REVIEW_WRITE_BEHIND = os.getenv("REVIEW_WRITE_BEHIND", "false").lower() == "true"
+REVIEW_STREAM_KEY = os.getenv("REVIEW_STREAM_KEY", "reviews:ingest")
+REVIEW_STREAM_GROUP = os.getenv("REVIEW_STREAM_GROUP", "review-writers")
+REVIEW_STREAM_MAXLEN = int(os.getenv("REVIEW_STREAM_MAXLEN", 100000))
+REVIEW_BATCH_SIZE = int(os.getenv("REVIEW_BATCH_SIZE", 200))
+# Keep below the Redis socket timeout (2s)
+REVIEW_BATCH_BLOCK_MS = int(os.getenv("REVIEW_BATCH_BLOCK_MS", 1000))
+# Messages unacknowledged this long are re-claimed from dead consumers
+REVIEW_CLAIM_IDLE_MS = int(os.getenv("REVIEW_CLAIM_IDLE_MS", 60000))
+
+
+# =========================
+# STATIC FILES / COMPRESSION
+# =========================
+STATIC_DIR = os.getenv("STATIC_DIR", "static")
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", 60 * 60 * 24))
+STATIC_SENDFILE_MIN_SIZE = int(os.getenv("STATIC_SENDFILE_MIN_SIZE", 256 * 1024))
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+
+# =========================
+# METRICS
+# =========================
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Per-request Server-Timing header (app / auth / mongo / redis breakdown)
+METRICS_SERVER_TIMING = os.getenv(
+    "METRICS_SERVER_TIMING", "true" if ENVIRONMENT != "production" else "false"
+).lower() == "true"
+
+
+# =========================
+# RATE LIMITING / LOAD SHEDDING
+# =========================
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# "<METHOD> <path>[*] <requests>/<seconds>s <ip|user>", separated by ";"
+# Token buckets: <requests> is the burst size, refilled evenly over <seconds>
+RATE_LIMIT_RULES = os.getenv(
+    "RATE_LIMIT_RULES",
+    "POST /auth/login 10/60s ip;"
+    "POST /auth/register 5/60s ip;"
+    "POST /user/send-otp 5/60s ip;"
+    "POST /user/verify-otp 20/60s ip;"
+    "POST /payment/checkout 10/60s user",
+)
+# In-flight requests per worker before new ones get 503 (0 = unlimited)
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 200))
+
+
+# =========================
+# SERVER (python -m app.server)
+# =========================
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", 8000))
+# Worker processes; defaults to one per core
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+# Import the app once in the supervisor and fork workers from it
+SERVER_PRELOAD = os.getenv("SERVER_PRELOAD", "true").lower() == "true"
+# Seconds to finish in-flight requests after SIGTERM before workers are killed
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+# Seconds between SIGTERM and the shutdown, while readiness already reports
+# draining so the load balancer takes the worker out of rotation (match the
+# readiness probe's period x failure threshold)
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS", 5))
+
+
+# =========================
+# HEALTH / WARM-UP
+# =========================
+# Probe results are reused for this long so probes never hammer Mongo/Redis
+HEALTH_CHECK_TTL = float(os.getenv("HEALTH_CHECK_TTL", 2.0))
+# Connections opened per pool before the worker reports ready
+WARMUP_POOL_CONNECTIONS = int(os.getenv("WARMUP_POOL_CONNECTIONS", 4))
+
+
+# =========================
+# PROFILING
+# =========================
+# Off by default: when disabled the profiling middleware is not installed
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+# Random sampling of matching requests (0 = only signed X-Profile requests)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+PROFILE_SAMPLE_PATHS = [
+    path.strip() for path in os.getenv("PROFILE_SAMPLE_PATHS", "").split(",") if path.strip()
+]
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+PROFILE_TTL_SECONDS = int(os.getenv("PROFILE_TTL_SECONDS", 60 * 60 * 24))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+
 # =========================
 # DEBUG LOGGING
 # =========================
 DEBUG = ENVIRONMENT != "production"
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text" if DEBUG else "json")  # text | json
+# Fraction of DEBUG / INFO records kept (cache hits etc. are very chatty)
+LOG_SAMPLE_DEBUG = float(os.getenv("LOG_SAMPLE_DEBUG", 1.0 if DEBUG else 0.01))
+LOG_SAMPLE_INFO = float(os.getenv("LOG_SAMPLE_INFO", 1.0))
@@ -1,22 +1,155 @@
+import threading
+
 from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
 
 
 
-from app.config import MONGO_URL, MONGO_DB_NAME
+from app.config import MONGO_URL, MONGO_DB_NAME, METRICS_ENABLED
+from app.utils.logger import get_logger
+from app.utils.metrics import MongoCommandListener
+from app.utils.read_routing import current_read_preference
+
+logger = get_logger(__name__)
+
+# One client per process: MongoClient is not fork-safe, so it is created on
+# first use (never at import) and discarded in forked children
+_client = None
+_client_lock = threading.Lock()
+# (collection, mode, max staleness) -> Collection handle with that read preference
+_routed = {}
+
+
+def get_client() -> MongoClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MongoClient(
+                    MONGO_URL,
+                    serverSelectionTimeoutMS=5000,
+                    event_listeners=[MongoCommandListener()] if METRICS_ENABLED else [],
+                )
+    return _client
+
+
+def get_db():
+    return get_client()[MONGO_DB_NAME]
+
+
+def _reset_after_fork():
+    # The parent's sockets and monitor threads are unusable here
+    global _client, _client_lock, _routed
+    _client = None
+    _client_lock = threading.Lock()
+    _routed = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _collection(name: str):
+    collection = get_db()[name]
+    preference = current_read_preference()
+    if preference is None:
+        return collection
+    key = (name, preference.mongos_mode, preference.max_staleness)
+    routed = _routed.get(key)
+    if routed is None:
+        routed = _routed[key] = collection.with_options(read_preference=preference)
+    return routed
+
+
+class CollectionProxy:
+    """
+    Module-level collection handle that always uses this process's client,
+    with the read preference of the running route (see utils/read_routing)
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attr):
+        return getattr(_collection(self.name), attr)
+
+    def __repr__(self):
+        return f"CollectionProxy({self.name!r})"
+
+
+class DatabaseProxy:
+    """`db.addresses` / `db["addresses"]` without binding to a client at import"""
+
+    def __getattr__(self, name: str) -> CollectionProxy:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return CollectionProxy(name)
+
+    def __getitem__(self, name: str) -> CollectionProxy:
+        return CollectionProxy(name)
+
+
+def check_connection():
+    """Fail startup early if MongoDB is unreachable"""
+    try:
+        get_client().admin.command("ping")
+        logger.info("mongodb_connected")
+    except Exception as e:
+        raise RuntimeError(f"MongoDB connection failed: {e}")
+
+
+db = DatabaseProxy()
+
+users_col = CollectionProxy("users")
+menu_col = CollectionProxy("menu")
+orders_col = CollectionProxy("orders")
+orders_archive_col = CollectionProxy("orders_archive")
+reviews_col = CollectionProxy("reviews")
+coupons_col = CollectionProxy("coupons")
+coupon_uses_col = CollectionProxy("coupon_uses")
+review_summaries_col = CollectionProxy("review_summaries")
+service_zones_col = CollectionProxy("service_zones")
+inventory_col = CollectionProxy("inventory")
+
 
-client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
-db = client[MONGO_DB_NAME]
+def _ensure_archive_collection():
+    """Create orders_archive with zstd block compression (cold, write-once data)"""
+    database = get_db()
+    if "orders_archive" in database.list_collection_names():
+        return
+    try:
+        database.create_collection(
+            "orders_archive",
+            storageEngine={"wiredTiger": {"configString": "block_compressor=zstd"}},
+        )
+    except Exception as e:
+        # Another worker won the race, or the server has no zstd: default is fine
+        logger.warning("orders_archive create: %s", e)
 
 
-try:
-    client.admin.command("ping")
-    print("✓ MongoDB connected")
-except Exception as e:
-    raise RuntimeError(f"MongoDB connection failed: {e}")
+def ensure_indexes():
+    """Create the indexes hot queries rely on (idempotent, run at startup)"""
+    # Order history per user, lookups by id, and the archival scan
+    orders_col.create_index([("user_email", 1), ("created_at", 1)])
+    orders_col.create_index("order_id")
+    orders_col.create_index([("status", 1), ("updated_at", 1)])
+    # Incremental analytics export (watermark scan)
+    orders_col.create_index([("updated_at", 1), ("_id", 1)])
+    # Inventory reconciliation: stock taken per day
+    orders_col.create_index("inventory_day", sparse=True)
+    _ensure_archive_collection()
+    orders_archive_col.create_index([("user_email", 1), ("created_at", 1)])
+    orders_archive_col.create_index("order_id")
 
-users_col = db["users"]
-menu_col = db["menu"]
-orders_col = db["orders"]
-reviews_col = db["reviews"]
+    # Keyset pagination: newest first per item / per user
+    reviews_col.create_index([("item_id", 1), ("_id", -1)])
+    reviews_col.create_index([("user_email", 1), ("_id", -1)])
+    reviews_col.create_index("review_id", unique=True, sparse=True)
+    review_summaries_col.create_index("item_id", unique=True)
+    coupons_col.create_index("code", unique=True)
+    coupon_uses_col.create_index([("code", 1), ("email", 1)], unique=True)
+    service_zones_col.create_index("zone_id", unique=True)
+    inventory_col.create_index([("day", 1), ("item_id", 1)], unique=True)
@@ -1,32 +1,73 @@
-from fastapi import Depends, HTTPException
+import hmac
+
+from fastapi import Depends, HTTPException, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.utils.jwt import verify_token
 from app.database import users_col
-from app.utils.redis_client import get_redis
+from app.utils.request_redis import prefetch_for_request
+from app.utils.read_routing import endpoint_preference, note_user, read_pin_key, use_preference
+from app.config import ADMIN_API_KEY
+from app.utils.metrics import timed
+from app.utils.profiler import mark_thread
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Only what the principal exposes; never the password hash
+PRINCIPAL_FIELDS = {"_id": 0, "email": 1, "phone": 1, "addresses": 1, "defaultAddressId": 1}
 
 
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
-    token = credentials.credentials
+    mark_thread()
+    with timed("auth"):
+        token = credentials.credentials
 
-    redis_client = get_redis()
-    if redis_client and redis_client.get(f"blacklist:{token}"):
-        raise HTTPException(status_code=401, detail="Token has been revoked")
+        payload = verify_token(token)
+        if not payload or "email" not in payload:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    payload = verify_token(token)
-    if not payload or "email" not in payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+        # One MGET: blacklist entry + primary pin + the cache keys the route declared
+        email = payload["email"]
+        if prefetch_for_request(request, token, email, (read_pin_key(email),)):
+            raise HTTPException(status_code=401, detail="Token has been revoked")
+        note_user(request.method, email)
 
-    user = users_col.find_one({"email": payload["email"]})
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+        # Same read routing as the route itself
+        with use_preference(endpoint_preference(request.scope.get("endpoint"))):
+            user = users_col.find_one({"email": email}, PRINCIPAL_FIELDS)
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
 
     # Return only non-sensitive fields that downstream routes need
     return {
         "email": user.get("email"),
         "phone": user.get("phone"),
+        # Address book rides along: /addresses needs no second query
+        "addresses": user.get("addresses", []),
+        "defaultAddressId": user.get("defaultAddressId"),
     }
+
+
+def get_optional_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(optional_security)
+):
+    """The signed-in user, or None for anonymous requests (a bad token is still 401)"""
+    if credentials is None:
+        return None
+    return get_current_user(request, credentials)
+
+
+def require_admin(x_admin_key: str = Header(None)):
+    """Guard for internal/admin endpoints (X-Admin-Key header)"""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return True
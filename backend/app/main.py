@@ -1,6 +1,7 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from app.routes import (
     auth_routes,
@@ -10,12 +11,76 @@ from app.routes import (
     payment_routes,
     review_routes,
     address_routes,
-    coupon_routes
+    coupon_routes,
+    serviceability_routes,
+    bootstrap_routes,
+    admin_routes,
+    health_routes
+)
+from app.config import (
+    FRONTEND_URL,
+    STATIC_DIR,
+    REVIEW_WRITE_BEHIND,
+    METRICS_ENABLED,
+    PROFILING_ENABLED,
+    RATE_LIMIT_ENABLED,
 )
-from app.config import FRONTEND_URL
+from app.database import check_connection, ensure_indexes
 from app.utils.redis_client import get_redis
+from app.utils.compression import CompressionMiddleware
+from app.utils.static_files import PrecompressedStaticFiles
+from app.utils.responses import FastJSONResponse
+from app.utils.logger import get_logger, shutdown_logging, RequestContextMiddleware
+from app.utils.metrics import MetricsMiddleware, metrics_endpoint
+from app.utils.profiler import ProfilerMiddleware
+from app.utils.rate_limit import RateLimitMiddleware
+from app.utils.request_redis import RedisBatchMiddleware
+from app.utils import health
+from app.services import review_ingest
+
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: indexes, Redis, warm-up (pools, menu cache, coupon rules),
+    then report ready. Shutdown: stop reporting ready (app.server already
+    did when the signal arrived), drain the review worker and flush logs.
+    """
+    check_connection()
+    ensure_indexes()
+
+    redis_client = get_redis()
+    if redis_client:
+        logger.info("REDIS CACHE ENABLED")
+    else:
+        logger.warning("REDIS CACHE DISABLED")
+
+    health.warm_up()
+
+    if REVIEW_WRITE_BEHIND and redis_client:
+        review_ingest.start_worker()
+
+    health.set_state(health.READY)
+    try:
+        yield
+    finally:
+        if health.get_state() != health.DRAINING:
+            health.set_state(health.DRAINING)
+        review_ingest.stop_worker()
+        shutdown_logging()
 
-app = FastAPI(title="SB Tiffin Backend")
+
+app = FastAPI(
+    title="SB Tiffin Backend",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
+
+# ✅ Rate limits + load shedding (innermost, so 429/503 still get CORS headers)
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
 
 # ✅ CORS FIX (REQUIRED)
 app.add_middleware(
@@ -28,6 +93,24 @@ app.add_middleware(
     allow_headers=["*"],        # Content-Type, Authorization
 )
 
+# ✅ One MGET for auth + cache reads, one pipeline for cache writes per request
+app.add_middleware(RedisBatchMiddleware)
+
+# ✅ Brotli/gzip for API responses (precompressed static files pass through)
+app.add_middleware(CompressionMiddleware)
+
+# ✅ Route name on every log record emitted while handling a request
+app.add_middleware(RequestContextMiddleware)
+
+# ✅ Per-route latency + Mongo/Redis attribution (Prometheus at /metrics)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# ✅ Sampling profiler for requests with a signed X-Profile header
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
 app.include_router(auth_routes.router)
 app.include_router(user_routes.router)
 app.include_router(menu_routes.router)
@@ -36,28 +119,18 @@ app.include_router(payment_routes.router)
 app.include_router(review_routes.router)
 app.include_router(address_routes.router)
 app.include_router(coupon_routes.router)
+app.include_router(serviceability_routes.router)
+app.include_router(bootstrap_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(health_routes.router)
 
-# ✅ Serve static files
+# ✅ Serve static files (precompressed variants + cache headers)
 app.mount(
     "/static",
-    StaticFiles(directory="static"),
+    PrecompressedStaticFiles(directory=STATIC_DIR),
     name="static"
 )
 
-# ✅ Startup event to check Redis connection
-@app.on_event("startup")
-def startup_event():
-    """Initialize Redis connection on startup"""
-    redis_client = get_redis()
-    if redis_client:
-        print("\n" + "="*50)
-        print("✅ REDIS CACHE ENABLED")
-        print("="*50 + "\n")
-    else:
-        print("\n" + "="*50)
-        print("⚠️  REDIS CACHE DISABLED")
-        print("="*50 + "\n")
-
 @app.get("/")
 def root():
     return {"status": "Backend running successfully"}
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
+from datetime import datetime
+
+
+class CouponValidate(BaseModel):
+    coupon_code: str
+    order_amount: float
+
+
+class CartLine(BaseModel):
+    price: float = Field(..., ge=0)
+    quantity: int = Field(..., gt=0)
+
+
+class BestCouponRequest(BaseModel):
+    # Either the cart subtotal or the cart lines to sum
+    order_amount: Optional[float] = Field(None, ge=0)
+    items: Optional[List[CartLine]] = None
+
+
+class CouponUpsert(BaseModel):
+    code: str = Field(..., min_length=3, max_length=32)
+    description: str = ""
+    discount_type: Literal["percentage", "flat"]
+    discount_value: float = Field(..., gt=0)
+    min_order: float = Field(0, ge=0)
+    max_discount: Optional[float] = Field(None, gt=0)
+    active: bool = True
+    max_uses: int = Field(0, ge=0)  # 0 = unlimited
+    per_user_limit: int = Field(0, ge=0)  # 0 = unlimited
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+from datetime import date
+
+
+class StockUpdate(BaseModel):
+    day: Optional[date] = None  # default: today (local)
+    # item id -> portions; null stops tracking the item (unlimited)
+    stock: Dict[str, Optional[int]] = Field(..., min_length=1)
@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
+from typing import Optional
 
 
 class ReviewCreate(BaseModel):
     rating: int = Field(..., ge=1, le=5)
-    comment: str = Field(..., min_length=3)
+    comment: str = Field(..., min_length=3, max_length=1000)
+    item_id: Optional[str] = Field(None, max_length=64)  # menu item (e.g. MENU-1a2b3c)
+    order_id: Optional[str] = Field(None, max_length=32)
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Tuple
+
+from app.config import SERVICE_CHECK_MAX_PINCODES
+
+
+class PincodeCheck(BaseModel):
+    pincodes: List[str] = Field(..., min_length=1, max_length=SERVICE_CHECK_MAX_PINCODES)
+
+
+class ZoneUpsert(BaseModel):
+    zone_id: str = Field(..., min_length=1, max_length=64)
+    name: str = ""
+    pincodes: List[str] = []
+    ranges: List[Tuple[str, str]] = []  # inclusive [first, last] pincode
+    delivery_fee: float = Field(0, ge=0)
+    free_delivery_above: Optional[float] = Field(None, ge=0)
+    cutoff: Optional[str] = Field(None, pattern=r"^([01]\d|2[0-3]):[0-5]\d$")  # "HH:MM" local
+    active: bool = True
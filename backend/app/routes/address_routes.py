@@ -1,107 +1,130 @@
 from fastapi import APIRouter, Depends, HTTPException
-from app.database import db
-from app.dependencies import get_current_user
-from app.models.address_model import AddressCreate
 from bson import ObjectId
-from app.utils.cache import get_cache, set_cache, invalidate_cache
+
+from app.config import MAX_ADDRESSES
+from app.database import users_col
+from app.dependencies import get_current_user
+from app.utils.read_routing import secondary_reads
+from app.services.serviceability import require_serviceable
 
 router = APIRouter(prefix="/addresses", tags=["Addresses"])
-collection = db.addresses
+
+# Addresses are embedded in the user document (bounded array + a
+# `defaultAddressId` pointer), so reads come straight from the principal
+# loaded by get_current_user and every write is one atomic update_one.
+# Old `addresses` collection rows: scripts/migrate_addresses.py
+
+ADDRESS_FIELDS = ("label", "addressLine", "city", "state", "pincode")
+
+
+def _is_default(data: dict) -> bool:
+    # Normalize isDefault field (handle both isDefault and is_default)
+    return bool(data.get("isDefault", data.get("is_default", False)))
+
+
+def present(address: dict, user: dict) -> dict:
+    """API shape of one embedded address (same fields as the old collection rows)"""
+    return {
+        **address,
+        "user_email": user["email"],
+        "isDefault": address["id"] == user.get("defaultAddressId"),
+    }
+
+
+def _update_address_book(user: dict, address_id: str, update: dict, unset_default: dict):
+    """
+    Apply `update` to the address `address_id`. If it is the default as of
+    the principal lookup, also clear the pointer (`unset_default`), guarded
+    on the pointer still being ours; if someone moved it meanwhile there is
+    nothing to clear and the plain update is applied.
+    """
+    query = {"email": user["email"], "addresses.id": address_id}
+    if user.get("defaultAddressId") == address_id and unset_default:
+        res = users_col.update_one(
+            {**query, "defaultAddressId": address_id},
+            {**update, "$set": {**update.get("$set", {}), **unset_default}},
+        )
+        if res.matched_count:
+            return res
+    return users_col.update_one(query, update)
 
 
 @router.get("/")
+@secondary_reads()
 async def get_addresses(user=Depends(get_current_user)):
-    cache_key = f"addresses:list:{user['email']}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-    
-    addresses = list(collection.find({"user_email": user["email"]}, {"_id": 0}))
-    # Sort addresses: default first, then by label
-    addresses.sort(key=lambda x: (not x.get('isDefault', False), x.get('label', '')))
-    set_cache(cache_key, addresses, expire_time=600)
-    return addresses
+    addresses = [present(address, user) for address in user["addresses"]]
+    # Default first, the rest in the order they were added
+    default = next((a for a in addresses if a["isDefault"]), None)
+    if default is None:
+        return addresses
+    return [default] + [a for a in addresses if a is not default]
+
+
+def find_default(user: dict):
+    default_id = user.get("defaultAddressId")
+    for address in user["addresses"]:
+        if address["id"] == default_id:
+            return present(address, user)
+    return None
 
 
 @router.get("/default")
+@secondary_reads()
 async def get_default_address(user=Depends(get_current_user)):
-    cache_key = f"addresses:default:{user['email']}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-    
-    address = collection.find_one(
-        {"user_email": user["email"], "isDefault": True},
-        {"_id": 0}
-    )
-    
-    if not address:
+    address = find_default(user)
+    if address is None:
         raise HTTPException(status_code=404, detail="No default address found")
-    
-    set_cache(cache_key, address, expire_time=600)
     return address
 
 
 @router.post("/")
 async def add_address(data: dict, user=Depends(get_current_user)):
-    # Normalize isDefault field (handle both isDefault and is_default)
-    is_default = data.get("isDefault", data.get("is_default", False))
-    
-    # If this address is being set as default, remove default from all other addresses
-    if is_default:
-        collection.update_many(
-            {"user_email": user["email"]},
-            {"$set": {"isDefault": False}}
-        )
+    # 📍 Only pincodes we deliver to (in-memory lookup, no query)
+    require_serviceable(data.get("pincode", ""))
 
     address = {
         "id": str(ObjectId()),
-        "user_email": user["email"],
         "label": data.get("label", "Home"),
         "addressLine": data.get("addressLine", ""),
         "city": data.get("city", ""),
         "state": data.get("state", ""),
         "pincode": data.get("pincode", ""),
-        "isDefault": is_default,
     }
 
-    result = collection.insert_one(address)
-    address["_id"] = str(result.inserted_id)
-    
-    # Invalidate cache
-    invalidate_cache(f"addresses:list:{user['email']}", f"addresses:default:{user['email']}")
-    
-    return address
+    update = {"$push": {"addresses": address}}
+    if _is_default(data):
+        update["$set"] = {"defaultAddressId": address["id"]}
+
+    # Push and default switch in one write; the size check is part of the filter
+    res = users_col.update_one(
+        {"email": user["email"], f"addresses.{MAX_ADDRESSES - 1}": {"$exists": False}},
+        update,
+    )
+    if res.matched_count == 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"You can save up to {MAX_ADDRESSES} addresses"
+        )
+
+    if _is_default(data):
+        user = {**user, "defaultAddressId": address["id"]}
+    return present(address, user)
 
 
 @router.put("/{address_id}")
 async def update_address(address_id: str, data: dict, user=Depends(get_current_user)):
-    # Normalize isDefault field
-    is_default = data.get("isDefault", data.get("is_default", False))
-    
-    # If this address is being set as default, remove default from all other addresses first
-    if is_default:
-        collection.update_many(
-            {"user_email": user["email"], "id": {"$ne": address_id}},
-            {"$set": {"isDefault": False}}
-        )
+    require_serviceable(data.get("pincode"))
 
-    update_data = {
-        "label": data.get("label"),
-        "addressLine": data.get("addressLine"),
-        "city": data.get("city"),
-        "state": data.get("state"),
-        "pincode": data.get("pincode"),
-        "isDefault": is_default,
-    }
+    update_data = {f"addresses.$.{field}": data.get(field) for field in ADDRESS_FIELDS}
+    if _is_default(data):
+        update_data["defaultAddressId"] = address_id
 
-    res = collection.update_one(
-        {"id": address_id, "user_email": user["email"]},
-        {"$set": update_data}
+    res = _update_address_book(
+        user, address_id,
+        {"$set": update_data},
+        # Saved without the default flag: it stops being the default
+        unset_default={} if _is_default(data) else {"defaultAddressId": None},
     )
-    
-    # Invalidate cache
-    invalidate_cache(f"addresses:list:{user['email']}", f"addresses:default:{user['email']}")
 
     if res.matched_count == 0:
         raise HTTPException(status_code=404, detail="Address not found")
@@ -111,14 +134,13 @@ async def update_address(address_id: str, data: dict, user=Depends(get_current_u
 
 @router.delete("/{address_id}")
 async def delete_address(address_id: str, user=Depends(get_current_user)):
-    result = collection.delete_one(
-        {"id": address_id, "user_email": user["email"]}
+    res = _update_address_book(
+        user, address_id,
+        {"$pull": {"addresses": {"id": address_id}}},
+        unset_default={"defaultAddressId": None},
     )
-    
-    # Invalidate cache
-    invalidate_cache(f"addresses:list:{user['email']}", f"addresses:default:{user['email']}")
-    
-    if result.deleted_count == 0:
+
+    if res.matched_count == 0:
         raise HTTPException(status_code=404, detail="Address not found")
-    
+
     return {"success": True, "message": "Address deleted"}
@@ -0,0 +1,118 @@
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import SALES_COUNTER_TTL_DAYS
+from app.dependencies import require_admin
+from app.utils.profiler import list_profiles, load_profile
+from app.services.sales_counters import day_summary, range_summary
+from app.models.inventory_model import StockUpdate
+from app.services.delivery_batching import current_plan
+from app.services.inventory import reconcile, set_stock, stock_report, today
+from app.services.order_analytics import REPORTS, get_snapshot, run_report, snapshot_info
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/profiles")
+def get_profiles(limit: int = Query(50, ge=1, le=200)):
+    """Recently captured request profiles (newest first)"""
+    return {"profiles": list_profiles(limit)}
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """Profile summary: top functions and collapsed stacks"""
+    profile = load_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+def get_profile_collapsed(profile_id: str):
+    """Collapsed stacks for flamegraph.pl / speedscope"""
+    profile = load_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile["collapsed"]
+
+
+@router.get("/sales")
+def get_sales(day: Optional[date] = None, top: int = Query(10, ge=1, le=100)):
+    """One day's sales counters (default: today): totals, top items, hourly"""
+    summary = day_summary(day.isoformat() if day else None, top)
+    if summary is None:
+        raise HTTPException(status_code=503, detail="Sales counters unavailable")
+    return summary
+
+
+@router.get("/sales/range")
+def get_sales_range(days: int = Query(7, ge=1, le=SALES_COUNTER_TTL_DAYS)):
+    """Daily orders and revenue for the last `days` days"""
+    summary = range_summary(days)
+    if summary is None:
+        raise HTTPException(status_code=503, detail="Sales counters unavailable")
+    return summary
+
+
+@router.get("/reports")
+def get_reports():
+    """Available reports and the freshness of the analytics snapshot"""
+    snapshot = get_snapshot()
+    return {"reports": sorted(REPORTS), "snapshot": snapshot_info(snapshot) if snapshot else None}
+
+
+@router.get("/reports/{name}")
+def get_report(
+    name: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    include_cancelled: bool = False,
+    top: int = Query(20, ge=1, le=500),
+):
+    """Grouped aggregates over the columnar order snapshot (no Mongo queries)"""
+    if name not in REPORTS:
+        raise HTTPException(status_code=404, detail="Unknown report")
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    report = run_report(name, start, end, include_cancelled, top)
+    if report is None:
+        raise HTTPException(status_code=503, detail="No analytics snapshot yet; run scripts/export_analytics.py")
+    return report
+
+
+@router.get("/deliveries")
+def get_delivery_plan(zone: Optional[str] = None, window: Optional[datetime] = None):
+    """Rider batches for the open orders, with ordered stops (window = window_start)"""
+    return current_plan(zone, window)
+
+
+@router.get("/inventory")
+def get_inventory(day: Optional[date] = None):
+    """Stock, live remaining and last reconciled sales per tracked item"""
+    day = day.isoformat() if day else today()
+    return {"day": day, "items": stock_report(day)}
+
+
+@router.put("/inventory")
+def put_inventory(data: StockUpdate):
+    """Set the day's portions per item (null = stop tracking the item)"""
+    if any(portions is not None and portions < 0 for portions in data.stock.values()):
+        raise HTTPException(status_code=400, detail="Stock cannot be negative")
+    day = data.day.isoformat() if data.day else today()
+    set_stock(day, data.stock)
+    return {"day": day, "items": stock_report(day)}
+
+
+@router.post("/inventory/reconcile")
+def post_inventory_reconcile(day: Optional[date] = None):
+    """Recount sold portions from the orders and repair the live counts"""
+    day = day.isoformat() if day else today()
+    return {"day": day, "items": reconcile(day)}
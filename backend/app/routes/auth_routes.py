@@ -6,8 +6,10 @@ from app.utils.password import hash_password, verify_password
 from app.utils.jwt import create_token, verify_token
 from app.models.user_model import UserRegister, UserLogin
 from app.utils.redis_client import get_redis
+from app.utils.logger import get_logger
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
+logger = get_logger(__name__)
 security = HTTPBearer()
 
 
@@ -71,6 +73,6 @@ def logout_user(
             )
         except Exception as e:
             # Do NOT crash logout if Redis fails
-            print(f"⚠ Redis error during logout: {e}")
+            logger.warning("Redis error during logout: %s", e)
 
     return {"message": "Logged out successfully"}
@@ -0,0 +1,103 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from app.config import BOOTSTRAP_SECTION_TIMEOUT
+from app.dependencies import get_current_user
+from app.routes import address_routes, coupon_routes, menu_routes, order_routes
+from app.utils.request_redis import prefetch
+from app.utils.read_routing import secondary_reads
+from app.utils.responses import dumps, RawJSONResponse
+from app.utils.logger import get_logger
+
+router = APIRouter(prefix="/bootstrap", tags=["Bootstrap"])
+logger = get_logger(__name__)
+
+
+# =========================
+# SECTIONS
+# =========================
+# name -> (loader(user), blocking). Blocking loaders run concurrently in
+# the threadpool; the others only read the principal and run inline.
+# Loaders reuse the routes' own cached paths, so cached sections arrive as
+# raw JSON bytes and are spliced into the response without re-encoding.
+SECTIONS = {
+    "profile": (lambda user: {"email": user["email"], "phone": user.get("phone")}, False),
+    "default_address": (address_routes.find_default, False),
+    "menu": (lambda user: menu_routes.get_menu(), True),
+    "orders": (lambda user: order_routes.get_my_orders(user=user), True),
+    "coupons": (lambda user: coupon_routes.get_all_coupons(), True),
+}
+
+# Redis keys of the cached sections, fetched with the auth MGET
+SECTION_KEYS = {
+    "menu": lambda email: menu_routes.MENU_CACHE_KEY,
+    "orders": lambda email: f"orders:list:{email}",
+}
+
+
+def _requested(sections: Optional[str]) -> list:
+    if not sections:
+        return list(SECTIONS)
+    names = [name.strip() for name in sections.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    return names
+
+
+def _prefetch_keys(email: str, params: dict, query: dict) -> list:
+    try:
+        names = _requested(query.get("sections"))
+    except HTTPException:
+        return []
+    return [SECTION_KEYS[name](email) for name in names if name in SECTION_KEYS]
+
+
+async def _load(name: str, user: dict) -> tuple:
+    """(json_bytes, error) for one section; failures never escape"""
+    loader, blocking = SECTIONS[name]
+    try:
+        if blocking:
+            value = await asyncio.wait_for(
+                run_in_threadpool(loader, user), BOOTSTRAP_SECTION_TIMEOUT
+            )
+        else:
+            value = loader(user)
+    except asyncio.TimeoutError:
+        logger.warning("Bootstrap section %s timed out", name)
+        return b"null", "timeout"
+    except HTTPException as e:
+        return b"null", (None if e.status_code == 404 else e.detail)
+    except Exception as e:
+        logger.warning("Bootstrap section %s failed: %s", name, e)
+        return b"null", "unavailable"
+
+    if isinstance(value, Response):
+        return value.body, None
+    return dumps(value), None
+
+
+@router.get("")
+@router.get("/")
+@prefetch(_prefetch_keys)
+@secondary_reads()
+async def bootstrap(
+    sections: Optional[str] = Query(None, description="Comma-separated subset, default all"),
+    user=Depends(get_current_user),
+):
+    """
+    Everything the app needs on launch in one authenticated call:
+    profile, default address, menu, recent orders and coupons.
+    A failing section is null and listed under "errors"; the rest still load.
+    """
+    names = _requested(sections)
+    results = await asyncio.gather(*(_load(name, user) for name in names))
+
+    parts = [dumps(name) + b":" + body for name, (body, _) in zip(names, results)]
+    errors = {name: error for name, (_, error) in zip(names, results) if error}
+    parts.append(b'"errors":' + dumps(errors))
+    return RawJSONResponse(b"{" + b",".join(parts) + b"}")
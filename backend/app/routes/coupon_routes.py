@@ -1,49 +1,19 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
 
-router = APIRouter(prefix="/coupons", tags=["Coupons"])
+from app.database import coupons_col
+from app.dependencies import get_optional_user, require_admin
+from app.models.coupon_model import CouponValidate, CouponUpsert, BestCouponRequest
+from app.services.coupon_engine import (
+    get_rule_table,
+    evaluate_coupon,
+    mark_coupons_changed,
+    normalize_code,
+    public_view,
+    coupon_usage,
+)
 
-# Sample coupons (in production, store in database)
-COUPONS = {
-    "WELCOME10": {
-        "name": "WELCOME10",
-        "description": "Get 10% off on your first order",
-        "discount_type": "percentage",
-        "discount_value": 10,
-        "min_order": 100,
-        "max_discount": 50,
-    },
-    "FLAT50": {
-        "name": "FLAT50",
-        "description": "Flat ₹50 off on orders above ₹200",
-        "discount_type": "flat",
-        "discount_value": 50,
-        "min_order": 200,
-        "max_discount": 50,
-    },
-    "SAVE20": {
-        "name": "SAVE20",
-        "description": "Save 20% on orders above ₹300",
-        "discount_type": "percentage",
-        "discount_value": 20,
-        "min_order": 300,
-        "max_discount": 100,
-    },
-    "BIGSALE": {
-        "name": "BIGSALE",
-        "description": "Mega discount! 25% off on orders above ₹500",
-        "discount_type": "percentage",
-        "discount_value": 25,
-        "min_order": 500,
-        "max_discount": 150,
-    },
-}
-
-
-class CouponValidate(BaseModel):
-    coupon_code: str
-    order_amount: float
+router = APIRouter(prefix="/coupons", tags=["Coupons"])
 
 
 @router.get("/list")
@@ -51,41 +21,99 @@ def get_all_coupons():
     """Get all available coupons/offers"""
     return {
         "success": True,
-        "coupons": list(COUPONS.values())
+        "coupons": [public_view(rule) for rule in get_rule_table().live_rules()]
     }
 
 
 @router.post("/validate")
 def validate_coupon(data: CouponValidate):
     """Validate and apply coupon"""
-    coupon_code = data.coupon_code.upper().strip()
-    
-    if coupon_code not in COUPONS:
-        raise HTTPException(status_code=404, detail="Invalid coupon code")
-    
-    coupon = COUPONS[coupon_code]
-    
-    # Check minimum order requirement
-    if data.order_amount < coupon["min_order"]:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Minimum order of ₹{coupon['min_order']} required"
-        )
-    
-    # Calculate discount
-    if coupon["discount_type"] == "percentage":
-        discount = (data.order_amount * coupon["discount_value"]) / 100
-        discount = min(discount, coupon["max_discount"])
-    else:  # flat
-        discount = coupon["discount_value"]
-    
-    final_amount = data.order_amount - discount
-    
+    result = evaluate_coupon(data.coupon_code, data.order_amount)
+    rule = result["rule"]
+
     return {
         "success": True,
-        "coupon_name": coupon["name"],
-        "description": coupon["description"],
-        "discount_amount": round(discount, 2),
-        "final_amount": round(final_amount, 2),
+        "coupon_name": rule["code"],
+        "description": rule["description"],
+        "discount_amount": result["discount_amount"],
+        "final_amount": result["final_amount"],
         "original_amount": data.order_amount
     }
+
+
+@router.post("/best")
+def best_coupon(data: BestCouponRequest, user=Depends(get_optional_user)):
+    """
+    Rank every applicable coupon for a cart in one call.
+    Replaces calling /validate once per coupon on each cart change.
+    Signed in, coupons the user has used up are left out too.
+    """
+    if data.order_amount is not None:
+        order_amount = data.order_amount
+    elif data.items:
+        order_amount = sum(line.price * line.quantity for line in data.items)
+    else:
+        raise HTTPException(status_code=400, detail="order_amount or items required")
+
+    applicable, locked = get_rule_table().rank_offers(order_amount, user["email"] if user else None)
+
+    offers = [
+        {
+            **public_view(rule),
+            "discount_amount": round(discount, 2),
+            "final_amount": round(order_amount - discount, 2),
+        }
+        for rule, discount in applicable
+    ]
+
+    return {
+        "success": True,
+        "order_amount": round(order_amount, 2),
+        "best": offers[0] if offers else None,
+        "offers": offers,
+        "locked": [
+            {**public_view(rule), "add_amount": round(shortfall, 2)}
+            for rule, shortfall in locked
+        ],
+    }
+
+
+# =========================
+# ADMIN
+# =========================
+@router.put("/admin", dependencies=[Depends(require_admin)])
+def upsert_coupon(data: CouponUpsert):
+    """Create or update a coupon; all workers pick it up on their next refresh"""
+    coupon = data.model_dump()
+    coupon["code"] = normalize_code(coupon["code"])
+    now = datetime.utcnow()
+
+    coupons_col.update_one(
+        {"code": coupon["code"]},
+        {
+            "$set": {**coupon, "updated_at": now},
+            "$setOnInsert": {"redeemed_count": 0, "created_at": now},
+        },
+        upsert=True,
+    )
+    mark_coupons_changed()
+
+    return {"success": True, "code": coupon["code"]}
+
+
+@router.delete("/admin/{code}", dependencies=[Depends(require_admin)])
+def deactivate_coupon(code: str):
+    result = coupons_col.update_one(
+        {"code": normalize_code(code)},
+        {"$set": {"active": False, "updated_at": datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Coupon not found")
+
+    mark_coupons_changed()
+    return {"success": True, "message": "Coupon deactivated"}
+
+
+@router.get("/admin/{code}/usage", dependencies=[Depends(require_admin)])
+def get_coupon_usage(code: str):
+    return coupon_usage(code)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.utils.health import get_state, readiness
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def liveness():
+    """Process is up and the event loop is responsive (no dependency checks)"""
+    return {"status": "alive", "state": get_state()}
+
+
+@router.get("/ready")
+def readiness_probe():
+    """200 once warmed up with MongoDB reachable, 503 otherwise (or while draining)"""
+    ready, details = readiness()
+    return JSONResponse(details, status_code=200 if ready else 503)
@@ -1,13 +1,16 @@
 from fastapi import APIRouter
 from app.database import menu_col
-from app.utils.cache import cache, invalidate_cache
+from app.services.inventory import remaining, today
+from app.utils.cache import cached_response
+from app.utils.read_routing import secondary_reads
+from app.utils.responses import dumps, RawJSONResponse
 
 router = APIRouter(prefix="/menu", tags=["Menu"])
 
-@router.get("", dependencies=[])  # 👈 Match both /menu and /menu/
-@router.get("/", dependencies=[])  # 👈 no auth dependency
-@cache(expire_time=3600)  # Cache for 1 hour - menu rarely changes
-def get_menu():
+MENU_CACHE_KEY = "cache:get_menu"
+
+
+def load_menu():
     menu = []
 
     for item in menu_col.find():
@@ -24,3 +27,14 @@ def get_menu():
         })
 
     return {"menu": menu}
+
+
+@router.get("", dependencies=[])  # 👈 Match both /menu and /menu/
+@router.get("/", dependencies=[])  # 👈 no auth dependency
+@secondary_reads()
+def get_menu():
+    # Menu cached for 1 hour (it rarely changes); today's portions left are
+    # live and spliced in: {"menu": [...], "availability": {...}}
+    menu = cached_response(MENU_CACHE_KEY, load_menu, 3600)
+    availability = dumps({"day": today(), "remaining": remaining()})
+    return RawJSONResponse(menu.body[:-1] + b',"availability":' + availability + b"}")
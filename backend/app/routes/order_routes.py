@@ -3,7 +3,13 @@ from datetime import datetime
 import random
 from app.dependencies import get_current_user
 from app.database import orders_col
-from app.utils.cache import get_cache, set_cache, invalidate_cache
+from app.utils.cache import cached_response, invalidate_cache
+from app.utils.request_redis import prefetch
+from app.utils.read_routing import secondary_reads
+from app.services.coupon_engine import release_coupon
+from app.services.order_archive import find_order, list_user_orders
+from app.services.sales_counters import record_cancellation
+from app.services.inventory import release as release_stock
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -16,52 +22,43 @@ def generate_order_id():
 
 
 @router.get("/")
+@prefetch(lambda email, params, query: [f"orders:list:{email}"])
+@secondary_reads()
 def get_my_orders(user=Depends(get_current_user)):
     """
-    Returns only orders of the logged-in user.
+    Returns only orders of the logged-in user (hot and archived).
     Cached for 5 minutes.
     """
-    cache_key = f"orders:list:{user['email']}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-    
-    orders = list(
-        orders_col.find(
-            {"user_email": user["email"]},
-            {"_id": 0}
-        )
-    )
+    def load_orders():
+        orders = list_user_orders(user["email"])
+        return {
+            "count": len(orders),
+            "orders": orders
+        }
 
-    result = {
-        "count": len(orders),
-        "orders": orders
-    }
-    
-    set_cache(cache_key, result, expire_time=300)
-    return result
+    return cached_response(f"orders:list:{user['email']}", load_orders, expire_time=300)
 
 
 @router.get("/{order_id}")
+@prefetch(lambda email, params, query: [f"orders:detail:{params['order_id']}:{email}"])
+@secondary_reads()
 def get_order_details(order_id: str, user=Depends(get_current_user)):
-    cache_key = f"orders:detail:{order_id}:{user['email']}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-    
-    order = orders_col.find_one(
-        {
-            "order_id": order_id,
-            "user_email": user["email"]
-        },
-        {"_id": 0}
-    )
+    def load_order():
+        order = find_order(
+            {
+                "order_id": order_id,
+                "user_email": user["email"]
+            },
+            {"_id": 0}
+        )
 
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        return order
 
-    set_cache(cache_key, order, expire_time=300)
-    return order
+    return cached_response(
+        f"orders:detail:{order_id}:{user['email']}", load_order, expire_time=300
+    )
 
 @router.post("/{order_id}/cancel")
 def cancel_order(
@@ -74,7 +71,8 @@ def cancel_order(
     if not reason:
         raise HTTPException(status_code=400, detail="Cancel reason required")
 
-    order = orders_col.find_one(
+    # Archived orders are DELIVERED / CANCELLED: found, but not cancellable
+    order = find_order(
         {
             "order_id": order_id,
             "user_email": user["email"]
@@ -90,8 +88,8 @@ def cancel_order(
             detail="Order cannot be cancelled at this stage"
         )
 
-    orders_col.update_one(
-        {"order_id": order_id},
+    result = orders_col.update_one(
+        {"order_id": order_id, "status": "PLACED"},
         {
             "$set": {
                 "status": "CANCELLED",
@@ -100,6 +98,15 @@ def cancel_order(
             }
         }
     )
+
+    # Give the coupon use back (only once, even if cancel is retried)
+    if result.modified_count and order.get("coupon_code"):
+        release_coupon(order["coupon_code"], user["email"], order.get("coupon_claimed_via"))
+
+    # Portions back on the menu and out of the day's sales (same once-only guard)
+    if result.modified_count:
+        release_stock(order.get("inventory_day"), order.get("reserved_stock"), order.get("reserved_via"))
+        record_cancellation(order)
     
     # Invalidate cached orders
     invalidate_cache(
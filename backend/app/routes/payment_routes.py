@@ -5,6 +5,10 @@ import uuid, time
 from app.dependencies import get_current_user
 from app.database import orders_col
 from app.models.order_model import OrderCreate
+from app.services.coupon_engine import evaluate_coupon, redeem_coupon, release_coupon
+from app.services.serviceability import require_deliverable, delivery_fee
+from app.services.sales_counters import record_order
+from app.services.inventory import reserve, release
 
 router = APIRouter(prefix="/payment", tags=["Payment"])
 
@@ -37,6 +41,31 @@ def dummy_checkout(
 
     order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
 
+    # 📍 Deliverable pincode, before the cut-off (in-memory lookup, no query)
+    zone = require_deliverable(data.delivery_address)
+
+    # 🍱 Today's portions for every cart line, all or nothing
+    inventory_day, reserved_stock, reserved_via = reserve([item.model_dump() for item in data.items])
+
+    # 🎟️ Re-price the coupon server-side and claim one use atomically
+    coupon_code = coupon_claimed_via = None
+    discount_amount = 0
+    final_amount = data.total_amount
+    if data.coupon_code:
+        try:
+            applied = evaluate_coupon(data.coupon_code, data.total_amount)
+            coupon_code = applied["rule"]["code"]
+            discount_amount = applied["discount_amount"]
+            final_amount = applied["final_amount"]
+            coupon_claimed_via = redeem_coupon(coupon_code, user["email"])
+        except Exception:
+            release(inventory_day, reserved_stock, reserved_via)
+            raise
+
+    # 🚚 Zone delivery fee on the discounted amount
+    fee = delivery_fee(zone, final_amount)
+    final_amount = round(final_amount + fee, 2)
+
     # ✅ SNAPSHOT ORDER ITEMS (IMPORTANT FIX)
     order_items = []
     for item in data.items:
@@ -57,11 +86,17 @@ def dummy_checkout(
         "user_email": user["email"],
         "items": order_items,
         "total_amount": data.total_amount,
-        "discount_amount": data.discount_amount or 0,
-        "final_amount": data.final_amount or data.total_amount,
-        "coupon_code": data.coupon_code,
+        "discount_amount": discount_amount,
+        "delivery_fee": fee,
+        "final_amount": final_amount,
+        "coupon_code": coupon_code,
+        "coupon_claimed_via": coupon_claimed_via,
         "payment_method": data.payment_method,  # ✅ Store payment method
         "delivery_address": data.delivery_address,  # ✅ Store delivery address
+        "delivery_zone": zone["zone_id"] if zone else None,
+        "inventory_day": inventory_day,
+        "reserved_stock": reserved_stock,
+        "reserved_via": reserved_via,
         "payment_gateway": "DUMMY",
         "payment_status": "SUCCESS",
         "status": "PLACED",
@@ -70,7 +105,16 @@ def dummy_checkout(
         "updated_at": datetime.utcnow(),
     }
 
-    orders_col.insert_one(order)
+    try:
+        orders_col.insert_one(order)
+    except Exception:
+        if coupon_code:
+            release_coupon(coupon_code, user["email"], coupon_claimed_via)
+        release(inventory_day, reserved_stock, reserved_via)
+        raise
+
+    # 📈 Sales counters (sent with the response's Redis pipeline)
+    record_order(order)
 
     # 🔁 Auto status lifecycle
     background_tasks.add_task(auto_progress_order, order_id)
@@ -82,5 +126,7 @@ def dummy_checkout(
     return {
         "message": "Payment successful",
         "order_id": order_id,
-        "status": "PLACED"
+        "status": "PLACED",
+        "delivery_fee": fee,
+        "final_amount": final_amount,
     }
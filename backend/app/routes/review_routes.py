@@ -1,32 +1,78 @@
-from fastapi import APIRouter, Depends
-from app.database import reviews_col
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+
+from app.config import REVIEW_PAGE_SIZE, REVIEW_WRITE_BEHIND
 from app.dependencies import get_current_user
-from app.utils.cache import get_cache, set_cache, invalidate_cache
+from app.models.review_model import ReviewCreate
+from app.services.reviews import (
+    build_review,
+    save_review,
+    list_reviews,
+    cached_first_page,
+    cached_item_summary,
+    user_reviews_cache_key,
+    item_reviews_cache_key,
+)
+from app.services.review_ingest import enqueue_review
+from app.utils.request_redis import prefetch
+from app.utils.read_routing import secondary_reads
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
+
+def _first_page_keys(email: str, params: dict, query: dict) -> list:
+    # Only the default first page is cached
+    if "cursor" in query or query.get("limit", str(REVIEW_PAGE_SIZE)) != str(REVIEW_PAGE_SIZE):
+        return []
+    return [user_reviews_cache_key(email)]
+
+
 @router.get("/")
-def get_reviews(user=Depends(get_current_user)):
+@prefetch(_first_page_keys)
+@secondary_reads()
+def get_reviews(
+    cursor: Optional[str] = None,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=50),
+    user=Depends(get_current_user)
+):
     """
-    Get all reviews submitted by current user - cached for 20 minutes
+    Reviews submitted by current user, newest first.
+    The first page is cached for 20 minutes; pass `next_cursor` for more.
     """
-    cache_key = f"reviews:user:{user['email']}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-    
-    reviews = list(reviews_col.find({"user_email": user["email"]}, {"_id": 0}))
-    result = {"reviews": reviews}
-    
-    set_cache(cache_key, result, expire_time=1200)
-    return result
+    query = {"user_email": user["email"]}
+    if cursor is None and limit == REVIEW_PAGE_SIZE:
+        return cached_first_page(user_reviews_cache_key(user["email"]), query, limit)
+    return list_reviews(query, limit, cursor)
+
+
+@router.get("/item/{item_id}")
+@secondary_reads()
+def get_item_reviews(
+    item_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=50),
+):
+    """Reviews for a menu item, newest first (keyset paginated)"""
+    query = {"item_id": item_id}
+    if cursor is None and limit == REVIEW_PAGE_SIZE:
+        return cached_first_page(item_reviews_cache_key(item_id), query, limit)
+    return list_reviews(query, limit, cursor)
+
+
+@router.get("/item/{item_id}/summary")
+@secondary_reads()
+def get_item_summary(item_id: str):
+    """Count, average, star histogram and latest reviews in one read"""
+    return cached_item_summary(item_id)
+
 
 @router.post("/")
-def submit_review(data: dict, user=Depends(get_current_user)):
-    data["user_email"] = user["email"]
-    reviews_col.insert_one(data)
-    
-    # Invalidate review cache when new review is submitted
-    invalidate_cache(f"reviews:user:{user['email']}")
-    
-    return {"message": "Review submitted"}
+def submit_review(data: ReviewCreate, user=Depends(get_current_user)):
+    review = build_review(data, user["email"])
+
+    # Write-behind: queue it and return; falls back to a direct write
+    if REVIEW_WRITE_BEHIND and enqueue_review(review):
+        return {"message": "Review submitted", "review_id": review["review_id"], "queued": True}
+
+    save_review(review)
+    return {"message": "Review submitted", "review_id": review["review_id"]}
@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from app.config import SERVICE_ZONES_FILE
+from app.database import service_zones_col
+from app.dependencies import require_admin
+from app.models.serviceability_model import PincodeCheck, ZoneUpsert
+from app.services.serviceability import (
+    check_pincodes,
+    compile_zone,
+    get_zone_table,
+    mark_zones_changed,
+    public_view,
+)
+
+router = APIRouter(prefix="/serviceability", tags=["Serviceability"])
+
+
+@router.post("/check")
+def check_serviceability(data: PincodeCheck):
+    """Check up to SERVICE_CHECK_MAX_PINCODES pincodes in one call"""
+    return {"success": True, "results": check_pincodes(data.pincodes)}
+
+
+# =========================
+# ADMIN
+# =========================
+def _require_collection_source():
+    if SERVICE_ZONES_FILE:
+        raise HTTPException(
+            status_code=409,
+            detail="Delivery zones are loaded from SERVICE_ZONES_FILE; edit the file instead"
+        )
+
+
+@router.get("/admin/zones", dependencies=[Depends(require_admin)])
+def list_zones():
+    table = get_zone_table()
+    return {
+        "success": True,
+        "version": table.version,
+        "zones": [
+            {**public_view(zone), "pincodes": len(zone["pincodes"]), "ranges": len(zone["ranges"])}
+            for zone in table.zones
+        ],
+    }
+
+
+@router.put("/admin/zones", dependencies=[Depends(require_admin)])
+def upsert_zone(data: ZoneUpsert):
+    """Create or update a zone; all workers pick it up on their next refresh"""
+    _require_collection_source()
+    zone = data.model_dump()
+    zone["ranges"] = [list(pair) for pair in zone["ranges"]]
+    try:
+        compile_zone(zone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    now = datetime.utcnow()
+    service_zones_col.update_one(
+        {"zone_id": zone["zone_id"]},
+        {"$set": {**zone, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+        upsert=True,
+    )
+    mark_zones_changed()
+
+    return {"success": True, "zone_id": zone["zone_id"]}
+
+
+@router.delete("/admin/zones/{zone_id}", dependencies=[Depends(require_admin)])
+def deactivate_zone(zone_id: str):
+    _require_collection_source()
+    result = service_zones_col.update_one(
+        {"zone_id": zone_id},
+        {"$set": {"active": False, "updated_at": datetime.utcnow()}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Zone not found")
+
+    mark_zones_changed()
+    return {"success": True, "message": "Zone deactivated"}
@@ -4,11 +4,12 @@ from app.dependencies import get_current_user
 from app.database import users_col
 from app.utils.password import hash_password, verify_password
 from app.utils.cache import invalidate_cache
-from app.utils.redis_client import get_redis
-import random
-import string
+from app.utils.logger import get_logger
+from app.services.otp import issue_otp, check_otp, consume_verification
+from app.config import DEBUG, OTP_TTL_SECONDS
 
 router = APIRouter(prefix="/user", tags=["User"])
+logger = get_logger(__name__)
 
 
 # =========================
@@ -113,24 +114,18 @@ def update_phone(
     Updates the user's phone number.
     Requires verified OTP for security.
     """
-    redis_client = get_redis()
-    
     if not data.verified:
         raise HTTPException(
             status_code=400,
             detail="Phone number must be verified via OTP before updating"
         )
     
-    # Check if phone was actually verified
-    if redis_client:
-        verification_key = f"phone_verified:{data.phone}"
-        if not redis_client.get(verification_key):
-            raise HTTPException(
-                status_code=400,
-                detail="Phone verification expired. Please verify again."
-            )
-        # Clean up verification token after use
-        redis_client.delete(verification_key)
+    # Check and use up the verification in one step (no reuse, no race)
+    if not consume_verification(data.phone):
+        raise HTTPException(
+            status_code=400,
+            detail="Phone verification expired. Please verify again."
+        )
     
     db_user = users_col.find_one({"email": user["email"]})
 
@@ -151,11 +146,6 @@ def update_phone(
         "phone": data.phone
     }
 
-    return {
-        "message": "Phone number updated successfully",
-        "phone": data.phone
-    }
-
 
 # =========================
 # SEND OTP TO PHONE
@@ -164,34 +154,24 @@ def update_phone(
 def send_otp(data: SendOTPRequest):
     """
     Sends a 6-digit OTP to the provided phone number.
-    OTP is valid for 10 minutes.
+    OTP is valid for 10 minutes. Resends are throttled per phone.
     """
-    redis_client = get_redis()
-    
-    if not redis_client:
-        raise HTTPException(
-            status_code=500,
-            detail="OTP service temporarily unavailable"
-        )
-    
-    # Generate 6-digit OTP
-    otp = ''.join(random.choices(string.digits, k=6))
-    
-    # Store OTP in Redis with 10-minute expiration
-    otp_key = f"otp:{data.phone}"
-    redis_client.setex(otp_key, 600, otp)  # 600 seconds = 10 minutes
+    # Cooldown, send limit and storage in one atomic Redis call
+    otp = issue_otp(data.phone)
     
     # TODO: Integrate with SMS service (Twilio, AWS SNS, etc.)
     # For now, we're storing it in Redis
     # In production, send actual SMS:
     # sms_service.send_sms(phone=data.phone, message=f"Your OTP is: {otp}")
     
-    print(f"📱 OTP for {data.phone}: {otp}")  # Debug log
+    # Development only: never write OTPs to production logs
+    if DEBUG:
+        logger.debug("OTP for %s: %s", data.phone, otp)
     
     return {
         "message": "OTP sent successfully",
         "phone": data.phone,
-        "expires_in": 600  # seconds
+        "expires_in": OTP_TTL_SECONDS  # seconds
     }
 
 
@@ -204,41 +184,9 @@ def verify_otp(data: VerifyOTPRequest):
     Verifies the OTP sent to the phone number.
     Returns a verification token if OTP is correct.
     """
-    redis_client = get_redis()
-    
-    if not redis_client:
-        raise HTTPException(
-            status_code=500,
-            detail="OTP service temporarily unavailable"
-        )
-    
-    # Retrieve stored OTP from Redis
-    otp_key = f"otp:{data.phone}"
-    stored_otp = redis_client.get(otp_key)
-    
-    if not stored_otp:
-        raise HTTPException(
-            status_code=400,
-            detail="OTP expired or not found. Please request a new one."
-        )
-    
-    # Handle both string and bytes responses from Redis
-    stored_otp_str = stored_otp.decode() if isinstance(stored_otp, bytes) else stored_otp
-    
-    # Verify OTP
-    if stored_otp_str != data.otp:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid OTP"
-        )
-    
-    # Remove OTP from Redis after successful verification
-    redis_client.delete(otp_key)
-    
-    # Store verification token for phone update
-    verification_key = f"phone_verified:{data.phone}"
-    redis_client.setex(verification_key, 300, "verified")  # 5 minutes validity
-    
+    # Compare, count the attempt, consume and mark verified atomically
+    check_otp(data.phone, data.otp)
+
     return {
         "message": "OTP verified successfully",
         "phone": data.phone,
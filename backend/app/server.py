@@ -0,0 +1,181 @@
+"""
+Production Server
+Runs the API with WEB_CONCURRENCY worker processes so throughput scales
+across cores instead of one GIL.
+
+    python -m app.server
+
+With SERVER_PRELOAD (default) the supervisor imports the app once, binds
+the socket and forks the workers from it, so code and read-only data are
+shared copy-on-write and a broken build fails before any worker starts.
+Nothing connects at import time: the Mongo client, Redis client and log
+listener are created per worker, after fork (see register_at_fork hooks in
+app.database, app.utils.redis_client and app.utils.logger). Each worker
+then runs the lifespan warm-up on its own.
+
+SIGTERM / SIGINT: readiness turns 503 at once while workers keep serving
+for SHUTDOWN_DRAIN_SECONDS, so the load balancer stops routing to them.
+Then they stop accepting connections, finish in-flight requests for up to
+GRACEFUL_TIMEOUT seconds, run the lifespan shutdown (the review worker
+drains) and exit. A second signal skips the drain wait. Workers still
+running after that are killed. A worker that crashes is replaced.
+
+Without fork (or SERVER_PRELOAD=false) uvicorn's own multi-process mode is
+used; each worker then imports the app itself, and readiness only turns
+503 in the lifespan shutdown.
+"""
+
+import os
+import signal
+import threading
+import time
+
+import uvicorn
+
+from app.config import (
+    HOST,
+    PORT,
+    WEB_CONCURRENCY,
+    SERVER_PRELOAD,
+    GRACEFUL_TIMEOUT,
+    SHUTDOWN_DRAIN_SECONDS,
+)
+from app.utils import health
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Don't respawn faster than this when a worker keeps crashing on start
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that reports draining before it starts shutting down"""
+
+    def __init__(self, config: uvicorn.Config, drain_seconds: float = SHUTDOWN_DRAIN_SECONDS):
+        super().__init__(config)
+        self.drain_seconds = drain_seconds
+        self._drain_timer = None
+
+    def handle_exit(self, sig, frame):
+        if self._drain_timer is not None or self.drain_seconds <= 0:
+            super().handle_exit(sig, frame)
+            return
+        health.set_state(health.DRAINING)
+        self._drain_timer = threading.Timer(self.drain_seconds, super().handle_exit, (sig, frame))
+        self._drain_timer.daemon = True
+        self._drain_timer.start()
+
+
+def _uvicorn_config(app) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=HOST,
+        port=PORT,
+        proxy_headers=True,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+
+
+def _run_worker(app, sock):
+    # Own process group: Ctrl+C reaches the supervisor only, which then
+    # sends exactly one SIGTERM (a second signal would force-exit uvicorn)
+    os.setpgid(0, 0)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    status = 0
+    try:
+        DrainingServer(_uvicorn_config(app)).run(sockets=[sock])
+    except BaseException:
+        logger.exception("Worker %s crashed", os.getpid())
+        status = 1
+    finally:
+        os._exit(status)
+
+
+def serve_preforked(workers: int):
+    from app.main import app
+
+    sock = _uvicorn_config(app).bind_socket()
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(app, sock)
+        children[pid] = time.monotonic()
+
+    def kill_remaining(signum, frame):
+        for pid in list(children):
+            logger.warning("Worker %s did not stop in time, killing it", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        logger.info("Shutting down %d workers (graceful timeout %ss)", len(children), GRACEFUL_TIMEOUT)
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        signal.signal(signal.SIGALRM, kill_remaining)
+        signal.alarm(int(SHUTDOWN_DRAIN_SECONDS) + GRACEFUL_TIMEOUT + 5)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    logger.info("Serving on %s:%s with %d preforked workers", HOST, PORT, workers)
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+
+        logger.warning("Worker %s exited (status %s), starting a replacement", pid, status)
+        if time.monotonic() - started < RESPAWN_DELAY_SECONDS:
+            time.sleep(RESPAWN_DELAY_SECONDS)
+        if not stopping:
+            spawn()
+
+    signal.alarm(0)
+    sock.close()
+    logger.info("All workers stopped")
+
+
+def main():
+    workers = max(WEB_CONCURRENCY, 1)
+
+    if workers > 1 and SERVER_PRELOAD and hasattr(os, "fork"):
+        serve_preforked(workers)
+        return
+
+    if workers == 1:
+        DrainingServer(_uvicorn_config("app.main:app")).run()
+        return
+
+    # uvicorn's spawn-based workers (no preload)
+    uvicorn.run(
+        "app.main:app",
+        host=HOST,
+        port=PORT,
+        workers=workers,
+        proxy_headers=True,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+"""
+Coupon Engine
+Coupons live in MongoDB and are compiled into an in-process rule table.
+Redemption limits are enforced at checkout with atomic Redis counters,
+seeded from MongoDB when missing. The durable counts are the coupon's
+redeemed_count and, for coupons with a per-user limit, one coupon_uses
+document per {code, email}; without Redis the limits are enforced with
+conditional updates on those.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.config import COUPON_REFRESH_SECONDS
+from app.database import coupons_col, coupon_uses_col
+from app.services.order_archive import count_orders
+from app.utils.redis_client import get_redis, get_script
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Seed data for an empty collection (the coupons we used to hard-code)
+DEFAULT_COUPONS = [
+    {
+        "code": "WELCOME10",
+        "description": "Get 10% off on your first order",
+        "discount_type": "percentage",
+        "discount_value": 10,
+        "min_order": 100,
+        "max_discount": 50,
+        "per_user_limit": 1,
+    },
+    {
+        "code": "FLAT50",
+        "description": "Flat ₹50 off on orders above ₹200",
+        "discount_type": "flat",
+        "discount_value": 50,
+        "min_order": 200,
+        "max_discount": 50,
+    },
+    {
+        "code": "SAVE20",
+        "description": "Save 20% on orders above ₹300",
+        "discount_type": "percentage",
+        "discount_value": 20,
+        "min_order": 300,
+        "max_discount": 100,
+    },
+    {
+        "code": "BIGSALE",
+        "description": "Mega discount! 25% off on orders above ₹500",
+        "discount_type": "percentage",
+        "discount_value": 25,
+        "min_order": 500,
+        "max_discount": 150,
+    },
+]
+
+VERSION_KEY = "coupons:version"
+
+# KEYS[1] = global uses counter, KEYS[2] = per-user uses counter
+# ARGV[1] = max_uses (0 = unlimited), ARGV[2] = per_user_limit (0 = unlimited)
+# Returns the new global count, -1 when the global cap is hit, -2 for the user
+# cap, -3 when a counter that is enforced hasn't been seeded from Mongo yet
+REDEEM_LUA = """
+local max_uses = tonumber(ARGV[1])
+local per_user = tonumber(ARGV[2])
+if redis.call('EXISTS', KEYS[1]) == 0 or (per_user > 0 and redis.call('EXISTS', KEYS[2]) == 0) then
+    return -3
+end
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+if max_uses > 0 and used >= max_uses then
+    return -1
+end
+local user_used = tonumber(redis.call('GET', KEYS[2]) or '0')
+if per_user > 0 and user_used >= per_user then
+    return -2
+end
+redis.call('INCR', KEYS[2])
+return redis.call('INCR', KEYS[1])
+"""
+
+# Undo a redemption (order cancelled / checkout failed), never below zero
+RELEASE_LUA = """
+for i, key in ipairs(KEYS) do
+    local value = tonumber(redis.call('GET', key) or '0')
+    if value > 0 then
+        redis.call('DECR', key)
+    end
+end
+return 1
+"""
+
+
+# Seed missing counters (after a flush or key loss) unless another worker did.
+# KEYS as REDEEM_LUA, ARGV[1] = redeemed_count, ARGV[2] = user's orders ('' = skip)
+SEED_LUA = """
+redis.call('SET', KEYS[1], ARGV[1], 'NX')
+if ARGV[2] ~= '' then
+    redis.call('SET', KEYS[2], ARGV[2], 'NX')
+end
+return 1
+"""
+
+
+def uses_key(code: str) -> str:
+    return f"coupon:{code}:uses"
+
+
+def user_uses_key(code: str, email: str) -> str:
+    return f"coupon:{code}:user:{email}"
+
+
+def normalize_code(code: str) -> str:
+    return (code or "").upper().strip()
+
+
+def compile_rule(doc: dict) -> dict:
+    """Turn a coupon document into a flat, pre-validated rule"""
+    max_discount = doc.get("max_discount")
+    return {
+        "code": normalize_code(doc["code"]),
+        "description": doc.get("description", ""),
+        "is_percentage": doc.get("discount_type") == "percentage",
+        "discount_type": doc.get("discount_type", "flat"),
+        "discount_value": float(doc.get("discount_value", 0)),
+        "min_order": float(doc.get("min_order", 0)),
+        "max_discount": float(max_discount) if max_discount else None,
+        "max_uses": int(doc.get("max_uses") or 0),
+        "per_user_limit": int(doc.get("per_user_limit") or 0),
+        "starts_at": doc.get("starts_at"),
+        "ends_at": doc.get("ends_at"),
+        "redeemed_count": int(doc.get("redeemed_count") or 0),
+    }
+
+
+def public_view(rule: dict) -> dict:
+    """Coupon as shown to customers (same shape the frontend always used)"""
+    return {
+        "name": rule["code"],
+        "description": rule["description"],
+        "discount_type": rule["discount_type"],
+        "discount_value": rule["discount_value"],
+        "min_order": rule["min_order"],
+        "max_discount": rule["max_discount"],
+    }
+
+
+def is_live(rule: dict, now: Optional[datetime] = None) -> bool:
+    now = now or datetime.utcnow()
+    if rule["starts_at"] and now < rule["starts_at"]:
+        return False
+    if rule["ends_at"] and now >= rule["ends_at"]:
+        return False
+    return True
+
+
+def compute_discount(rule: dict, order_amount: float) -> float:
+    """Discount for an amount that already satisfies min_order"""
+    if rule["is_percentage"]:
+        discount = (order_amount * rule["discount_value"]) / 100
+        if rule["max_discount"] is not None:
+            discount = min(discount, rule["max_discount"])
+    else:  # flat
+        discount = rule["discount_value"]
+    return min(discount, order_amount)
+
+
+# =========================
+# RULE TABLE
+# =========================
+
+class CouponRuleTable:
+    """
+    Compiled, read-only view of the active coupons.
+
+    Workers keep one table in memory and swap it wholesale on refresh, so
+    readers never see a half-built table. A change bumps `coupons:version`
+    in Redis; other workers notice within COUPON_REFRESH_SECONDS.
+    """
+
+    def __init__(self, rules: dict, version: Optional[str] = None):
+        self.rules = rules
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def get(self, code: str) -> Optional[dict]:
+        return self.rules.get(normalize_code(code))
+
+    def live_rules(self) -> list:
+        now = datetime.utcnow()
+        return [rule for rule in self.rules.values() if is_live(rule, now)]
+
+    def rank_offers(self, order_amount: float, email: Optional[str] = None):
+        """
+        Score every live coupon against `order_amount` in one pass.
+        Coupons whose uses are used up (globally, or by `email`) are left
+        out, going by the live Redis counters.
+
+        Returns (applicable, locked): applicable sorted by savings (best
+        first), locked = coupons that need a bigger order.
+        """
+        rules = self.live_rules()
+        used_up = _used_up(rules, email)
+        applicable, locked = [], []
+
+        for rule in rules:
+            if rule["code"] in used_up:
+                continue
+            if order_amount < rule["min_order"]:
+                locked.append((rule, rule["min_order"] - order_amount))
+            else:
+                applicable.append((rule, compute_discount(rule, order_amount)))
+
+        # Biggest saving first; lower threshold wins ties
+        applicable.sort(key=lambda pair: (-pair[1], pair[0]["min_order"], pair[0]["code"]))
+        locked.sort(key=lambda pair: pair[1])
+        return applicable, locked
+
+
+def _used_up(rules: list, email: Optional[str]) -> set:
+    """Codes whose global or per-user limit is reached (one MGET; empty without Redis)"""
+    limits = []
+    for rule in rules:
+        if rule["max_uses"]:
+            limits.append((rule["code"], uses_key(rule["code"]), rule["max_uses"]))
+        if email and rule["per_user_limit"]:
+            limits.append((rule["code"], user_uses_key(rule["code"], email), rule["per_user_limit"]))
+    redis_client = get_redis()
+    if not limits or not redis_client:
+        return set()
+    try:
+        values = redis_client.mget([key for _, key, _ in limits])
+    except Exception as e:
+        logger.warning("Coupon counter read error: %s", e)
+        return set()
+    # A missing counter isn't seeded yet: checkout decides
+    return {code for (code, _, limit), value in zip(limits, values) if value is not None and int(value) >= limit}
+
+
+_table: Optional[CouponRuleTable] = None
+_table_lock = threading.Lock()
+
+
+def _current_version() -> Optional[str]:
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+    try:
+        return redis_client.get(VERSION_KEY)
+    except Exception:
+        return None
+
+
+def seed_default_coupons():
+    """Insert the default coupons into an empty collection"""
+    if coupons_col.count_documents({}, limit=1):
+        return
+    now = datetime.utcnow()
+    for coupon in DEFAULT_COUPONS:
+        coupons_col.update_one(
+            {"code": coupon["code"]},
+            {"$setOnInsert": {
+                **coupon,
+                "active": True,
+                "redeemed_count": 0,
+                "created_at": now,
+                "updated_at": now,
+            }},
+            upsert=True,
+        )
+
+
+def _load_table(version: Optional[str]) -> CouponRuleTable:
+    seed_default_coupons()
+    rules = {}
+    for doc in coupons_col.find({"active": True}, {"_id": 0}):
+        rule = compile_rule(doc)
+        rules[rule["code"]] = rule
+
+    # Make sure Redis counters start from the persisted count
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for rule in rules.values():
+                pipe.set(uses_key(rule["code"]), rule["redeemed_count"], nx=True)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Coupon counter seed error: %s", e)
+
+    return CouponRuleTable(rules, version)
+
+
+def get_rule_table(force: bool = False) -> CouponRuleTable:
+    """Return the compiled rule table, reloading it if coupons changed"""
+    global _table
+
+    table = _table
+    if (
+        not force
+        and table is not None
+        and time.monotonic() - table.loaded_at < COUPON_REFRESH_SECONDS
+    ):
+        return table
+
+    version = _current_version()
+    with _table_lock:
+        table = _table
+        if force or table is None or version is None or version != table.version:
+            table = _load_table(version)
+        else:
+            table.loaded_at = time.monotonic()
+        _table = table
+    return table
+
+
+def mark_coupons_changed():
+    """Publish a new version so every worker reloads, then reload locally"""
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            redis_client.incr(VERSION_KEY)
+        except Exception as e:
+            logger.warning("Coupon version bump error: %s", e)
+    get_rule_table(force=True)
+
+
+# =========================
+# VALIDATION / REDEMPTION
+# =========================
+
+def evaluate_coupon(code: str, order_amount: float) -> dict:
+    """Validate a code against an amount and return the discount breakdown"""
+    rule = get_rule_table().get(code)
+    if not rule or not is_live(rule):
+        raise HTTPException(status_code=404, detail="Invalid coupon code")
+
+    if order_amount < rule["min_order"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Minimum order of ₹{rule['min_order']:g} required"
+        )
+
+    discount = compute_discount(rule, order_amount)
+    return {
+        "rule": rule,
+        "discount_amount": round(discount, 2),
+        "final_amount": round(order_amount - discount, 2),
+    }
+
+
+def redeem_coupon(code: str, email: str) -> str:
+    """
+    Atomically claim one use of `code` for `email`.
+    Returns the path that claimed it ("redis" or "mongo"), to be stored on
+    the order for release_coupon(). Raises HTTPException(409) when a usage
+    limit is reached.
+    """
+    rule = get_rule_table().get(code)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Invalid coupon code")
+
+    script = get_script(REDEEM_LUA)
+    if script is not None:
+        keys = [uses_key(rule["code"]), user_uses_key(rule["code"], email)]
+        args = [rule["max_uses"], rule["per_user_limit"]]
+        try:
+            result = script(keys=keys, args=args)
+            if result == -3:
+                _seed_counters(rule, email, keys)
+                result = script(keys=keys, args=args)
+        except Exception as e:
+            logger.warning("Coupon redeem via Redis failed, using MongoDB: %s", e)
+        else:
+            if result == -1:
+                raise HTTPException(status_code=409, detail="Coupon usage limit reached")
+            if result == -2:
+                raise HTTPException(
+                    status_code=409,
+                    detail="You have already used this coupon"
+                )
+            # Durable counts, off the Redis fast path's critical section. If
+            # they fail the checkout fails too, so give the Redis use back first
+            try:
+                _record_use(rule, email)
+            except Exception:
+                _release_counters(keys)
+                raise
+            return "redis"
+
+    _redeem_with_mongo(rule, email)
+    return "mongo"
+
+
+def _user_orders_with(code: str, email: str) -> int:
+    return count_orders({
+        "user_email": email,
+        "coupon_code": code,
+        "status": {"$ne": "CANCELLED"},
+    })
+
+
+def _upsert_user_uses(code: str, email: str, update: dict):
+    key = {"code": code, "email": email}
+    try:
+        coupon_uses_col.update_one(key, update, upsert=True)
+    except DuplicateKeyError:
+        # A concurrent first use inserted the document: now it's an update
+        coupon_uses_col.update_one(key, update)
+
+
+def _user_uses(code: str, email: str) -> int:
+    doc = coupon_uses_col.find_one({"code": code, "email": email}, {"_id": 0, "count": 1}) or {}
+    # Uses from before coupon_uses existed are only in the orders
+    return max(int(doc.get("count") or 0), _user_orders_with(code, email))
+
+
+def _record_use(rule: dict, email: str):
+    """Durable counts of a use claimed through Redis"""
+    if rule["per_user_limit"]:
+        _upsert_user_uses(rule["code"], email, {"$inc": {"count": 1}})
+    try:
+        coupons_col.update_one({"code": rule["code"]}, {"$inc": {"redeemed_count": 1}})
+    except Exception:
+        if rule["per_user_limit"]:
+            _release_user_use(rule["code"], email)
+        raise
+
+
+def _release_user_use(code: str, email: str):
+    coupon_uses_col.update_one(
+        {"code": code, "email": email, "count": {"$gt": 0}},
+        {"$inc": {"count": -1}},
+    )
+
+
+def _seed_counters(rule: dict, email: str, keys: list):
+    """Start missing Redis counters from the counts the MongoDB fallback uses"""
+    doc = coupons_col.find_one({"code": rule["code"]}, {"_id": 0, "redeemed_count": 1}) or {}
+    user_count = _user_uses(rule["code"], email) if rule["per_user_limit"] else ""
+    get_script(SEED_LUA)(keys=keys, args=[int(doc.get("redeemed_count") or 0), user_count])
+    logger.info("Seeded coupon counters for %s", rule["code"])
+
+
+def _release_counters(keys: list):
+    script = get_script(RELEASE_LUA)
+    if script is None:
+        return
+    try:
+        script(keys=keys)
+    except Exception as e:
+        logger.warning("Coupon release error: %s", e)
+
+
+def _redeem_with_mongo(rule: dict, email: str):
+    """Fallback when Redis is unavailable: conditional $inc on the durable counts"""
+    code = rule["code"]
+    if rule["per_user_limit"]:
+        _upsert_user_uses(code, email, {"$max": {"count": _user_orders_with(code, email)}})
+        claimed = coupon_uses_col.update_one(
+            {"code": code, "email": email, "count": {"$lt": rule["per_user_limit"]}},
+            {"$inc": {"count": 1}},
+        )
+        if not claimed.modified_count:
+            raise HTTPException(status_code=409, detail="You have already used this coupon")
+
+    query = {"code": code}
+    if rule["max_uses"]:
+        query["redeemed_count"] = {"$lt": rule["max_uses"]}
+
+    updated = coupons_col.find_one_and_update(
+        query,
+        {"$inc": {"redeemed_count": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not updated:
+        if rule["per_user_limit"]:
+            _release_user_use(code, email)
+        raise HTTPException(status_code=409, detail="Coupon usage limit reached")
+
+
+def release_coupon(code: str, email: str, via: Optional[str] = None):
+    """
+    Give back a use claimed by redeem_coupon (cancelled or failed order).
+    The Redis counters only hold uses claimed through Redis (`via`, as
+    returned by redeem_coupon; orders without it used Redis).
+    """
+    code = normalize_code(code)
+    if not code:
+        return
+
+    coupons_col.update_one(
+        {"code": code, "redeemed_count": {"$gt": 0}},
+        {"$inc": {"redeemed_count": -1}}
+    )
+    _release_user_use(code, email)
+
+    if via != "mongo":
+        _release_counters([uses_key(code), user_uses_key(code, email)])
+
+
+def coupon_usage(code: str) -> dict:
+    code = normalize_code(code)
+    doc = coupons_col.find_one({"code": code}, {"_id": 0})
+    if not doc:
+        raise HTTPException(status_code=404, detail="Coupon not found")
+
+    live_count = None
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            live_count = int(redis_client.get(uses_key(code)) or 0)
+        except Exception:
+            live_count = None
+
+    return {
+        "code": code,
+        "redeemed_count": doc.get("redeemed_count", 0),
+        "live_count": live_count,
+        "max_uses": doc.get("max_uses", 0),
+        "per_user_limit": doc.get("per_user_limit", 0),
+        "active": doc.get("active", True),
+    }
@@ -0,0 +1,293 @@
+"""
+Delivery Batching
+Groups open orders (PLACED / PREPARING) into rider batches with ordered
+stop lists.
+
+- Orders are grouped by delivery zone and window: the promised time
+  (created_at + DELIVERY_PROMISE_MINUTES) floored to DELIVERY_WINDOW_MINUTES
+  of local time. Orders without a zone (no zones configured) are grouped by
+  the first three pincode digits, i.e. the sorting district
+- Within a group, orders for the same address form one stop; stops are
+  ordered by pincode (neighbouring pincodes are neighbouring areas) and cut
+  into the fewest batches that respect DELIVERY_BATCH_MAX_ORDERS /
+  DELIVERY_BATCH_MAX_ITEMS, balanced so the last rider isn't left with a
+  single order. Batches are contiguous runs of stops, so each rider covers
+  one stretch of pincodes
+- Incremental: DeliveryPlanner keeps the groups and only re-plans groups
+  whose orders changed. refresh_plan() feeds it the orders updated since
+  the previous refresh, so a refresh costs one indexed query plus the
+  changed groups
+
+There is no geocoding in the app, so pincodes are the only notion of
+distance.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.config import (
+    DELIVERY_BATCH_MAX_ITEMS,
+    DELIVERY_BATCH_MAX_ORDERS,
+    DELIVERY_PROMISE_MINUTES,
+    DELIVERY_REFRESH_OVERLAP_SECONDS,
+    DELIVERY_WINDOW_MINUTES,
+    SERVICE_UTC_OFFSET_MINUTES,
+)
+from app.database import orders_col
+from app.services.serviceability import normalize_pincode
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OPEN_STATUSES = ["PLACED", "PREPARING"]
+PROJECTION = {
+    "_id": 0, "order_id": 1, "user_email": 1, "status": 1, "items.quantity": 1,
+    "delivery_address": 1, "delivery_zone": 1, "created_at": 1, "updated_at": 1,
+}
+
+
+def _address_key(address: dict) -> str:
+    return " ".join(str(address.get("addressLine") or "").lower().split())
+
+
+def delivery_window(promised_at: datetime, window_minutes: int = DELIVERY_WINDOW_MINUTES) -> datetime:
+    """Start (UTC, naive) of the local-time window containing `promised_at`"""
+    local = promised_at + timedelta(minutes=SERVICE_UTC_OFFSET_MINUTES)
+    minutes = local.hour * 60 + local.minute
+    start = local.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(
+        minutes=minutes - minutes % window_minutes
+    )
+    return start - timedelta(minutes=SERVICE_UTC_OFFSET_MINUTES)
+
+
+def order_entry(doc: dict, promise_minutes: int = DELIVERY_PROMISE_MINUTES,
+                window_minutes: int = DELIVERY_WINDOW_MINUTES) -> dict:
+    """The fields of an order the planner works with"""
+    address = doc.get("delivery_address") or {}
+    pincode = normalize_pincode(address.get("pincode")) or 0
+    promised_at = doc["created_at"] + timedelta(minutes=promise_minutes)
+    return {
+        "order_id": doc["order_id"],
+        "zone": doc.get("delivery_zone") or f"pin-{str(pincode)[:3] if pincode else 'unknown'}",
+        "window": delivery_window(promised_at, window_minutes),
+        "pincode": pincode,
+        "address_key": _address_key(address),
+        "address": address,
+        "items": sum(int(item.get("quantity", 0)) for item in doc.get("items", [])),
+        "promised_at": promised_at,
+        "updated_at": doc.get("updated_at"),
+    }
+
+
+# =========================
+# BATCHING
+# =========================
+
+def _stops(entries: list, max_orders: int, max_items: int) -> list:
+    """Orders for the same address grouped into stops, in route order"""
+    stops = {}
+    for entry in sorted(entries, key=lambda e: (e["pincode"], e["address_key"], e["promised_at"])):
+        stops.setdefault((entry["pincode"], entry["address_key"]), []).append(entry)
+
+    result = []
+    for orders in stops.values():
+        # A stop bigger than a rider's capacity (e.g. an office) is split
+        chunk, items = [], 0
+        for entry in orders:
+            if chunk and (len(chunk) >= max_orders or items + entry["items"] > max_items):
+                result.append(chunk)
+                chunk, items = [], 0
+            chunk.append(entry)
+            items += entry["items"]
+        result.append(chunk)
+    return result
+
+
+def _cut(sizes: list, order_cap: float, item_cap: float) -> list:
+    """Greedy cut of stops (orders, items) into batches; returns batch start indexes"""
+    starts, orders, items = [0], 0, 0
+    for index, (stop_orders, stop_items) in enumerate(sizes):
+        if orders and (orders + stop_orders > order_cap or items + stop_items > item_cap):
+            starts.append(index)
+            orders, items = 0, 0
+        orders += stop_orders
+        items += stop_items
+    return starts
+
+
+def build_batches(entries: list, max_orders: int = DELIVERY_BATCH_MAX_ORDERS,
+                  max_items: int = DELIVERY_BATCH_MAX_ITEMS) -> list:
+    """Cut one zone/window group into batches; each batch is a list of stops"""
+    if not entries:
+        return []
+    stops = _stops(entries, max_orders, max_items)
+    sizes = [(len(stop), sum(entry["items"] for entry in stop)) for stop in stops]
+
+    # Fewest riders: greedy at full capacity. Then balance them: the smallest
+    # fraction of capacity that still needs no more riders (binary search)
+    starts = _cut(sizes, max_orders, max_items)
+    riders = len(starts)
+    low, high = 0.0, 1.0
+    for _ in range(12):
+        middle = (low + high) / 2
+        candidate = _cut(sizes, max_orders * middle, max_items * middle)
+        if len(candidate) <= riders:
+            high, starts = middle, candidate
+        else:
+            low = middle
+
+    return [stops[start:end] for start, end in zip(starts, starts[1:] + [len(stops)])]
+
+
+def _present(zone: str, window: datetime, number: int, stops: list, window_minutes: int) -> dict:
+    orders = [entry for stop in stops for entry in stop]
+    return {
+        "batch_id": f"{zone}/{window:%Y%m%d%H%M}/{number}",
+        "zone": zone,
+        "window_start": window,
+        "window_end": window + timedelta(minutes=window_minutes),
+        "deliver_by": min(entry["promised_at"] for entry in orders),
+        "orders": len(orders),
+        "items": sum(entry["items"] for entry in orders),
+        "stops": [
+            {
+                "sequence": sequence,
+                "pincode": str(stop[0]["pincode"]) if stop[0]["pincode"] else None,
+                "address": stop[0]["address"],
+                "order_ids": [entry["order_id"] for entry in stop],
+                "items": sum(entry["items"] for entry in stop),
+            }
+            for sequence, stop in enumerate(stops, 1)
+        ],
+    }
+
+
+class DeliveryPlanner:
+    """Open orders grouped by (zone, window), with batches per group"""
+
+    def __init__(
+        self,
+        max_orders: int = DELIVERY_BATCH_MAX_ORDERS,
+        max_items: int = DELIVERY_BATCH_MAX_ITEMS,
+        promise_minutes: int = DELIVERY_PROMISE_MINUTES,
+        window_minutes: int = DELIVERY_WINDOW_MINUTES,
+    ):
+        self.max_orders = max_orders
+        self.max_items = max_items
+        self.promise_minutes = promise_minutes
+        self.window_minutes = window_minutes
+        self.orders = {}    # order_id -> entry
+        self.groups = {}    # (zone, window) -> {order_id: entry}
+        self.batches = {}   # (zone, window) -> [batch]
+        self.dirty = set()
+
+    def _group_key(self, entry: dict) -> tuple:
+        return entry["zone"], entry["window"]
+
+    def remove(self, order_id: str):
+        entry = self.orders.pop(order_id, None)
+        if entry is None:
+            return
+        key = self._group_key(entry)
+        group = self.groups[key]
+        del group[order_id]
+        if not group:
+            del self.groups[key]
+        self.dirty.add(key)
+
+    def upsert(self, doc: dict):
+        """Apply an order document: open orders are (re)placed, others dropped"""
+        order_id = doc["order_id"]
+        known = self.orders.get(order_id)
+        if doc.get("status") not in OPEN_STATUSES:
+            self.remove(order_id)
+            return
+        if known is not None and known["updated_at"] == doc.get("updated_at"):
+            return
+        self.remove(order_id)
+        entry = order_entry(doc, self.promise_minutes, self.window_minutes)
+        key = self._group_key(entry)
+        self.orders[order_id] = entry
+        self.groups.setdefault(key, {})[order_id] = entry
+        self.dirty.add(key)
+
+    def plan(self) -> int:
+        """Re-plan the groups that changed; returns how many were re-planned"""
+        dirty, self.dirty = self.dirty, set()
+        for key in dirty:
+            group = self.groups.get(key)
+            if not group:
+                self.batches.pop(key, None)
+                continue
+            zone, window = key
+            self.batches[key] = [
+                _present(zone, window, number, stops, self.window_minutes)
+                for number, stops in enumerate(build_batches(list(group.values()), self.max_orders, self.max_items), 1)
+            ]
+        return len(dirty)
+
+    def current_batches(self, zone: Optional[str] = None, window: Optional[datetime] = None) -> list:
+        """Batches by window, then zone"""
+        return [
+            batch
+            for key in sorted(self.batches, key=lambda k: (k[1], k[0]))
+            if (zone is None or key[0] == zone) and (window is None or key[1] == window)
+            for batch in self.batches[key]
+        ]
+
+
+# =========================
+# LIVE PLAN (per worker)
+# =========================
+
+_planner: Optional[DeliveryPlanner] = None
+_seen_until: Optional[datetime] = None
+_planner_lock = threading.RLock()
+
+
+def refresh_plan() -> dict:
+    """
+    Bring this worker's planner up to date with the orders collection.
+    The first call loads every open order; later calls only read orders
+    updated since the previous call.
+    """
+    global _planner, _seen_until
+    with _planner_lock:
+        started = time.perf_counter()
+        if _planner is None:
+            planner = DeliveryPlanner()
+            query = {"status": {"$in": OPEN_STATUSES}}
+        else:
+            planner = _planner
+            query = {"updated_at": {"$gte": _seen_until - timedelta(seconds=DELIVERY_REFRESH_OVERLAP_SECONDS)}}
+
+        seen_until, changed = _seen_until, 0
+        for doc in orders_col.find(query, PROJECTION):
+            if not doc.get("created_at"):
+                continue
+            planner.upsert(doc)
+            changed += 1
+            if doc.get("updated_at") and (seen_until is None or doc["updated_at"] > seen_until):
+                seen_until = doc["updated_at"]
+        replanned = planner.plan()
+
+        _planner = planner
+        _seen_until = seen_until or datetime.utcnow()
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    logger.debug("Delivery plan refresh: %d orders read, %d groups re-planned in %sms", changed, replanned, took_ms)
+    return {
+        "open_orders": len(planner.orders),
+        "orders_read": changed,
+        "groups_replanned": replanned,
+        "took_ms": took_ms,
+    }
+
+
+def current_plan(zone: Optional[str] = None, window: Optional[datetime] = None) -> dict:
+    with _planner_lock:
+        stats = refresh_plan()
+        batches = _planner.current_batches(zone, window)
+    return {**stats, "batch_count": len(batches), "batches": batches}
@@ -0,0 +1,386 @@
+"""
+Inventory
+Per-day stock of menu items (portions cooked) with oversell-proof
+reservation at checkout.
+
+- Stock is set per local day and item by an admin (inventory collection:
+  {day, item_id, stock, sold}). Items without a stock entry are unlimited,
+  which is how every item behaved before inventory existed
+- Redis holds the live counts per day: inventory:{day}:stock (item ->
+  portions, plus a "_loaded" marker) and inventory:{day}:reserved
+  (item -> portions taken). They are loaded from Mongo on first use, with
+  "reserved" rebuilt from that day's orders
+- Checkout reserves every cart line in one Lua script: all lines or none,
+  atomically, so concurrent buyers of the last portions can't oversell.
+  The order stores what it took and from which store (inventory_day,
+  reserved_stock, reserved_via) and cancellation gives exactly that back
+  to the same store
+- reconcile() (scripts/reconcile_inventory.py, every few minutes) recounts
+  sold portions from the orders, stores them on the inventory documents and
+  repairs Redis: counts lost in a failover are raised back, and a surplus
+  seen on two consecutive runs (a reservation whose checkout died before
+  the order was written) is released
+
+Without Redis, reservations fall back to conditional $inc on the inventory
+documents (one item at a time, undone if a later line fails). Redis
+reservations only reach "sold" through reconcile(), so the fallback first
+raises it to the count of the day's orders.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from app.config import INVENTORY_KEY_TTL_SECONDS, SERVICE_UTC_OFFSET_MINUTES
+from app.database import inventory_col, orders_col
+from app.utils.redis_client import get_redis, get_script
+from app.utils.read_routing import use_preference
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LOCAL_TZ = timezone(timedelta(minutes=SERVICE_UTC_OFFSET_MINUTES))
+LOADED = "_loaded"
+
+# KEYS[1] = stock hash, KEYS[2] = reserved hash
+# ARGV = item, quantity, item, quantity, ...
+# Returns {0, tracked lines...} on success, -1 when the day isn't loaded,
+# or {line, remaining} for the first line that can't be served (lines are
+# 1-based; untracked items are not counted)
+RESERVE_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+local tracked = {}
+local lines = {0}
+for i = 1, #ARGV, 2 do
+    local stock = redis.call('HGET', KEYS[1], ARGV[i])
+    if stock then
+        local reserved = tonumber(redis.call('HGET', KEYS[2], ARGV[i]) or '0')
+        local remaining = tonumber(stock) - reserved
+        if tonumber(ARGV[i + 1]) > remaining then
+            return {(i + 1) / 2, math.max(remaining, 0)}
+        end
+        tracked[#tracked + 1] = i
+        lines[#lines + 1] = (i + 1) / 2
+    end
+end
+for _, i in ipairs(tracked) do
+    redis.call('HINCRBY', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+return lines
+"""
+
+# Give portions back (cancellation, failed checkout), never below zero
+RELEASE_LUA = """
+for i = 1, #ARGV, 2 do
+    local reserved = tonumber(redis.call('HGET', KEYS[1], ARGV[i]) or '0')
+    local release = math.min(reserved, tonumber(ARGV[i + 1]))
+    if release > 0 then
+        redis.call('HINCRBY', KEYS[1], ARGV[i], -release)
+    end
+end
+return 1
+"""
+
+# Load a day unless another worker already did. ARGV[1] = ttl, then
+# item, stock, reserved triples
+LOAD_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[2])
+redis.call('HSET', KEYS[1], '_loaded', 1)
+for i = 2, #ARGV, 3 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    if tonumber(ARGV[i + 2]) > 0 then
+        redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 2])
+    end
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+def today() -> str:
+    return datetime.now(LOCAL_TZ).strftime("%Y-%m-%d")
+
+
+def stock_key(day: str) -> str:
+    return f"inventory:{day}:stock"
+
+
+def reserved_key(day: str) -> str:
+    return f"inventory:{day}:reserved"
+
+
+def cart_lines(items: list) -> dict:
+    """item id -> total quantity (the same dish can appear on several lines)"""
+    lines = Counter()
+    for item in items:
+        if item["quantity"] < 1:
+            raise HTTPException(status_code=400, detail=f"Invalid quantity for {item['name']}")
+        lines[item["id"]] += item["quantity"]
+    return dict(lines)
+
+
+def _flatten(lines: dict) -> list:
+    return [value for item_id, quantity in lines.items() for value in (item_id, quantity)]
+
+
+# =========================
+# LOADING
+# =========================
+
+def sold_from_orders(day: str) -> Counter:
+    """Portions taken by the day's orders that aren't cancelled"""
+    sold = Counter()
+    for order in orders_col.find(
+        {"inventory_day": day, "status": {"$ne": "CANCELLED"}}, {"_id": 0, "reserved_stock": 1}
+    ):
+        sold.update(order.get("reserved_stock") or {})
+    return sold
+
+
+def ensure_loaded(day: str) -> bool:
+    """Load the day's stock into Redis if no worker has yet; False without Redis"""
+    redis_client = get_redis()
+    if not redis_client:
+        return False
+    if redis_client.exists(stock_key(day)):
+        return True
+
+    # From the primary even inside @secondary_reads routes: a lagging
+    # secondary would undercount what is already sold
+    with use_preference(None):
+        stock = {doc["item_id"]: doc["stock"] for doc in inventory_col.find({"day": day}, {"_id": 0})}
+        sold = sold_from_orders(day)
+    args = [INVENTORY_KEY_TTL_SECONDS]
+    for item_id, portions in stock.items():
+        args += [item_id, portions, sold.get(item_id, 0)]
+    get_script(LOAD_LUA)(keys=[stock_key(day), reserved_key(day)], args=args)
+    logger.info("Loaded inventory for %s: %d items", day, len(stock))
+    return True
+
+
+# =========================
+# RESERVATION
+# =========================
+
+def _sold_out(item_name: str, remaining: int) -> HTTPException:
+    if remaining <= 0:
+        return HTTPException(status_code=409, detail=f"{item_name} is sold out for today")
+    return HTTPException(status_code=409, detail=f"Only {remaining} portion{'s' if remaining != 1 else ''} of {item_name} left today")
+
+
+def reserve(items: list, day: Optional[str] = None) -> tuple:
+    """
+    Take stock for every cart line, all or nothing.
+    Returns (day, {item_id: quantity}, via) of the tracked lines, to be
+    stored on the order; via is the store that holds the reservation
+    ("redis" or "mongo"). Raises HTTPException(409) when a line can't be
+    served.
+    """
+    day = day or today()
+    lines = cart_lines(items)
+    names = {item["id"]: item["name"] for item in items}
+
+    script = get_script(RESERVE_LUA)
+    if script is not None:
+        try:
+            keys = [stock_key(day), reserved_key(day)]
+            result = script(keys=keys, args=_flatten(lines))
+            if result == -1:
+                ensure_loaded(day)
+                result = script(keys=keys, args=_flatten(lines))
+        except Exception as e:
+            logger.warning("Stock reservation via Redis failed, using MongoDB: %s", e)
+        else:
+            item_ids = list(lines)
+            if result[0] != 0:
+                line, left = result
+                raise _sold_out(names[item_ids[line - 1]], left)
+            # Only tracked items were taken; a cancellation releases exactly these
+            return day, {item_ids[line - 1]: lines[item_ids[line - 1]] for line in result[1:]}, "redis"
+
+    return day, _reserve_with_mongo(day, lines, names), "mongo"
+
+
+def _reserve_with_mongo(day: str, lines: dict, names: dict) -> dict:
+    """Fallback when Redis is unavailable: conditional $inc per item, undone on failure"""
+    with use_preference(None):
+        sold = sold_from_orders(day)
+    docs = {}
+    for item_id in lines:
+        # Portions Redis handed out aren't in "sold" until the next reconcile()
+        doc = inventory_col.find_one_and_update(
+            {"day": day, "item_id": item_id},
+            {"$max": {"sold": sold.get(item_id, 0)}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None:
+            docs[item_id] = doc
+    taken = {}
+    for item_id, quantity in lines.items():
+        doc = docs.get(item_id)
+        if doc is None:
+            continue
+        updated = inventory_col.find_one_and_update(
+            {"day": day, "item_id": item_id, "sold": {"$lte": doc["stock"] - quantity}},
+            {"$inc": {"sold": quantity}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if updated is None:
+            _release_with_mongo(day, taken)
+            current = inventory_col.find_one({"day": day, "item_id": item_id}) or doc
+            raise _sold_out(names[item_id], current["stock"] - current.get("sold", 0))
+        taken[item_id] = quantity
+    return taken
+
+
+def _release_with_mongo(day: str, lines: dict):
+    for item_id, quantity in lines.items():
+        inventory_col.update_one(
+            {"day": day, "item_id": item_id, "sold": {"$gte": quantity}},
+            {"$inc": {"sold": -quantity}},
+        )
+
+
+def release(day: Optional[str], lines: Optional[dict], via: Optional[str] = None):
+    """
+    Give back what reserve() took (cancelled order or failed checkout) to
+    the store it was taken from (orders without reserved_via used Redis).
+    A Redis reservation that can't be given back now shows up as surplus
+    and is released by reconcile().
+    """
+    if not day or not lines:
+        return
+    if via == "mongo":
+        _release_with_mongo(day, lines)
+        return
+    script = get_script(RELEASE_LUA)
+    if script is None:
+        logger.warning("Stock release of %s on %s skipped: Redis unavailable", lines, day)
+        return
+    try:
+        script(keys=[reserved_key(day)], args=_flatten(lines))
+    except Exception as e:
+        logger.warning("Stock release via Redis failed, left to reconcile: %s", e)
+
+
+# =========================
+# READS / ADMIN
+# =========================
+
+def remaining(day: Optional[str] = None) -> dict:
+    """item id -> portions left, for items with stock set (one round trip once loaded)"""
+    day = day or today()
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            if ensure_loaded(day):
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.hgetall(stock_key(day))
+                pipe.hgetall(reserved_key(day))
+                stock, reserved = pipe.execute()
+                stock.pop(LOADED, None)
+                return {item_id: max(int(portions) - int(reserved.get(item_id, 0)), 0)
+                        for item_id, portions in stock.items()}
+        except Exception as e:
+            logger.warning("Inventory read error: %s", e)
+
+    return {doc["item_id"]: max(doc["stock"] - doc.get("sold", 0), 0)
+            for doc in inventory_col.find({"day": day}, {"_id": 0})}
+
+
+def set_stock(day: str, stock: dict):
+    """Set (or with None, stop tracking) the portions of items for a day"""
+    now = datetime.utcnow()
+    for item_id, portions in stock.items():
+        if portions is None:
+            inventory_col.delete_one({"day": day, "item_id": item_id})
+        else:
+            inventory_col.update_one(
+                {"day": day, "item_id": item_id},
+                {"$set": {"stock": portions, "updated_at": now}, "$setOnInsert": {"sold": 0}},
+                upsert=True,
+            )
+
+    if ensure_loaded(day):
+        redis_client = get_redis()
+        pipe = redis_client.pipeline(transaction=False)
+        removed = [item_id for item_id, portions in stock.items() if portions is None]
+        if removed:
+            pipe.hdel(stock_key(day), *removed)
+        updated = {item_id: portions for item_id, portions in stock.items() if portions is not None}
+        if updated:
+            pipe.hset(stock_key(day), mapping=updated)
+        pipe.execute()
+
+
+def stock_report(day: str) -> list:
+    live = remaining(day)
+    return [
+        {
+            "item_id": doc["item_id"],
+            "stock": doc["stock"],
+            "remaining": live.get(doc["item_id"]),
+            "sold": doc.get("sold", 0),
+            "reconciled_at": doc.get("reconciled_at"),
+        }
+        for doc in inventory_col.find({"day": day}, {"_id": 0}).sort("item_id", 1)
+    ]
+
+
+def reconcile(day: Optional[str] = None) -> list:
+    """
+    Recount sold portions from the orders into Mongo and repair Redis.
+    Returns one entry per tracked item.
+    """
+    day = day or today()
+    # Documents first: a fallback reservation whose order lands in between
+    # is counted twice until the next run rather than not at all
+    docs = list(inventory_col.find({"day": day}))
+    sold = sold_from_orders(day)
+
+    reserved = None
+    redis_client = get_redis()
+    if redis_client and redis_client.exists(stock_key(day)):
+        reserved = redis_client.hgetall(reserved_key(day))
+
+    now = datetime.utcnow()
+    report = []
+    for doc in docs:
+        item_id = doc["item_id"]
+        entry = {"item_id": item_id, "stock": doc["stock"], "sold": sold.get(item_id, 0),
+                 "reserved": None, "raised": 0, "released": 0}
+        surplus = 0
+        if reserved is not None:
+            entry["reserved"] = int(reserved.get(item_id, 0))
+            drift = entry["reserved"] - entry["sold"]
+            if drift < 0:
+                # Redis lost reservations (failover): never let it oversell
+                redis_client.hincrby(reserved_key(day), item_id, -drift)
+                entry["raised"] = -drift
+            elif drift > 0:
+                # In-flight checkouts explain a surplus once; one that is
+                # still there on the next run leaked
+                leaked = min(drift, doc.get("surplus", 0))
+                if leaked:
+                    release(day, {item_id: leaked})
+                    entry["released"] = leaked
+                surplus = drift - leaked
+        # As a delta, so fallback reservations made meanwhile are kept
+        inventory_col.update_one(
+            {"_id": doc["_id"]},
+            {"$inc": {"sold": entry["sold"] - doc.get("sold", 0)},
+             "$set": {"surplus": surplus, "reconciled_at": now}},
+        )
+        if entry["raised"] or entry["released"]:
+            logger.warning("Inventory drift for %s on %s: %s", item_id, day, entry)
+        report.append(entry)
+    return report
@@ -0,0 +1,656 @@
+"""
+Order Analytics
+Columnar snapshots of the orders for admin reports, so ad-hoc questions
+(revenue by hour / category / pincode, coupon effectiveness, basket size)
+never run aggregation pipelines against Mongo.
+
+Export (scripts/export_analytics.py, e.g. every 10 minutes from cron):
+- Streams orders changed since the watermark (updated_at, _id), reading
+  from a secondary when there is one. Orders are only exported once they
+  have been unchanged for ANALYTICS_EXPORT_LAG_SECONDS. The first export
+  also reads orders_archive
+- Each run appends segments of at most ANALYTICS_SEGMENT_ROWS orders, one
+  .npy file per column, and then atomically replaces manifest.json
+  (segments, watermark, string dictionaries). A crashed run leaves
+  unreferenced segment directories that the next run deletes
+- A re-exported order (status changed, cancelled) supersedes its older
+  row: readers keep the last row per order key. Once there are more than
+  ANALYTICS_MAX_SEGMENTS segments they are merged into one
+
+Reports load the columns with np.load(mmap_mode="r"), de-duplicate once
+per manifest version and aggregate with bincount / unique over whole
+columns. Strings (coupon codes, items, categories, zones) are stored as
+int32 codes into the manifest dictionaries; customers as 64-bit hashes.
+
+Layout:
+    ANALYTICS_DIR/manifest.json
+    ANALYTICS_DIR/000001/orders.created.npy, lines.item.npy, ...
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from bson import ObjectId
+from pymongo.read_preferences import SecondaryPreferred
+
+from app.config import (
+    ANALYTICS_DIR,
+    ANALYTICS_EXPORT_LAG_SECONDS,
+    ANALYTICS_SEGMENT_ROWS,
+    ANALYTICS_MAX_SEGMENTS,
+    READ_MAX_STALENESS_SECONDS,
+    SERVICE_UTC_OFFSET_MINUTES,
+)
+from app.database import orders_col, orders_archive_col, menu_col
+from app.services.serviceability import PIN_BASE, PIN_SLOTS, normalize_pincode
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST = "manifest.json"
+LOCAL_OFFSET_SECONDS = SERVICE_UTC_OFFSET_MINUTES * 60
+
+ORDER_COLUMNS = {
+    "key": np.uint64,        # hash of the order _id
+    "created": np.int64,     # epoch seconds (UTC)
+    "status": np.int16,
+    "final": np.int64,       # paise
+    "gross": np.int64,
+    "discount": np.int64,
+    "fee": np.int64,
+    "quantity": np.int32,    # items in the basket
+    "coupon": np.int32,      # -1 = no coupon
+    "zone": np.int32,        # -1 = no zone
+    "pincode": np.int32,     # 0 = unknown
+    "payment": np.int32,
+    "customer": np.uint64,   # hash of user_email
+}
+LINE_COLUMNS = {
+    "order": np.int64,       # row of the order in its segment
+    "item": np.int32,
+    "category": np.int32,
+    "quantity": np.int32,
+    "amount": np.int64,      # price * quantity, paise
+}
+DICTIONARIES = ("status", "coupon", "zone", "payment", "item", "category")
+
+PROJECTION = {
+    "_id": 1, "user_email": 1, "items": 1, "status": 1, "created_at": 1, "updated_at": 1,
+    "total_amount": 1, "discount_amount": 1, "delivery_fee": 1, "final_amount": 1,
+    "coupon_code": 1, "delivery_zone": 1, "delivery_address.pincode": 1, "payment_method": 1,
+}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+
+def _paise(amount) -> int:
+    return int(round(float(amount or 0) * 100))
+
+
+def _epoch(when: datetime) -> int:
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp())
+
+
+class Codes:
+    """String dictionary: value <-> dense int code"""
+
+    def __init__(self, values: Optional[list] = None):
+        self.values = list(values or [])
+        self.index = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value) -> int:
+        if value is None or value == "":
+            return -1
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+# =========================
+# EXPORT
+# =========================
+
+def _manifest_path() -> str:
+    return os.path.join(ANALYTICS_DIR, MANIFEST)
+
+
+def read_manifest() -> Optional[dict]:
+    try:
+        with open(_manifest_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(manifest: dict):
+    tmp = _manifest_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, _manifest_path())
+
+
+@contextmanager
+def _export_lock():
+    """One exporter at a time (cron overlap, manual runs)"""
+    os.makedirs(ANALYTICS_DIR, exist_ok=True)
+    with open(os.path.join(ANALYTICS_DIR, ".lock"), "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError("Another analytics export is running")
+        yield
+
+
+def _menu_categories() -> dict:
+    """Menu item id (as stored on order lines) -> category"""
+    return {
+        f"MENU-{str(item['_id'])[-6:]}": item.get("category", "general")
+        for item in menu_col.find({}, {"category": 1})
+    }
+
+
+class SegmentWriter:
+    """Buffers exported orders column by column and writes segment directories"""
+
+    def __init__(self, manifest: dict):
+        self.manifest = manifest
+        self.codes = {name: Codes(manifest["dictionaries"].get(name)) for name in DICTIONARIES}
+        # Display name per item code (first name seen)
+        self.item_names = list(manifest["dictionaries"].get("item_name", []))
+        self.categories = _menu_categories()
+        self._reset()
+
+    def _reset(self):
+        self.orders = {name: [] for name in ORDER_COLUMNS}
+        self.lines = {name: [] for name in LINE_COLUMNS}
+
+    @property
+    def rows(self) -> int:
+        return len(self.orders["key"])
+
+    def add(self, doc: dict):
+        codes, orders, lines = self.codes, self.orders, self.lines
+        row = self.rows
+        items = doc.get("items") or []
+
+        orders["key"].append(_hash64(str(doc["_id"])))
+        orders["created"].append(_epoch(doc["created_at"]))
+        orders["status"].append(codes["status"].code(doc.get("status")))
+        orders["final"].append(_paise(doc.get("final_amount", doc.get("total_amount"))))
+        orders["gross"].append(_paise(doc.get("total_amount")))
+        orders["discount"].append(_paise(doc.get("discount_amount")))
+        orders["fee"].append(_paise(doc.get("delivery_fee")))
+        orders["quantity"].append(sum(int(item.get("quantity", 0)) for item in items))
+        orders["coupon"].append(codes["coupon"].code(doc.get("coupon_code")))
+        orders["zone"].append(codes["zone"].code(doc.get("delivery_zone")))
+        orders["pincode"].append(normalize_pincode((doc.get("delivery_address") or {}).get("pincode")) or 0)
+        orders["payment"].append(codes["payment"].code(doc.get("payment_method")))
+        orders["customer"].append(_hash64(doc.get("user_email") or ""))
+
+        for item in items:
+            item_id = item.get("id") or item.get("name")
+            item_code = codes["item"].code(item_id)
+            if item_code == len(self.item_names):
+                self.item_names.append(item.get("name") or item_id)
+            lines["order"].append(row)
+            lines["item"].append(item_code)
+            lines["category"].append(codes["category"].code(self.categories.get(item_id, "general")))
+            lines["quantity"].append(int(item.get("quantity", 0)))
+            lines["amount"].append(_paise(item.get("price")) * int(item.get("quantity", 0)))
+
+    def flush(self) -> Optional[str]:
+        """Write the buffered rows as a new segment; returns its name"""
+        if not self.rows:
+            return None
+        columns = {f"orders.{name}": np.asarray(values, dtype=ORDER_COLUMNS[name])
+                   for name, values in self.orders.items()}
+        columns.update({f"lines.{name}": np.asarray(values, dtype=LINE_COLUMNS[name])
+                        for name, values in self.lines.items()})
+        name = write_segment(self.manifest, columns)
+        self._reset()
+        return name
+
+    def dictionaries(self) -> dict:
+        return {**{name: codes.values for name, codes in self.codes.items()}, "item_name": self.item_names}
+
+
+def write_segment(manifest: dict, columns: dict) -> str:
+    """Write column arrays to a new segment directory (not yet in the manifest)"""
+    name = f"{manifest['next_segment']:06d}"
+    manifest["next_segment"] += 1
+    tmp = os.path.join(ANALYTICS_DIR, f".{name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for column, values in columns.items():
+        np.save(os.path.join(tmp, f"{column}.npy"), values)
+    os.replace(tmp, os.path.join(ANALYTICS_DIR, name))
+    return name
+
+
+def _remove_orphans(manifest: dict):
+    """Segment directories of crashed runs or merged segments"""
+    keep = set(manifest["segments"])
+    for entry in os.listdir(ANALYTICS_DIR):
+        path = os.path.join(ANALYTICS_DIR, entry)
+        if os.path.isdir(path) and entry not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _empty_manifest() -> dict:
+    return {"version": 0, "segments": [], "next_segment": 1, "watermark": None,
+            "rows": 0, "compacted": False, "dictionaries": {}, "exported_at": None}
+
+
+def _changed_since(watermark: Optional[dict], upper: datetime) -> dict:
+    query = {"updated_at": {"$lt": upper}}
+    if watermark:
+        at, last_id = datetime.fromisoformat(watermark["updated_at"]), ObjectId(watermark["_id"])
+        query["$or"] = [{"updated_at": {"$gt": at}}, {"updated_at": at, "_id": {"$gt": last_id}}]
+    return query
+
+
+def export_orders(rebuild: bool = False, on_segment=None) -> dict:
+    """
+    Append orders changed since the last export to the snapshot.
+    `rebuild` starts over from an empty snapshot. Returns the new manifest.
+    """
+    with _export_lock():
+        current = read_manifest() or _empty_manifest()
+        _remove_orphans(current)
+        manifest = current
+        if rebuild:
+            # Segment names keep counting up: the live ones stay readable
+            manifest = {**_empty_manifest(), "version": current["version"],
+                        "next_segment": current["next_segment"]}
+        first_export = manifest["watermark"] is None
+        upper = datetime.utcnow() - timedelta(seconds=ANALYTICS_EXPORT_LAG_SECONDS)
+        query = _changed_since(manifest["watermark"], upper)
+        # Reports don't need the primary; a lagging secondary is fine
+        preference = SecondaryPreferred(max_staleness=READ_MAX_STALENESS_SECONDS)
+
+        writer = SegmentWriter(manifest)
+        segments, exported, watermark = [], 0, manifest["watermark"]
+        sources = [orders_archive_col, orders_col] if first_export else [orders_col]
+        for source in sources:
+            cursor = source.with_options(read_preference=preference).find(query, PROJECTION)
+            if source is orders_col:
+                cursor = cursor.sort([("updated_at", 1), ("_id", 1)])
+            for doc in cursor:
+                if not doc.get("created_at"):
+                    continue
+                writer.add(doc)
+                exported += 1
+                if source is orders_col:
+                    watermark = {"updated_at": doc["updated_at"].isoformat(), "_id": str(doc["_id"])}
+                if writer.rows >= ANALYTICS_SEGMENT_ROWS:
+                    segments.append(writer.flush())
+                    if on_segment:
+                        on_segment(exported)
+        segments.append(writer.flush())
+        segments = [name for name in segments if name]
+        if watermark is None:
+            # Nothing in the hot tier yet: don't re-read the archive next time
+            watermark = {"updated_at": upper.isoformat(), "_id": str(ObjectId(b"\0" * 12))}
+
+        manifest.update(
+            version=manifest["version"] + 1,
+            segments=manifest["segments"] + segments,
+            watermark=watermark,
+            rows=manifest["rows"] + exported,
+            dictionaries=writer.dictionaries(),
+            exported_at=datetime.utcnow().isoformat(),
+            compacted=manifest["compacted"] and not segments,
+        )
+        # The first export may hold an order twice (archived but not yet
+        # deleted from the hot tier), so it is always compacted
+        if first_export or len(manifest["segments"]) > ANALYTICS_MAX_SEGMENTS:
+            _compact(manifest)
+        _write_manifest(manifest)
+        _remove_orphans(manifest)
+
+    logger.info("Exported %d orders into %d analytics segments", exported, len(segments))
+    return manifest
+
+
+def _compact(manifest: dict):
+    """Merge all segments into one, dropping superseded order rows"""
+    snapshot = Snapshot(manifest)
+    columns = {f"orders.{name}": values for name, values in snapshot.orders.items()}
+    columns.update({f"lines.{name}": values for name, values in snapshot.lines.items()})
+    manifest["segments"] = [write_segment(manifest, columns)]
+    manifest["rows"] = snapshot.size
+    manifest["compacted"] = True
+    logger.info("Compacted analytics snapshot to %d orders", snapshot.size)
+
+
+# =========================
+# SNAPSHOT (read side)
+# =========================
+
+def _run_ends(sorted_values):
+    """Mask of the last element of each run of equal values"""
+    ends = np.ones(len(sorted_values), dtype=bool)
+    ends[:-1] = sorted_values[1:] != sorted_values[:-1]
+    return ends
+
+
+def _count_distinct(values) -> int:
+    # Sort + compare: much faster than np.unique for large integer arrays
+    return int(_run_ends(np.sort(values)).sum())
+
+
+class Snapshot:
+    """
+    Deduplicated columns of one manifest version. A compacted snapshot is
+    used as memory-mapped; otherwise the segments are concatenated and
+    de-duplicated once here.
+    """
+
+    def __init__(self, manifest: dict):
+        self.manifest = manifest
+        self.dictionaries = manifest["dictionaries"]
+        segments = [self._load(name) for name in manifest["segments"]]
+
+        if len(segments) == 1 and manifest.get("compacted"):
+            self.orders, self.lines = segments[0]
+            return
+        if not segments:
+            self.orders = {name: np.empty(0, dtype) for name, dtype in ORDER_COLUMNS.items()}
+            self.lines = {name: np.empty(0, dtype) for name, dtype in LINE_COLUMNS.items()}
+            return
+
+        # Line rows point into their own segment: shift them to global rows
+        offsets = np.cumsum([0] + [len(orders["key"]) for orders, _ in segments[:-1]])
+        orders = {name: np.concatenate([seg[0][name] for seg in segments]) for name in ORDER_COLUMNS}
+        lines = {name: np.concatenate([seg[1][name] for seg in segments]) for name in LINE_COLUMNS}
+        lines["order"] = np.concatenate([seg[1]["order"] + offset for seg, offset in zip(segments, offsets)])
+
+        # Last row per order key wins (later exports supersede earlier ones)
+        # (a stable sort keeps rows of one key in export order)
+        order = np.argsort(orders["key"], kind="stable")
+        keys = orders["key"][order]
+        keep = np.zeros(len(keys), dtype=bool)
+        keep[order[_run_ends(keys)]] = True
+        new_row = np.cumsum(keep) - 1
+
+        line_keep = keep[lines["order"]]
+        self.orders = {name: values[keep] for name, values in orders.items()}
+        self.lines = {name: values[line_keep] for name, values in lines.items()}
+        self.lines["order"] = new_row[self.lines["order"]]
+
+    @staticmethod
+    def _load(name: str) -> tuple:
+        directory = os.path.join(ANALYTICS_DIR, name)
+
+        def load(table: str, columns: dict) -> dict:
+            return {column: np.load(os.path.join(directory, f"{table}.{column}.npy"), mmap_mode="r")
+                    for column in columns}
+
+        return load("orders", ORDER_COLUMNS), load("lines", LINE_COLUMNS)
+
+    @property
+    def size(self) -> int:
+        return len(self.orders["key"])
+
+    def label(self, dictionary: str, code: int):
+        values = self.dictionaries.get(dictionary, [])
+        return values[code] if 0 <= code < len(values) else None
+
+
+_snapshot: Optional[Snapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot() -> Optional[Snapshot]:
+    """Current snapshot, reloaded when an export published a new manifest"""
+    global _snapshot
+    manifest = read_manifest()
+    if manifest is None:
+        return None
+    if _snapshot is not None and _snapshot.manifest["version"] == manifest["version"]:
+        return _snapshot
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.manifest["version"] != manifest["version"]:
+            try:
+                _snapshot = Snapshot(manifest)
+            except FileNotFoundError:
+                # An export replaced these segments while we were loading
+                _snapshot = Snapshot(read_manifest())
+    return _snapshot
+
+
+# =========================
+# REPORTS
+# =========================
+
+def _rupees(paise) -> float:
+    return round(float(paise) / 100, 2)
+
+
+def _day_start(day: date) -> int:
+    """Epoch seconds of local midnight"""
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp()) - LOCAL_OFFSET_SECONDS
+
+
+def _order_mask(snapshot: Snapshot, start: Optional[date], end: Optional[date], include_cancelled: bool):
+    created = snapshot.orders["created"]
+    mask = np.ones(len(created), dtype=bool)
+    if start:
+        mask &= created >= _day_start(start)
+    if end:
+        mask &= created < _day_start(end + timedelta(days=1))
+    cancelled = snapshot.dictionaries.get("status", [])
+    if not include_cancelled and "CANCELLED" in cancelled:
+        mask &= snapshot.orders["status"] != cancelled.index("CANCELLED")
+    return mask
+
+
+class _Selected:
+    """Order columns restricted to the mask, sliced on first use"""
+
+    def __init__(self, snapshot: Snapshot, mask):
+        self.snapshot, self.mask, self.columns = snapshot, mask, {}
+
+    def __getitem__(self, name: str):
+        if name not in self.columns:
+            self.columns[name] = self.snapshot.orders[name][self.mask]
+        return self.columns[name]
+
+
+def _orders(snapshot: Snapshot, mask) -> _Selected:
+    return _Selected(snapshot, mask)
+
+
+def report_hourly(snapshot: Snapshot, mask, top: int) -> dict:
+    orders = _orders(snapshot, mask)
+    hour = ((orders["created"] + LOCAL_OFFSET_SECONDS) // 3600) % 24
+    counts = np.bincount(hour, minlength=24)
+    revenue = np.bincount(hour, weights=orders["final"], minlength=24)
+    return {"rows": [
+        {"hour": h, "orders": int(counts[h]), "revenue": _rupees(revenue[h])} for h in range(24)
+    ]}
+
+
+def report_daily(snapshot: Snapshot, mask, top: int) -> dict:
+    orders = _orders(snapshot, mask)
+    day = (orders["created"] + LOCAL_OFFSET_SECONDS) // 86400
+    if not len(day):
+        return {"rows": []}
+    first = int(day.min())
+    day -= first
+    days = int(day.max()) + 1
+    counts = np.bincount(day, minlength=days)
+    revenue = np.bincount(day, weights=orders["final"], minlength=days)
+    customers = _distinct_per_group(day, orders["customer"], days)
+    return {"rows": [
+        {"day": (date(1970, 1, 1) + timedelta(days=first + int(i))).isoformat(), "orders": int(counts[i]),
+         "revenue": _rupees(revenue[i]), "customers": int(customers[i])}
+        for i in np.flatnonzero(counts)
+    ]}
+
+
+def _distinct_per_group(group, values, groups: int):
+    """
+    Number of distinct `values` within each group code (0 <= group < 2**24).
+    Group and the low 40 bits of the value share one uint64, so this is a
+    single sort; 40-bit collisions are negligible for customer hashes.
+    """
+    pairs = (group.astype(np.uint64) << np.uint64(40)) | (values.astype(np.uint64) & np.uint64(2**40 - 1))
+    pairs.sort()
+    distinct = pairs[_run_ends(pairs)] >> np.uint64(40)
+    return np.bincount(distinct.astype(np.int64), minlength=groups)
+
+
+def _top(rows: list, top: int, key: str = "revenue") -> list:
+    return sorted(rows, key=lambda row: row[key], reverse=True)[:top]
+
+
+def report_category(snapshot: Snapshot, mask, top: int) -> dict:
+    lines = snapshot.lines
+    line_mask = mask[lines["order"]]
+    category = lines["category"][line_mask]
+    groups = len(snapshot.dictionaries.get("category", []))
+    revenue = np.bincount(category, weights=lines["amount"][line_mask], minlength=groups)
+    quantity = np.bincount(category, weights=lines["quantity"][line_mask], minlength=groups)
+    orders = _distinct_per_group(category, lines["order"][line_mask], groups)
+    return {"rows": _top([
+        {"category": snapshot.label("category", code), "quantity": int(quantity[code]),
+         "orders": int(orders[code]), "revenue": _rupees(revenue[code])}
+        for code in range(groups) if quantity[code]
+    ], top)}
+
+
+def report_items(snapshot: Snapshot, mask, top: int) -> dict:
+    lines = snapshot.lines
+    line_mask = mask[lines["order"]]
+    item = lines["item"][line_mask]
+    groups = len(snapshot.dictionaries.get("item", []))
+    revenue = np.bincount(item, weights=lines["amount"][line_mask], minlength=groups)
+    quantity = np.bincount(item, weights=lines["quantity"][line_mask], minlength=groups)
+    return {"rows": _top([
+        {"id": snapshot.label("item", code), "name": snapshot.label("item_name", code),
+         "quantity": int(quantity[code]), "revenue": _rupees(revenue[code])}
+        for code in np.flatnonzero(quantity)
+    ], top, "quantity")}
+
+
+def report_pincode(snapshot: Snapshot, mask, top: int) -> dict:
+    orders = _orders(snapshot, mask)
+    # Slot 0 = unknown pincode, otherwise pincode - PIN_BASE + 1
+    slot = np.where(orders["pincode"] > 0, orders["pincode"] - (PIN_BASE - 1), 0)
+    counts = np.bincount(slot, minlength=PIN_SLOTS + 1)
+    revenue = np.bincount(slot, weights=orders["final"], minlength=PIN_SLOTS + 1)
+    used = np.flatnonzero(counts)
+    best = used[np.argsort(revenue[used])[::-1][:top]]
+    return {"rows": [
+        {"pincode": str(i + PIN_BASE - 1) if i else None, "orders": int(counts[i]),
+         "revenue": _rupees(revenue[i]), "average_order": _rupees(revenue[i] / counts[i])}
+        for i in best
+    ]}
+
+
+def report_coupons(snapshot: Snapshot, mask, top: int) -> dict:
+    orders = _orders(snapshot, mask)
+    # Code 0 = no coupon, coupon n -> n + 1
+    group = orders["coupon"] + 1
+    groups = len(snapshot.dictionaries.get("coupon", [])) + 1
+    counts = np.bincount(group, minlength=groups)
+    gross = np.bincount(group, weights=orders["gross"], minlength=groups)
+    revenue = np.bincount(group, weights=orders["final"], minlength=groups)
+    discount = np.bincount(group, weights=orders["discount"], minlength=groups)
+    customers = _distinct_per_group(group, orders["customer"], groups)
+
+    def row(code: int) -> dict:
+        n = max(int(counts[code]), 1)
+        return {
+            "coupon": snapshot.label("coupon", code - 1), "orders": int(counts[code]),
+            "customers": int(customers[code]), "revenue": _rupees(revenue[code]),
+            "discount": _rupees(discount[code]), "average_basket": _rupees(gross[code] / n),
+            "discount_rate": round(float(discount[code] / gross[code]), 4) if gross[code] else 0.0,
+        }
+
+    return {
+        "without_coupon": row(0),
+        "rows": _top([row(code) for code in np.flatnonzero(counts) if code], top),
+    }
+
+
+def report_basket(snapshot: Snapshot, mask, top: int) -> dict:
+    orders = _orders(snapshot, mask)
+    if not mask.any():
+        return {"orders": 0}
+    lines_per_order = np.bincount(snapshot.lines["order"], minlength=snapshot.size)[mask]
+    p50, p90, p99 = np.percentile(orders["final"], [50, 90, 99])
+    return {
+        "orders": int(len(orders["final"])),
+        "customers": _count_distinct(orders["customer"]),
+        "average_order": _rupees(orders["final"].mean()),
+        "average_gross": _rupees(orders["gross"].mean()),
+        "average_items": round(float(orders["quantity"].mean()), 2),
+        "average_lines": round(float(lines_per_order.mean()), 2),
+        "order_value_p50": _rupees(p50),
+        "order_value_p90": _rupees(p90),
+        "order_value_p99": _rupees(p99),
+    }
+
+
+REPORTS = {
+    "hourly": report_hourly,
+    "daily": report_daily,
+    "category": report_category,
+    "items": report_items,
+    "pincode": report_pincode,
+    "coupons": report_coupons,
+    "basket": report_basket,
+}
+
+
+def snapshot_info(snapshot: Snapshot) -> dict:
+    manifest = snapshot.manifest
+    return {
+        "orders": snapshot.size,
+        "segments": len(manifest["segments"]),
+        "exported_at": manifest["exported_at"],
+        "watermark": (manifest["watermark"] or {}).get("updated_at"),
+    }
+
+
+def run_report(
+    name: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    include_cancelled: bool = False,
+    top: int = 20,
+) -> Optional[dict]:
+    """Run a report over the current snapshot (None if nothing was exported yet)"""
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return None
+    started = time.perf_counter()
+    mask = _order_mask(snapshot, start, end, include_cancelled)
+    result = REPORTS[name](snapshot, mask, top)
+    return {
+        "report": name,
+        "from": start.isoformat() if start else None,
+        "to": end.isoformat() if end else None,
+        **result,
+        "snapshot": snapshot_info(snapshot),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,127 @@
+"""
+Order Archive
+Two tiers of order storage:
+
+- orders          hot: anything that can still change, plus recent history
+- orders_archive  cold: DELIVERED / CANCELLED orders older than
+                  ORDER_ARCHIVE_AFTER_DAYS (zstd-compressed collection)
+
+Status updates, auto-progress and cancellation only ever touch the hot
+collection, which stays small enough to live in the WiredTiger cache.
+Reads that need history (order list, order details, per-user coupon
+limits) go through the helpers here and see both tiers.
+
+archive_orders() moves orders in batches of ORDER_ARCHIVE_BATCH_SIZE:
+copy (idempotent upsert) first, then delete from the hot tier, so a crash
+in between leaves a duplicate that the next run (and the readers, which
+de-duplicate by order_id) cope with, never a lost order.
+Run it from cron: python scripts/archive_orders.py
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import ReplaceOne
+
+from app.config import ORDER_ARCHIVE_AFTER_DAYS, ORDER_ARCHIVE_BATCH_SIZE
+from app.database import orders_col, orders_archive_col
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ARCHIVABLE_STATUSES = ["DELIVERED", "CANCELLED"]
+
+
+# =========================
+# READS (both tiers)
+# =========================
+
+def find_order(query: dict, projection: Optional[dict] = None) -> Optional[dict]:
+    """Hot tier first; archived orders are only looked up on a miss"""
+    order = orders_col.find_one(query, projection)
+    if order is None:
+        order = orders_archive_col.find_one(query, projection)
+    return order
+
+
+def list_user_orders(email: str) -> list:
+    """All orders of a user, oldest first: archived history, then hot orders"""
+    projection = {"_id": 0}
+    hot = list(orders_col.find({"user_email": email}, projection).sort("created_at", 1))
+    hot_ids = {order["order_id"] for order in hot}
+    archived = [
+        order
+        for order in orders_archive_col.find({"user_email": email}, projection).sort("created_at", 1)
+        # Copied but not yet deleted by an interrupted archive run
+        if order["order_id"] not in hot_ids
+    ]
+    return archived + hot
+
+
+def count_orders(query: dict) -> int:
+    """count_documents over both tiers (an order is never counted twice)"""
+    hot_ids = [order["order_id"] for order in orders_col.find(query, {"_id": 0, "order_id": 1})]
+    archived = orders_archive_col.count_documents({**query, "order_id": {"$nin": hot_ids}})
+    return len(hot_ids) + archived
+
+
+# =========================
+# ARCHIVAL
+# =========================
+
+def archive_cutoff(older_than_days: int = ORDER_ARCHIVE_AFTER_DAYS) -> datetime:
+    return datetime.utcnow() - timedelta(days=older_than_days)
+
+
+def _candidates(cutoff: datetime) -> dict:
+    return {"status": {"$in": ARCHIVABLE_STATUSES}, "updated_at": {"$lt": cutoff}}
+
+
+def archive_batch(cutoff: datetime, batch_size: int = ORDER_ARCHIVE_BATCH_SIZE) -> int:
+    """Move up to `batch_size` orders to the archive; returns how many moved"""
+    docs = list(orders_col.find(_candidates(cutoff)).sort("_id", 1).limit(batch_size))
+    if not docs:
+        return 0
+
+    archived_at = datetime.utcnow()
+    orders_archive_col.bulk_write(
+        [ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": archived_at}, upsert=True) for doc in docs],
+        ordered=False,
+    )
+    # Same filter again: only delete what is still archivable
+    result = orders_col.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}, **_candidates(cutoff)})
+    return result.deleted_count
+
+
+def archive_orders(
+    older_than_days: int = ORDER_ARCHIVE_AFTER_DAYS,
+    batch_size: int = ORDER_ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    pause: float = 0.0,
+    on_batch=None,
+) -> int:
+    """
+    Archive every eligible order, one batch at a time (memory is bounded
+    by `batch_size`). `pause` seconds between batches limits the load on
+    the primary. Returns the number of orders moved.
+    """
+    cutoff = archive_cutoff(older_than_days)
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(cutoff, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+        if on_batch:
+            on_batch(batches, moved)
+        if pause:
+            time.sleep(pause)
+
+    logger.info("Archived %d orders older than %s in %d batches", moved, cutoff, batches)
+    return moved
+
+
+def pending_count(older_than_days: int = ORDER_ARCHIVE_AFTER_DAYS) -> int:
+    return orders_col.count_documents(_candidates(archive_cutoff(older_than_days)))
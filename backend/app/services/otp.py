@@ -0,0 +1,169 @@
+"""
+Phone OTP
+Every step of the OTP flow is a single atomic Redis call:
+
+- send:    cooldown check + per-window send counter + store code   (Lua)
+- verify:  compare + attempt counter + consume + verified marker   (Lua)
+- consume: GETDEL of the verified marker when the phone is saved
+
+Rejections (cooldown, send limit, exhausted attempts) cost one round trip
+and never touch MongoDB.
+
+Keys per phone:
+    otp:{phone}            hash {code, attempts}, OTP_TTL_SECONDS
+    otp:cooldown:{phone}   resend cooldown
+    otp:sends:{phone}      sends in the current window
+    phone_verified:{phone} marker consumed by PUT /user/update-phone
+"""
+
+import secrets
+import string
+
+from fastapi import HTTPException
+
+from app.config import (
+    OTP_TTL_SECONDS,
+    OTP_VERIFIED_TTL_SECONDS,
+    OTP_MAX_ATTEMPTS,
+    OTP_RESEND_COOLDOWN_SECONDS,
+    OTP_MAX_SENDS,
+    OTP_SEND_WINDOW_SECONDS,
+)
+from app.utils.redis_client import get_redis, get_script
+
+# KEYS[1] = otp hash, KEYS[2] = cooldown, KEYS[3] = send counter
+# ARGV[1] = code, ARGV[2] = otp ttl, ARGV[3] = cooldown, ARGV[4] = max sends, ARGV[5] = window
+# Returns {1, 0} when stored, {-1, ms left} in cooldown, {-2, s left} over the send limit
+SEND_LUA = """
+local cooldown = redis.call('PTTL', KEYS[2])
+if cooldown > 0 then
+    return {-1, cooldown}
+end
+local sends = redis.call('INCR', KEYS[3])
+if sends == 1 then
+    redis.call('EXPIRE', KEYS[3], ARGV[5])
+end
+if sends > tonumber(ARGV[4]) then
+    return {-2, redis.call('TTL', KEYS[3])}
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'code', ARGV[1], 'attempts', 0)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('SET', KEYS[2], 1, 'EX', ARGV[3])
+return {1, 0}
+"""
+
+# KEYS[1] = otp hash, KEYS[2] = verified marker
+# ARGV[1] = submitted code, ARGV[2] = max attempts, ARGV[3] = marker ttl
+# Returns {1, 0} verified, {-1, 0} no OTP, {-2, attempts left} wrong code,
+# {-3, 0} wrong code and no attempts left (the OTP is burned)
+VERIFY_LUA = """
+local code = redis.call('HGET', KEYS[1], 'code')
+if not code then
+    return {-1, 0}
+end
+if code == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('SET', KEYS[2], 'verified', 'EX', ARGV[3])
+    return {1, 0}
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+local left = tonumber(ARGV[2]) - attempts
+if left <= 0 then
+    redis.call('DEL', KEYS[1])
+    return {-3, 0}
+end
+return {-2, left}
+"""
+
+
+def otp_key(phone: str) -> str:
+    return f"otp:{phone}"
+
+
+def cooldown_key(phone: str) -> str:
+    return f"otp:cooldown:{phone}"
+
+
+def sends_key(phone: str) -> str:
+    return f"otp:sends:{phone}"
+
+
+def verified_key(phone: str) -> str:
+    return f"phone_verified:{phone}"
+
+
+def _unavailable():
+    return HTTPException(status_code=500, detail="OTP service temporarily unavailable")
+
+
+def generate_code() -> str:
+    return "".join(secrets.choice(string.digits) for _ in range(6))
+
+
+def issue_otp(phone: str) -> str:
+    """
+    Store a fresh OTP for `phone` and return it for delivery.
+    Raises 429 (with Retry-After) during the cooldown or over the send limit.
+    """
+    script = get_script(SEND_LUA)
+    if script is None:
+        raise _unavailable()
+
+    code = generate_code()
+    status, wait = script(
+        keys=[otp_key(phone), cooldown_key(phone), sends_key(phone)],
+        args=[code, OTP_TTL_SECONDS, OTP_RESEND_COOLDOWN_SECONDS, OTP_MAX_SENDS, OTP_SEND_WINDOW_SECONDS],
+    )
+    if status == -1:
+        seconds = max(-(-int(wait) // 1000), 1)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Please wait {seconds} seconds before requesting another OTP",
+            headers={"Retry-After": str(seconds)},
+        )
+    if status == -2:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many OTP requests. Please try again later.",
+            headers={"Retry-After": str(max(int(wait), 1))},
+        )
+    return code
+
+
+def check_otp(phone: str, otp: str):
+    """Verify and consume the OTP, leaving the verified marker behind"""
+    script = get_script(VERIFY_LUA)
+    if script is None:
+        raise _unavailable()
+
+    status, attempts_left = script(
+        keys=[otp_key(phone), verified_key(phone)],
+        args=[otp, OTP_MAX_ATTEMPTS, OTP_VERIFIED_TTL_SECONDS],
+    )
+    if status == -1:
+        raise HTTPException(
+            status_code=400,
+            detail="OTP expired or not found. Please request a new one."
+        )
+    if status == -2:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid OTP. {attempts_left} attempt(s) left."
+        )
+    if status == -3:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many invalid attempts. Please request a new OTP."
+        )
+
+
+def consume_verification(phone: str) -> bool:
+    """
+    Atomically use up the verified marker. True when Redis is unavailable,
+    matching the previous behaviour of not blocking profile updates then.
+    """
+    redis_client = get_redis()
+    if not redis_client:
+        return True
+    return redis_client.getdel(verified_key(phone)) is not None
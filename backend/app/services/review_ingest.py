@@ -0,0 +1,219 @@
+"""
+Review Write-Behind
+POST /reviews appends to a Redis stream; a consumer-group worker drains it
+into batched insert_many calls, folds the batch into the item summaries and
+invalidates caches once per batch.
+
+Delivery is at-least-once: messages are acked only after MongoDB accepted
+the batch, and a redelivered review is deduplicated on its unique review_id.
+
+Run inside the API process (REVIEW_WRITE_BEHIND=true) or standalone:
+    python -m app.services.review_ingest
+"""
+
+import json
+import os
+import socket
+import threading
+from datetime import datetime
+from typing import Optional
+
+from pymongo.errors import BulkWriteError
+
+from app.config import (
+    REVIEW_STREAM_KEY,
+    REVIEW_STREAM_GROUP,
+    REVIEW_STREAM_MAXLEN,
+    REVIEW_BATCH_SIZE,
+    REVIEW_BATCH_BLOCK_MS,
+    REVIEW_CLAIM_IDLE_MS,
+)
+from app.database import reviews_col
+from app.services.reviews import apply_summaries, invalidate_review_caches
+from app.utils.redis_client import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+def enqueue_review(review: dict) -> bool:
+    """Append a review to the ingest stream. False if Redis is unavailable."""
+    redis_client = get_redis()
+    if not redis_client:
+        return False
+    try:
+        redis_client.xadd(
+            REVIEW_STREAM_KEY,
+            {"review": json.dumps(review, default=str)},
+            maxlen=REVIEW_STREAM_MAXLEN,
+            approximate=True,
+        )
+        return True
+    except Exception as e:
+        logger.warning("Review enqueue error: %s", e)
+        return False
+
+
+def _decode(fields: dict) -> Optional[dict]:
+    try:
+        review = json.loads(fields["review"])
+        review["created_at"] = datetime.fromisoformat(review["created_at"])
+        return review
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning("Dropping malformed review message: %s", e)
+        return None
+
+
+def write_batch(reviews: list) -> list:
+    """
+    Insert a batch and return the reviews whose summary still needs applying.
+    Duplicates (redeliveries) are only re-summarized if a previous attempt
+    stopped between the insert and the summary update.
+    """
+    if not reviews:
+        return []
+
+    for review in reviews:
+        review["summarized"] = False
+
+    duplicate_ids = set()
+    try:
+        reviews_col.insert_many(reviews, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            if error.get("code") != DUPLICATE_KEY:
+                raise
+            duplicate_ids.add(reviews[error["index"]]["review_id"])
+
+    if duplicate_ids:
+        pending = {
+            doc["review_id"]
+            for doc in reviews_col.find(
+                {"review_id": {"$in": list(duplicate_ids)}, "summarized": False},
+                {"review_id": 1},
+            )
+        }
+        fresh = [
+            r for r in reviews
+            if r["review_id"] not in duplicate_ids or r["review_id"] in pending
+        ]
+    else:
+        fresh = reviews
+
+    apply_summaries(fresh)
+    reviews_col.update_many(
+        {"review_id": {"$in": [r["review_id"] for r in fresh]}},
+        {"$set": {"summarized": True}},
+    )
+    return fresh
+
+
+class ReviewIngestWorker(threading.Thread):
+    """Background consumer for the review stream"""
+
+    def __init__(self, consumer_name: Optional[str] = None):
+        super().__init__(name="review-ingest", daemon=True)
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self._stop_event = threading.Event()
+
+    def stop(self, timeout: float = 10):
+        """Finish the batch in flight, then exit"""
+        self._stop_event.set()
+        self.join(timeout)
+
+    def ensure_group(self, redis_client):
+        try:
+            redis_client.xgroup_create(
+                REVIEW_STREAM_KEY, REVIEW_STREAM_GROUP, id="0", mkstream=True
+            )
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def claim_stale(self, redis_client) -> list:
+        """Take over messages left pending by consumers that died mid-batch"""
+        result = redis_client.xautoclaim(
+            REVIEW_STREAM_KEY,
+            REVIEW_STREAM_GROUP,
+            self.consumer_name,
+            min_idle_time=REVIEW_CLAIM_IDLE_MS,
+            start_id="0-0",
+            count=REVIEW_BATCH_SIZE,
+        )
+        return result[1] if result else []
+
+    def read_new(self, redis_client) -> list:
+        response = redis_client.xreadgroup(
+            REVIEW_STREAM_GROUP,
+            self.consumer_name,
+            {REVIEW_STREAM_KEY: ">"},
+            count=REVIEW_BATCH_SIZE,
+            block=REVIEW_BATCH_BLOCK_MS,
+        )
+        if not response:
+            return []
+        return response[0][1]
+
+    def process(self, redis_client, messages: list) -> int:
+        ids, reviews = [], []
+        for message_id, fields in messages:
+            ids.append(message_id)
+            review = _decode(fields)
+            if review:
+                reviews.append(review)
+
+        fresh = write_batch(reviews)
+        redis_client.xack(REVIEW_STREAM_KEY, REVIEW_STREAM_GROUP, *ids)
+        invalidate_review_caches(fresh)
+        return len(fresh)
+
+    def run(self):
+        redis_client = get_redis()
+        if not redis_client:
+            logger.warning("Review ingest worker not started: Redis unavailable")
+            return
+
+        self.ensure_group(redis_client)
+        logger.info("Review ingest worker started (%s)", self.consumer_name)
+
+        while not self._stop_event.is_set():
+            try:
+                messages = self.claim_stale(redis_client) or self.read_new(redis_client)
+                if messages:
+                    self.process(redis_client, messages)
+            except Exception as e:
+                # Unacked messages stay pending and are retried via XAUTOCLAIM
+                logger.warning("Review ingest error: %s", e)
+                self._stop_event.wait(1)
+
+        logger.info("Review ingest worker stopped")
+
+
+_worker: Optional[ReviewIngestWorker] = None
+
+
+def start_worker():
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        _worker = ReviewIngestWorker()
+        _worker.start()
+    return _worker
+
+
+def stop_worker(timeout: float = 10):
+    global _worker
+    if _worker is not None:
+        _worker.stop(timeout)
+        _worker = None
+
+
+if __name__ == "__main__":
+    worker = ReviewIngestWorker()
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(1)
+    except KeyboardInterrupt:
+        worker.stop()
@@ -0,0 +1,175 @@
+"""
+Review Storage
+Review documents, keyset pagination and the precomputed per-item summary
+(count, rating sum, star histogram, latest N) kept in review_summaries.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+from app.config import REVIEW_SUMMARY_LATEST
+from app.database import reviews_col, review_summaries_col
+from app.models.review_model import ReviewCreate
+from app.utils.cache import cached_response, invalidate_cache
+
+SUMMARY_CACHE_TTL = 600
+PAGE_CACHE_TTL = 1200
+
+
+def user_reviews_cache_key(email: str) -> str:
+    return f"reviews:user:{email}"
+
+
+def item_reviews_cache_key(item_id: str) -> str:
+    return f"reviews:item:{item_id}"
+
+
+def item_summary_cache_key(item_id: str) -> str:
+    return f"reviews:summary:{item_id}"
+
+
+def build_review(data: ReviewCreate, email: str) -> dict:
+    """Validated review document; review_id makes retried writes idempotent"""
+    return {
+        "review_id": uuid.uuid4().hex,
+        "item_id": data.item_id,
+        "order_id": data.order_id,
+        "user_email": email,
+        "rating": data.rating,
+        "comment": data.comment.strip(),
+        "created_at": datetime.utcnow(),
+    }
+
+
+def summary_update(review: dict) -> Optional[tuple]:
+    """
+    Incremental summary change for one review as (filter, update),
+    None for general reviews that are not tied to a menu item
+    """
+    if not review.get("item_id"):
+        return None
+
+    rating = int(review["rating"])
+    return (
+        {"item_id": review["item_id"]},
+        {
+            "$inc": {
+                "count": 1,
+                "rating_sum": rating,
+                f"stars.{rating}": 1,
+            },
+            "$push": {
+                "latest": {
+                    "$each": [{
+                        "review_id": review["review_id"],
+                        "rating": rating,
+                        "comment": review["comment"],
+                        "created_at": review["created_at"],
+                    }],
+                    "$sort": {"created_at": -1},
+                    "$slice": REVIEW_SUMMARY_LATEST,
+                }
+            },
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+    )
+
+
+def apply_summaries(reviews: list):
+    """Fold new reviews into their item summaries in one round trip"""
+    updates = [change for change in map(summary_update, reviews) if change]
+    if len(updates) == 1:
+        review_summaries_col.update_one(*updates[0], upsert=True)
+    elif updates:
+        review_summaries_col.bulk_write(
+            [UpdateOne(query, update, upsert=True) for query, update in updates],
+            ordered=False,
+        )
+
+
+def invalidate_review_caches(reviews: list):
+    """One DEL for every cache key touched by a batch of reviews"""
+    keys = set()
+    for review in reviews:
+        keys.add(user_reviews_cache_key(review["user_email"]))
+        if review.get("item_id"):
+            keys.add(item_reviews_cache_key(review["item_id"]))
+            keys.add(item_summary_cache_key(review["item_id"]))
+    if keys:
+        invalidate_cache(*keys)
+
+
+def save_review(review: dict):
+    reviews_col.insert_one(review)
+    apply_summaries([review])
+    invalidate_review_caches([review])
+
+
+# =========================
+# READS
+# =========================
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[ObjectId]:
+    if not cursor:
+        return None
+    try:
+        return ObjectId(cursor)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def list_reviews(query: dict, limit: int, cursor: Optional[str] = None) -> dict:
+    """
+    Keyset page, newest first. Uses the (<field>, _id) indexes so every
+    page costs the same regardless of how deep the client scrolls.
+    """
+    after = _parse_cursor(cursor)
+    if after is not None:
+        query = {**query, "_id": {"$lt": after}}
+
+    # `summarized` is review_ingest's bookkeeping, not part of the review
+    docs = list(reviews_col.find(query, {"summarized": 0}).sort("_id", -1).limit(limit + 1))
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    next_cursor = str(docs[-1]["_id"]) if has_more else None
+    for doc in docs:
+        doc.pop("_id")
+
+    return {"reviews": docs, "next_cursor": next_cursor}
+
+
+def cached_first_page(cache_key: str, query: dict, limit: int):
+    """First page as a raw JSON response straight from cache"""
+    return cached_response(
+        cache_key, lambda: list_reviews(query, limit), expire_time=PAGE_CACHE_TTL
+    )
+
+
+def cached_item_summary(item_id: str):
+    return cached_response(
+        item_summary_cache_key(item_id),
+        lambda: item_summary(item_id),
+        expire_time=SUMMARY_CACHE_TTL,
+    )
+
+
+def item_summary(item_id: str) -> dict:
+    doc = review_summaries_col.find_one({"item_id": item_id}, {"_id": 0}) or {}
+    count = doc.get("count", 0)
+    stars = doc.get("stars", {})
+
+    summary = {
+        "item_id": item_id,
+        "count": count,
+        "average": round(doc.get("rating_sum", 0) / count, 2) if count else None,
+        "histogram": {str(star): stars.get(str(star), 0) for star in range(1, 6)},
+        "latest": doc.get("latest", []),
+    }
+    return summary
@@ -0,0 +1,189 @@
+"""
+Real-time Sales Counters
+Checkout and cancellation update per-day counters in Redis, so dashboards
+read a handful of keys instead of scanning orders.
+
+Keys per local day (YYYY-MM-DD, SERVICE_UTC_OFFSET_MINUTES):
+    sales:{day}              hash  orders, items, revenue/gross/discount/
+                                   delivery_fee (in paise), cancelled_orders,
+                                   cancelled_revenue
+    sales:{day}:items        zset  item id -> quantity sold
+    sales:{day}:item_names   hash  item id -> name
+    sales:{day}:customers    HLL   distinct customer emails
+    sales:{day}:hourly       hash  "{hour}:orders" / "{hour}:revenue"
+
+Amounts are integer paise (HINCRBY is exact; floats are not). A cancelled
+order is taken back out of the day and hour it was placed in; the
+HyperLogLog can't forget a customer, so "customers" means customers who
+checked out. Everything expires after SALES_COUNTER_TTL_DAYS.
+
+Inside a request the commands join the request's response pipeline
+(request_redis) and cost no extra round trip; otherwise they are sent as
+one pipeline. Counter failures are logged and never fail the checkout.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import SALES_COUNTER_TTL_DAYS, SERVICE_UTC_OFFSET_MINUTES
+from app.utils.redis_client import get_redis
+from app.utils.request_redis import current_batch
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LOCAL_TZ = timezone(timedelta(minutes=SERVICE_UTC_OFFSET_MINUTES))
+AMOUNT_FIELDS = ("revenue", "gross", "discount", "delivery_fee")
+
+
+def paise(amount) -> int:
+    return int(round(float(amount or 0) * 100))
+
+
+def local_slot(when: Optional[datetime] = None) -> tuple:
+    """(day, hour) in local time for a naive-UTC or aware datetime"""
+    when = when or datetime.now(timezone.utc)
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    local = when.astimezone(LOCAL_TZ)
+    return local.strftime("%Y-%m-%d"), local.hour
+
+
+def day_key(day: str, suffix: str = "") -> str:
+    return f"sales:{day}{':' + suffix if suffix else ''}"
+
+
+def _order_commands(order: dict, sign: int) -> list:
+    """Counter updates for placing (sign=1) or cancelling (sign=-1) an order"""
+    day, hour = local_slot(order.get("created_at"))
+    totals, items = day_key(day), day_key(day, "items")
+    names, hourly = day_key(day, "item_names"), day_key(day, "hourly")
+
+    revenue = paise(order.get("final_amount", order.get("total_amount")))
+    quantity = sum(int(item.get("quantity", 0)) for item in order.get("items", []))
+    commands = [
+        ("HINCRBY", totals, "orders", sign),
+        ("HINCRBY", totals, "items", sign * quantity),
+        ("HINCRBY", totals, "revenue", sign * revenue),
+        ("HINCRBY", totals, "gross", sign * paise(order.get("total_amount"))),
+        ("HINCRBY", totals, "discount", sign * paise(order.get("discount_amount"))),
+        ("HINCRBY", totals, "delivery_fee", sign * paise(order.get("delivery_fee"))),
+        ("HINCRBY", hourly, f"{hour}:orders", sign),
+        ("HINCRBY", hourly, f"{hour}:revenue", sign * revenue),
+    ]
+    for item in order.get("items", []):
+        item_id = item.get("id") or item["name"]
+        commands.append(("ZINCRBY", items, sign * int(item.get("quantity", 0)), item_id))
+        if sign > 0:
+            commands.append(("HSET", names, item_id, item["name"]))
+
+    if sign > 0:
+        commands.append(("PFADD", day_key(day, "customers"), order["user_email"]))
+    else:
+        commands.append(("HINCRBY", totals, "cancelled_orders", 1))
+        commands.append(("HINCRBY", totals, "cancelled_revenue", revenue))
+
+    ttl = SALES_COUNTER_TTL_DAYS * 86400
+    for key in (totals, items, names, hourly, day_key(day, "customers")):
+        commands.append(("EXPIRE", key, ttl))
+    return commands
+
+
+def _send(commands: list):
+    batch = current_batch.get()
+    if batch is not None:
+        batch.defer_commands(commands)
+        return
+
+    redis_client = get_redis()
+    if not redis_client:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for command in commands:
+            pipe.execute_command(*command)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Sales counter update error: %s", e)
+
+
+def record_order(order: dict):
+    _send(_order_commands(order, 1))
+
+
+def record_cancellation(order: dict):
+    _send(_order_commands(order, -1))
+
+
+# =========================
+# READS (admin)
+# =========================
+
+def _rupees(value) -> float:
+    return round(int(value or 0) / 100, 2)
+
+
+def day_summary(day: Optional[str] = None, top: int = 10) -> Optional[dict]:
+    """Totals, top items and hourly buckets for one day in one round trip"""
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+    day = day or local_slot()[0]
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hgetall(day_key(day))
+    pipe.zrevrange(day_key(day, "items"), 0, top - 1, withscores=True)
+    pipe.hgetall(day_key(day, "item_names"))
+    pipe.pfcount(day_key(day, "customers"))
+    pipe.hgetall(day_key(day, "hourly"))
+    totals, top_items, names, customers, hourly = pipe.execute()
+
+    totals = {field: int(value) for field, value in totals.items()}
+    hours = {}
+    for field, value in hourly.items():
+        hour, _, metric = field.partition(":")
+        bucket = hours.setdefault(int(hour), {"hour": int(hour), "orders": 0, "revenue": 0.0})
+        bucket[metric] = int(value) if metric == "orders" else _rupees(value)
+
+    return {
+        "day": day,
+        "orders": totals.get("orders", 0),
+        "items": totals.get("items", 0),
+        **{field: _rupees(totals.get(field)) for field in AMOUNT_FIELDS},
+        "cancelled_orders": totals.get("cancelled_orders", 0),
+        "cancelled_revenue": _rupees(totals.get("cancelled_revenue")),
+        "unique_customers": customers,
+        "top_items": [
+            {"id": item_id, "name": names.get(item_id, item_id), "quantity": int(score)}
+            for item_id, score in top_items
+            if score > 0
+        ],
+        "hourly": [hours[hour] for hour in sorted(hours)],
+    }
+
+
+def range_summary(days: int) -> Optional[dict]:
+    """Daily revenue/orders for the last `days` days plus distinct customers overall"""
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+    today = datetime.now(LOCAL_TZ).date()
+    day_names = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+    pipe = redis_client.pipeline(transaction=False)
+    for day in day_names:
+        pipe.hmget(day_key(day), "orders", "revenue", "cancelled_orders")
+    # PFCOUNT over several keys counts the union: customers across the range
+    pipe.pfcount(*[day_key(day, "customers") for day in day_names])
+    *per_day, customers = pipe.execute()
+
+    return {
+        "days": [
+            {"day": day, "orders": int(orders or 0), "revenue": _rupees(revenue),
+             "cancelled_orders": int(cancelled or 0)}
+            for day, (orders, revenue, cancelled) in zip(day_names, per_day)
+        ],
+        "orders": sum(int(values[0] or 0) for values in per_day),
+        "revenue": _rupees(sum(int(values[1] or 0) for values in per_day)),
+        "unique_customers": customers,
+    }
@@ -0,0 +1,284 @@
+"""
+Serviceability
+Delivery zones (pincode lists and ranges, each with a delivery fee and a
+daily order cut-off) compiled into an in-process lookup table.
+
+- Source: SERVICE_ZONES_FILE (JSON) if set, otherwise the service_zones
+  collection. The file is reloaded when its mtime changes, the collection
+  when `service_zones:version` is bumped in Redis (admin edits)
+- Lookup: one uint16 slot per possible 6-digit pincode (~1.8 MB) holding
+  the zone number, so checking a pincode is a single array read
+- With no zones configured every pincode is accepted and delivery is free,
+  which is how the app behaved before zones existed
+
+File format:
+    {"zones": [{
+        "zone_id": "pune-central", "name": "Pune Central",
+        "pincodes": ["411001", "411002"], "ranges": [["411030", "411048"]],
+        "delivery_fee": 20, "free_delivery_above": 300, "cutoff": "21:30"
+    }]}
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.config import (
+    SERVICE_ZONES_FILE,
+    SERVICE_ZONES_REFRESH_SECONDS,
+    SERVICE_UTC_OFFSET_MINUTES,
+)
+from app.database import service_zones_col
+from app.utils.redis_client import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+VERSION_KEY = "service_zones:version"
+LOCAL_TZ = timezone(timedelta(minutes=SERVICE_UTC_OFFSET_MINUTES))
+
+# Indian pincodes: six digits, first digit 1-9
+PIN_BASE = 100000
+PIN_SLOTS = 900000
+
+
+def normalize_pincode(value) -> Optional[int]:
+    """Pincode as an int, or None if it isn't a valid 6-digit pincode"""
+    text = str(value or "").replace(" ", "").strip()
+    if len(text) != 6 or not text.isdigit() or text[0] == "0":
+        return None
+    return int(text)
+
+
+def parse_cutoff(value) -> Optional[int]:
+    """"HH:MM" -> minutes after local midnight (None = no cut-off)"""
+    if not value:
+        return None
+    hours, _, minutes = str(value).partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def compile_zone(doc: dict) -> dict:
+    """Turn a zone document into a flat, pre-validated zone"""
+    pincodes = [normalize_pincode(pin) for pin in doc.get("pincodes", [])]
+    ranges = [(normalize_pincode(lo), normalize_pincode(hi)) for lo, hi in doc.get("ranges", [])]
+    if None in pincodes or any(None in pair or pair[0] > pair[1] for pair in ranges):
+        raise ValueError(f"Zone {doc.get('zone_id')!r} has invalid pincodes or ranges")
+
+    free_above = doc.get("free_delivery_above")
+    return {
+        "zone_id": doc["zone_id"],
+        "name": doc.get("name", doc["zone_id"]),
+        "delivery_fee": float(doc.get("delivery_fee", 0)),
+        "free_delivery_above": float(free_above) if free_above is not None else None,
+        "cutoff": doc.get("cutoff"),
+        "cutoff_minutes": parse_cutoff(doc.get("cutoff")),
+        "pincodes": pincodes,
+        "ranges": ranges,
+    }
+
+
+def local_minutes(now: Optional[datetime] = None) -> int:
+    now = (now or datetime.now(timezone.utc)).astimezone(LOCAL_TZ)
+    return now.hour * 60 + now.minute
+
+
+def accepting_orders(zone: dict, now: Optional[datetime] = None) -> bool:
+    return zone["cutoff_minutes"] is None or local_minutes(now) <= zone["cutoff_minutes"]
+
+
+def delivery_fee(zone: Optional[dict], order_amount: float) -> float:
+    if zone is None:
+        return 0.0
+    if zone["free_delivery_above"] is not None and order_amount >= zone["free_delivery_above"]:
+        return 0.0
+    return zone["delivery_fee"]
+
+
+# =========================
+# ZONE TABLE
+# =========================
+
+class ZoneTable:
+    """
+    Compiled, read-only pincode -> zone index.
+
+    Like the coupon rule table, workers swap the whole table on reload, so
+    lookups never see a half-built index.
+    """
+
+    def __init__(self, zones: list, version: Optional[str] = None):
+        self.zones = zones
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+        # Slot value = position in self.zones + 1 (0 = not serviceable).
+        # Later zones win where pincodes overlap.
+        self.index = array("H", bytes(2 * PIN_SLOTS)) if zones else None
+        for number, zone in enumerate(zones, 1):
+            for pin in zone["pincodes"]:
+                self.index[pin - PIN_BASE] = number
+            for lo, hi in zone["ranges"]:
+                self.index[lo - PIN_BASE:hi - PIN_BASE + 1] = array("H", [number]) * (hi - lo + 1)
+
+    @property
+    def restricted(self) -> bool:
+        """False when no zones are configured (deliver anywhere)"""
+        return self.index is not None
+
+    def lookup(self, pincode) -> Optional[dict]:
+        pin = normalize_pincode(pincode)
+        if pin is None or self.index is None:
+            return None
+        number = self.index[pin - PIN_BASE]
+        return self.zones[number - 1] if number else None
+
+
+_table: Optional[ZoneTable] = None
+_table_lock = threading.Lock()
+
+
+def _current_version() -> Optional[str]:
+    if SERVICE_ZONES_FILE:
+        try:
+            stat = os.stat(SERVICE_ZONES_FILE)
+        except OSError:
+            return None
+        return f"file:{stat.st_mtime_ns}:{stat.st_size}"
+
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+    try:
+        return redis_client.get(VERSION_KEY)
+    except Exception:
+        return None
+
+
+def _load_docs() -> list:
+    if SERVICE_ZONES_FILE:
+        with open(SERVICE_ZONES_FILE, encoding="utf-8") as f:
+            return json.load(f).get("zones", [])
+    return list(service_zones_col.find({"active": {"$ne": False}}, {"_id": 0}).sort("zone_id", 1))
+
+
+def _load_table(version: Optional[str]) -> ZoneTable:
+    zones = []
+    for doc in _load_docs():
+        try:
+            zones.append(compile_zone(doc))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Skipping delivery zone: %s", e)
+    if len(zones) > 0xFFFF - 1:
+        raise ValueError("Too many delivery zones")
+    logger.info("Loaded %d delivery zones", len(zones))
+    return ZoneTable(zones, version)
+
+
+def get_zone_table(force: bool = False) -> ZoneTable:
+    """Return the compiled zone table, reloading it if the zones changed"""
+    global _table
+
+    table = _table
+    if (
+        not force
+        and table is not None
+        and time.monotonic() - table.loaded_at < SERVICE_ZONES_REFRESH_SECONDS
+    ):
+        return table
+
+    version = _current_version()
+    with _table_lock:
+        table = _table
+        if force or table is None or version is None or version != table.version:
+            try:
+                table = _load_table(version)
+            except Exception as e:
+                if table is None:
+                    raise
+                # Keep serving the last good table (e.g. a half-written file)
+                logger.error("Delivery zone reload failed, keeping previous zones: %s", e)
+                table.loaded_at = time.monotonic()
+        else:
+            table.loaded_at = time.monotonic()
+        _table = table
+    return table
+
+
+def mark_zones_changed():
+    """Publish a new version so every worker reloads, then reload locally"""
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            redis_client.incr(VERSION_KEY)
+        except Exception as e:
+            logger.warning("Zone version bump error: %s", e)
+    get_zone_table(force=True)
+
+
+# =========================
+# CHECKS
+# =========================
+
+def public_view(zone: dict) -> dict:
+    return {
+        "zone_id": zone["zone_id"],
+        "name": zone["name"],
+        "delivery_fee": zone["delivery_fee"],
+        "free_delivery_above": zone["free_delivery_above"],
+        "cutoff": zone["cutoff"],
+    }
+
+
+def check_pincodes(pincodes: list) -> list:
+    """Serviceability of each pincode, in request order"""
+    table = get_zone_table()
+    results = []
+    for pincode in pincodes:
+        result = {"pincode": pincode, "valid": normalize_pincode(pincode) is not None}
+        zone = table.lookup(pincode)
+        if zone is not None:
+            result.update(serviceable=True, accepting_orders=accepting_orders(zone), **public_view(zone))
+        else:
+            result["serviceable"] = result["valid"] and not table.restricted
+        results.append(result)
+    return results
+
+
+def require_serviceable(pincode) -> Optional[dict]:
+    """
+    Zone for `pincode`, or None when no zones are configured.
+    Raises HTTPException(400) for invalid or undeliverable pincodes.
+    """
+    table = get_zone_table()
+    if not table.restricted:
+        return None
+
+    if normalize_pincode(pincode) is None:
+        raise HTTPException(status_code=400, detail="Please enter a valid 6-digit pincode")
+    zone = table.lookup(pincode)
+    if zone is None:
+        raise HTTPException(status_code=400, detail=f"Sorry, we don't deliver to {pincode} yet")
+    return zone
+
+
+def require_deliverable(address: Optional[dict]) -> Optional[dict]:
+    """Checkout check: the address is in a zone that still takes orders today"""
+    if not get_zone_table().restricted:
+        return None
+    if not address or not address.get("pincode"):
+        raise HTTPException(status_code=400, detail="Delivery address with a pincode is required")
+
+    zone = require_serviceable(address["pincode"])
+    if not accepting_orders(zone):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Orders for {zone['name']} close at {zone['cutoff']}. Please order again tomorrow."
+        )
+    return zone
@@ -1,12 +1,26 @@
 """
 Redis Caching Utilities
 Provides decorators and functions for caching API responses
+
+Inside a request, reads use values prefetched by the request's Redis batch
+and writes/invalidations are queued until the response starts
+(see app/utils/request_redis.py).
 """
 
-import json
 import functools
+import logging
+import time
 from typing import Any, Optional, Callable
 from app.utils.redis_client import get_redis
+from app.utils.responses import dumps, loads, RawJSONResponse
+from app.utils.logger import get_logger, log_event, key_prefix
+from app.utils.request_redis import current_batch
+
+logger = get_logger(__name__)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
 
 
 def cache_key(*args, prefix: str = "cache") -> str:
@@ -43,12 +57,15 @@ def cache(expire_time: int = 3600):
             
             # Try to get from cache
             try:
+                started = time.perf_counter()
                 cached = redis_client.get(key)
                 if cached:
-                    print(f"✓ Cache HIT: {key}")
-                    return json.loads(cached)
+                    log_event(logger, logging.DEBUG, "cache_hit",
+                              key_prefix=key_prefix(key), latency_ms=_elapsed_ms(started))
+                    return loads(cached)
             except Exception as e:
-                print(f"⚠ Cache read error: {e}")
+                log_event(logger, logging.WARNING, "cache_read_error",
+                          key_prefix=key_prefix(key), error=str(e))
             
             # Cache miss - call function
             result = func(*args, **kwargs)
@@ -58,11 +75,13 @@ def cache(expire_time: int = 3600):
                 redis_client.setex(
                     key,
                     expire_time,
-                    json.dumps(result, default=str)
+                    dumps(result)
                 )
-                print(f"✓ Cached: {key} for {expire_time}s")
+                log_event(logger, logging.DEBUG, "cache_write",
+                          key_prefix=key_prefix(key), ttl=expire_time)
             except Exception as e:
-                print(f"⚠ Cache write error: {e}")
+                log_event(logger, logging.WARNING, "cache_write_error",
+                          key_prefix=key_prefix(key), error=str(e))
             
             return result
         
@@ -90,12 +109,15 @@ def cache_user(expire_time: int = 1800):
             key = cache_key(func.__name__, user_id, prefix="user")
             
             try:
+                started = time.perf_counter()
                 cached = redis_client.get(key)
                 if cached:
-                    print(f"✓ User Cache HIT: {key}")
-                    return json.loads(cached)
+                    log_event(logger, logging.DEBUG, "cache_hit",
+                              key_prefix=key_prefix(key), latency_ms=_elapsed_ms(started))
+                    return loads(cached)
             except Exception as e:
-                print(f"⚠ Cache read error: {e}")
+                log_event(logger, logging.WARNING, "cache_read_error",
+                          key_prefix=key_prefix(key), error=str(e))
             
             # Cache miss
             result = func(*args, user_id=user_id, **kwargs)
@@ -104,10 +126,11 @@ def cache_user(expire_time: int = 1800):
                 redis_client.setex(
                     key,
                     expire_time,
-                    json.dumps(result, default=str)
+                    dumps(result)
                 )
             except Exception as e:
-                print(f"⚠ Cache write error: {e}")
+                log_event(logger, logging.WARNING, "cache_write_error",
+                          key_prefix=key_prefix(key), error=str(e))
             
             return result
         
@@ -123,32 +146,51 @@ def invalidate_cache(*keys: str):
         invalidate_cache("cache:get_menu")
         invalidate_cache("user:user123", "user:user456")
     """
+    batch = current_batch.get()
+    if batch is not None:
+        batch.defer_delete(keys)
+        return
+
     redis_client = get_redis()
     if not redis_client:
         return
     
     try:
         deleted = redis_client.delete(*keys)
-        print(f"✓ Invalidated {deleted} cache keys")
+        log_event(logger, logging.DEBUG, "cache_invalidate",
+                  key_prefix=key_prefix(keys[0]) if keys else None, deleted=deleted)
     except Exception as e:
-        print(f"⚠ Cache invalidation error: {e}")
+        log_event(logger, logging.WARNING, "cache_invalidate_error", error=str(e))
 
 
 def set_cache(key: str, value: Any, expire_time: int = 3600):
     """Manually set cache value"""
+    batch = current_batch.get()
+    if batch is not None:
+        batch.defer_set(key, expire_time, dumps(value))
+        return
+
     redis_client = get_redis()
     if not redis_client:
         return
     
     try:
-        redis_client.setex(key, expire_time, json.dumps(value, default=str))
-        print(f"✓ Set cache: {key}")
+        redis_client.setex(key, expire_time, dumps(value))
+        log_event(logger, logging.DEBUG, "cache_write",
+                  key_prefix=key_prefix(key), ttl=expire_time)
     except Exception as e:
-        print(f"⚠ Cache set error: {e}")
+        log_event(logger, logging.WARNING, "cache_write_error",
+                  key_prefix=key_prefix(key), error=str(e))
 
 
 def get_cache(key: str):
     """Manually get cache value"""
+    batch = current_batch.get()
+    if batch is not None:
+        known, cached = batch.lookup(key)
+        if known:
+            return loads(cached) if cached else None
+
     redis_client = get_redis()
     if not redis_client:
         return None
@@ -156,13 +198,93 @@ def get_cache(key: str):
     try:
         cached = redis_client.get(key)
         if cached:
-            return json.loads(cached)
+            return loads(cached)
     except Exception as e:
-        print(f"⚠ Cache get error: {e}")
+        log_event(logger, logging.WARNING, "cache_read_error",
+                  key_prefix=key_prefix(key), error=str(e))
     
     return None
 
 
+def get_cache_raw(key: str) -> Optional[bytes]:
+    """Get the stored JSON bytes without parsing them"""
+    batch = current_batch.get()
+    if batch is not None:
+        known, body = batch.lookup(key)
+        if known:
+            log_event(logger, logging.DEBUG, "cache_hit" if body else "cache_miss",
+                      key_prefix=key_prefix(key), prefetched=True)
+            return body
+
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+
+    try:
+        started = time.perf_counter()
+        body = redis_client.execute_command("GET", key, NEVER_DECODE=True)
+        log_event(logger, logging.DEBUG, "cache_hit" if body else "cache_miss",
+                  key_prefix=key_prefix(key), latency_ms=_elapsed_ms(started))
+        return body
+    except Exception as e:
+        log_event(logger, logging.WARNING, "cache_read_error",
+                  key_prefix=key_prefix(key), error=str(e))
+
+    return None
+
+
+def set_cache_raw(key: str, body: bytes, expire_time: int = 3600):
+    """Store already-serialized JSON bytes"""
+    batch = current_batch.get()
+    if batch is not None:
+        batch.defer_set(key, expire_time, body)
+        return
+
+    redis_client = get_redis()
+    if not redis_client:
+        return
+
+    try:
+        redis_client.setex(key, expire_time, body)
+    except Exception as e:
+        log_event(logger, logging.WARNING, "cache_write_error",
+                  key_prefix=key_prefix(key), error=str(e))
+
+
+def cached_response(key: str, build: Callable[[], Any], expire_time: int = 3600):
+    """
+    Serve `key` straight from Redis as the final response bytes.
+
+    On a hit the body is never parsed or re-encoded; on a miss `build()` is
+    serialized once and the same bytes are both cached and returned.
+
+    Usage:
+        return cached_response(f"orders:list:{email}", load_orders, 300)
+    """
+    body = get_cache_raw(key)
+    if body:
+        return RawJSONResponse(body)
+
+    body = dumps(build())
+    set_cache_raw(key, body, expire_time)
+    return RawJSONResponse(body)
+
+
+def cache_response(expire_time: int = 3600):
+    """
+    Like @cache, but returns the cached bytes as a raw JSON response.
+    Only use it on route handlers (callers get a Response, not a dict).
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(func.__name__, prefix="cache")
+            return cached_response(key, lambda: func(*args, **kwargs), expire_time)
+
+        return wrapper
+    return decorator
+
+
 def clear_all_cache():
     """Clear all cache (use cautiously!)"""
     redis_client = get_redis()
@@ -171,6 +293,6 @@ def clear_all_cache():
     
     try:
         redis_client.flushdb()
-        print("✓ All cache cleared")
+        logger.info("cache_cleared")
     except Exception as e:
-        print(f"⚠ Cache clear error: {e}")
+        log_event(logger, logging.WARNING, "cache_clear_error", error=str(e))
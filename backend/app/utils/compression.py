@@ -0,0 +1,175 @@
+"""
+Response Compression Middleware
+Brotli (when the `brotli` package is installed) or gzip for API responses
+"""
+
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+)
+from app.utils.static_files import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+# Already-compressed or streaming-sensitive payloads are passed through
+EXCLUDED_CONTENT_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "text/event-stream",
+)
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so every streamed chunk reaches the client promptly
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses above `minimum_size` bytes.
+
+    - Prefers Brotli, falls back to gzip based on Accept-Encoding
+    - Streaming responses are compressed chunk by chunk
+    - Responses that already carry Content-Encoding (e.g. precompressed
+      static files) or binary media types are passed through untouched
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoder(self, scope: Scope):
+        accepted = accepted_encodings(Headers(scope=scope))
+        if brotli is not None and "br" in accepted:
+            return _BrotliEncoder(self.brotli_quality)
+        if "gzip" in accepted:
+            return _GzipEncoder(self.gzip_level)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoder = self.choose_encoder(scope)
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoder, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoder, minimum_size: int):
+        self._send = send
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.started = False
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").lower()
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or media_type.startswith(EXCLUDED_CONTENT_TYPES)
+            )
+            if self.passthrough:
+                await self._send(message)
+            else:
+                # Hold the headers until we know the body size
+                self.start_message = message
+            return
+
+        if self.passthrough or message_type != "http.response.body":
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start_message["headers"]) if self.start_message else None
+
+        if not self.started:
+            self.started = True
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(self.start_message)
+                self.start_message = None
+                await self._send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoder.name
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.encoder.compress(body)
+            else:
+                message["body"] = self.encoder.finish(body)
+                headers["Content-Length"] = str(len(message["body"]))
+
+            await self._send(self.start_message)
+            self.start_message = None
+            await self._send(message)
+            return
+
+        # Remaining chunks of a streaming response
+        if more_body:
+            message["body"] = self.encoder.compress(body)
+        else:
+            message["body"] = self.encoder.finish(body)
+        await self._send(message)
@@ -0,0 +1,156 @@
+"""
+Health, Readiness and Warm-up
+- Liveness: the process and event loop are up (no dependency checks)
+- Readiness: warm-up finished, not draining, MongoDB reachable. Redis is
+  reported but optional, since every Redis use has a MongoDB fallback
+- Dependency checks are cached for HEALTH_CHECK_TTL seconds and run one at
+  a time, so a burst of probes costs at most one ping per dependency
+- warm_up() runs in the lifespan handler before the worker accepts traffic
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import HEALTH_CHECK_TTL, REDIS_ENABLED, WARMUP_POOL_CONNECTIONS
+from app.database import get_client
+from app.utils.redis_client import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STARTING = "starting"
+READY = "ready"
+DRAINING = "draining"
+
+_state = STARTING
+
+
+def set_state(state: str):
+    global _state
+    _state = state
+    logger.info("Worker state: %s", state)
+
+
+def get_state() -> str:
+    return _state
+
+
+# =========================
+# DEPENDENCY CHECKS
+# =========================
+
+def ping_mongo():
+    get_client().admin.command("ping")
+
+
+def ping_redis():
+    if not REDIS_ENABLED:
+        return "disabled"
+    redis_client = get_redis()
+    if redis_client is None:
+        raise ConnectionError("Redis unavailable")
+    redis_client.ping()
+
+
+class CachedCheck:
+    """Run `probe` at most once per `ttl` seconds; callers share the result"""
+
+    def __init__(self, name: str, probe, ttl: float = HEALTH_CHECK_TTL):
+        self.name = name
+        self.probe = probe
+        self.ttl = ttl
+        self._result = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+        with self._lock:
+            # Another probe may have refreshed it while we waited
+            if self._result is None or time.monotonic() - self._checked_at >= self.ttl:
+                self._result = self._run()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def _run(self) -> dict:
+        started = time.perf_counter()
+        try:
+            status = self.probe() or "ok"
+            error = None
+        except Exception as e:
+            status, error = "down", str(e)
+        result = {"status": status, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+        if error:
+            result["error"] = error
+        return result
+
+
+mongo_check = CachedCheck("mongodb", ping_mongo)
+redis_check = CachedCheck("redis", ping_redis)
+
+
+def readiness() -> tuple:
+    """(ready, details) for the readiness probe"""
+    mongo = mongo_check.get()
+    redis_status = redis_check.get()
+    ready = _state == READY and mongo["status"] == "ok"
+    if ready or _state != READY:
+        status = _state
+    else:
+        status = "unavailable"
+    return ready, {
+        "status": status,
+        "checks": {"mongodb": mongo, "redis": redis_status},
+    }
+
+
+# =========================
+# WARM-UP
+# =========================
+
+def _warm_pools():
+    """Open pool connections up front instead of on the first requests"""
+    probes = [ping_mongo]
+    if get_redis():
+        probes.append(ping_redis)
+    with ThreadPoolExecutor(max_workers=WARMUP_POOL_CONNECTIONS) as pool:
+        # Concurrent pings force each pool to open several connections
+        list(pool.map(lambda probe: probe(), probes * WARMUP_POOL_CONNECTIONS))
+
+
+def _warm_menu():
+    from app.routes.menu_routes import get_menu
+    get_menu()
+
+
+def _warm_coupons():
+    from app.services.coupon_engine import get_rule_table
+    get_rule_table(force=True)
+
+
+def _warm_zones():
+    from app.services.serviceability import get_zone_table
+    get_zone_table(force=True)
+
+
+WARMUP_STEPS = [
+    ("connection pools", _warm_pools),
+    ("menu cache", _warm_menu),
+    ("coupon rules", _warm_coupons),
+    ("delivery zones", _warm_zones),
+]
+
+
+def warm_up():
+    """Run every warm-up step; a failing step is logged, not fatal"""
+    started = time.perf_counter()
+    for name, step in WARMUP_STEPS:
+        step_started = time.perf_counter()
+        try:
+            step()
+            logger.info("Warm-up %s: %.1f ms", name, (time.perf_counter() - step_started) * 1000)
+        except Exception as e:
+            logger.warning("Warm-up %s failed: %s", name, e)
+    logger.info("Warm-up finished in %.1f ms", (time.perf_counter() - started) * 1000)
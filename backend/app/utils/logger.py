@@ -0,0 +1,190 @@
+"""
+Logging
+Non-blocking, structured logging for the hot paths.
+
+- Records are pushed onto a queue by a QueueHandler; a background
+  QueueListener does the actual (blocking) I/O
+- Structured fields are passed as keyword arguments to `log_event`
+  and rendered as key=value (LOG_FORMAT=text) or JSON (LOG_FORMAT=json)
+- High-frequency DEBUG/INFO events can be sampled (LOG_SAMPLE_DEBUG /
+  LOG_SAMPLE_INFO); WARNING and above are never dropped
+- The current route is attached automatically via a context variable
+
+Usage:
+    from app.utils.logger import get_logger, log_event
+
+    logger = get_logger(__name__)
+    log_event(logger, logging.DEBUG, "cache_hit", key_prefix="orders", latency_ms=0.4)
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from typing import Optional
+
+from app.config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_DEBUG, LOG_SAMPLE_INFO
+
+ROOT_LOGGER = "app"
+
+# Route of the request being handled ("GET /orders/"), set by middleware
+current_route: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_route", default=None
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of DEBUG/INFO records; never drop warnings or errors"""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno, 1.0)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class ContextFilter(logging.Filter):
+    """Attach request context before the record leaves the request thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "route"):
+            record.route = current_route.get()
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, fmt: str = "text"):
+        super().__init__()
+        self.fmt = fmt
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = dict(getattr(record, "fields", None) or {})
+        if getattr(record, "route", None):
+            fields.setdefault("route", record.route)
+        if getattr(record, "sample_rate", None):
+            fields["sample_rate"] = record.sample_rate
+
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+        timestamp = f"{timestamp}.{int(record.msecs):03d}Z"
+
+        if self.fmt == "json":
+            payload = {
+                "ts": timestamp,
+                "level": record.levelname,
+                "logger": record.name,
+                "event": record.getMessage(),
+                **fields,
+            }
+            if record.exc_info:
+                payload["exc"] = self.formatException(record.exc_info)
+            return json.dumps(payload, default=str)
+
+        line = f"{timestamp} {record.levelname:<7} {record.name} {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def setup_logging():
+    """Install the queue handler on the `app` logger (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter({
+        logging.DEBUG: LOG_SAMPLE_DEBUG,
+        logging.INFO: LOG_SAMPLE_INFO,
+    }))
+    queue_handler.addFilter(ContextFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(StructuredFormatter(LOG_FORMAT))
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LOG_LEVEL)
+    root.handlers = [queue_handler]
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    # The listener thread does not survive fork; start a fresh one in the child
+    global _listener
+    _listener = None
+    setup_logging()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name: str) -> logging.Logger:
+    setup_logging()
+    if not name.startswith(ROOT_LOGGER):
+        name = f"{ROOT_LOGGER}.{name}"
+    return logging.getLogger(name)
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields):
+    """Log `event` with structured fields; free when the level is disabled"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def key_prefix(key: str) -> str:
+    """'orders:list:a@b.com' -> 'orders:list' (never logs the identifier)"""
+    parts = key.split(":")
+    return ":".join(parts[:2]) if len(parts) > 2 else parts[0]
+
+
+class RequestContextMiddleware:
+    """Expose the current route to log records emitted during the request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_route.set(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
@@ -0,0 +1,290 @@
+"""
+Request Metrics
+Per-route latency histograms with a per-request breakdown of where the
+time went: MongoDB commands, Redis commands, auth and handler code.
+
+- MetricsMiddleware opens a RequestStats for every HTTP request
+- MongoCommandListener (pymongo monitoring) and InstrumentedRedis add
+  command timings to the RequestStats of the request that issued them
+- Histograms are exported in Prometheus text format at /metrics
+- With METRICS_SERVER_TIMING, a Server-Timing header is added per response
+
+No prometheus_client dependency: the few metric types we need are below.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import redis
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+
+from app.config import METRICS_SERVER_TIMING
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+# =========================
+# METRIC TYPES
+# =========================
+
+class Histogram:
+    """Thread-safe labelled histogram (Prometheus semantics)"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items()]
+        for label_values, (counts, total, count) in sorted(items):
+            base = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _join(base, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            le = _join(base, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{{{le}}} {count}")
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _join(*parts) -> str:
+    return ",".join(part for part in parts if part)
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Request latency", ("method", "route", "status"))
+REQUEST_MONGO_TIME = Histogram(
+    "http_request_mongo_seconds", "MongoDB time per request", ("route",))
+REQUEST_REDIS_TIME = Histogram(
+    "http_request_redis_seconds", "Redis time per request", ("route",))
+REQUEST_MONGO_CALLS = Histogram(
+    "http_request_mongo_calls", "MongoDB commands per request", ("route",), COUNT_BUCKETS)
+REQUEST_REDIS_CALLS = Histogram(
+    "http_request_redis_calls", "Redis commands per request", ("route",), COUNT_BUCKETS)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ("command",))
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds", "Redis command latency", ("command",))
+
+ALL_METRICS = [
+    REQUEST_DURATION,
+    REQUEST_MONGO_TIME,
+    REQUEST_REDIS_TIME,
+    REQUEST_MONGO_CALLS,
+    REQUEST_REDIS_CALLS,
+    MONGO_COMMAND_DURATION,
+    REDIS_COMMAND_DURATION,
+]
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_endpoint():
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+# =========================
+# PER-REQUEST ATTRIBUTION
+# =========================
+
+class RequestStats:
+    __slots__ = ("started", "mongo_seconds", "mongo_calls", "redis_seconds",
+                 "redis_calls", "spans")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.mongo_seconds = 0.0
+        self.mongo_calls = 0
+        self.redis_seconds = 0.0
+        self.redis_calls = 0
+        self.spans = {}
+
+    def server_timing(self, total: float) -> str:
+        spans_total = sum(self.spans.values())
+        app_time = max(total - self.mongo_seconds - self.redis_seconds - spans_total, 0.0)
+        parts = [
+            f"app;dur={app_time * 1000:.2f}",
+            f'mongo;dur={self.mongo_seconds * 1000:.2f};desc="{self.mongo_calls} calls"',
+            f'redis;dur={self.redis_seconds * 1000:.2f};desc="{self.redis_calls} calls"',
+        ]
+        parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items())
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+current_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request_stats", default=None
+)
+
+
+@contextmanager
+def timed(span: str):
+    """
+    Attribute a block of handler code to a named span, e.g. timed("auth").
+    Mongo/Redis time inside the block is still reported under mongo/redis.
+    """
+    stats = current_stats.get()
+    if stats is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    mongo_before, redis_before = stats.mongo_seconds, stats.redis_seconds
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        io_time = (stats.mongo_seconds - mongo_before) + (stats.redis_seconds - redis_before)
+        stats.spans[span] = stats.spans.get(span, 0.0) + max(elapsed - io_time, 0.0)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """pymongo calls these synchronously in the thread that ran the command"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    def _record(self, event):
+        seconds = event.duration_micros / 1_000_000
+        MONGO_COMMAND_DURATION.observe(seconds, event.command_name)
+        stats = current_stats.get()
+        if stats is not None:
+            stats.mongo_seconds += seconds
+            stats.mongo_calls += 1
+
+
+class _RedisTimingMixin:
+    def _record_redis(self, command: str, seconds: float, calls: int = 1):
+        REDIS_COMMAND_DURATION.observe(seconds, command)
+        stats = current_stats.get()
+        if stats is not None:
+            stats.redis_seconds += seconds
+            stats.redis_calls += calls
+
+
+class InstrumentedPipeline(_RedisTimingMixin, redis.client.Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            # A pipeline is a single round trip
+            self._record_redis("PIPELINE", time.perf_counter() - started)
+
+
+class InstrumentedRedis(_RedisTimingMixin, redis.Redis):
+    """redis.Redis that reports every command (and pipeline) it sends"""
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            self._record_redis(str(args[0]).upper(), time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+# =========================
+# MIDDLEWARE
+# =========================
+
+class MetricsMiddleware:
+    """Time each request and attribute its Mongo/Redis usage to the route"""
+
+    def __init__(self, app, server_timing: bool = METRICS_SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        status_code = 500
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            total = time.perf_counter() - stats.started
+            REQUEST_DURATION.observe(total, scope["method"], route_path, str(status_code))
+            REQUEST_MONGO_TIME.observe(stats.mongo_seconds, route_path)
+            REQUEST_REDIS_TIME.observe(stats.redis_seconds, route_path)
+            REQUEST_MONGO_CALLS.observe(stats.mongo_calls, route_path)
+            REQUEST_REDIS_CALLS.observe(stats.redis_calls, route_path)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        stats.server_timing(time.perf_counter() - stats.started),
+                    )
+            await send(message)
+            # Stop the clock when the body is out, not after background tasks
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
+            current_stats.reset(token)
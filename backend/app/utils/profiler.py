@@ -0,0 +1,360 @@
+"""
+On-Demand Request Profiler
+Sampling profiler for individual production requests, e.g. the one slow
+user with thousands of orders that never reproduces locally.
+
+A request is profiled when it carries a valid signed header
+
+    X-Profile: <expires_at>.<hex hmac-sha256(ADMIN_API_KEY, expires_at)>
+
+or matches the sampling rule (PROFILE_SAMPLE_PATHS + PROFILE_SAMPLE_RATE).
+A background thread then snapshots the stacks of the threads working on
+that request every PROFILE_INTERVAL_MS and aggregates them into collapsed
+stacks (flamegraph.pl / speedscope format). The result is stored in Redis
+(PROFILE_TTL_SECONDS) or, without Redis, under PROFILE_DIR, and fetched
+via /admin/profiles. The response carries an X-Profile-Id header.
+
+Threads belonging to the request are those whose stack contains the route's
+endpoint, plus threads that called `mark_thread()` during the request
+(get_current_user runs in its own threadpool worker). Concurrent requests
+to the same endpoint are sampled too; profile under normal traffic, not
+during a load test.
+
+Cost: nothing unless PROFILING_ENABLED (the middleware is not installed);
+when enabled, a header lookup per request until a profile is triggered.
+
+Signing a header (valid for 5 minutes):
+    python -m app.utils.profiler sign 300
+"""
+
+import contextvars
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from app.config import (
+    ADMIN_API_KEY,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SAMPLE_PATHS,
+    PROFILE_INTERVAL_MS,
+    PROFILE_TTL_SECONDS,
+    PROFILE_DIR,
+)
+from app.utils.redis_client import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_KEY_PREFIX = "profile:"
+PROFILE_INDEX_KEY = "profiles:index"
+MAX_INDEXED_PROFILES = 200
+MAX_TOKEN_LIFETIME = 60 * 60
+MAX_STACK_DEPTH = 128
+TOP_FUNCTIONS = 25
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = os.path.dirname(APP_DIR)
+
+
+# =========================
+# TRIGGERS
+# =========================
+
+def sign_profile_token(lifetime: int = 300, key: Optional[str] = ADMIN_API_KEY) -> str:
+    if not key:
+        raise RuntimeError("ADMIN_API_KEY is not configured")
+    expires_at = str(int(time.time()) + lifetime)
+    signature = hmac.new(key.encode(), expires_at.encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{signature}"
+
+
+def verify_profile_token(token: str, key: Optional[str] = ADMIN_API_KEY) -> bool:
+    if not key or "." not in token:
+        return False
+    expires_at, signature = token.split(".", 1)
+    if not expires_at.isdigit():
+        return False
+    now = time.time()
+    if not now <= int(expires_at) <= now + MAX_TOKEN_LIFETIME:
+        return False
+    expected = hmac.new(key.encode(), expires_at.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def should_profile(scope) -> Optional[str]:
+    """Trigger name ("header" / "sampled") or None"""
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return "header" if verify_profile_token(value.decode("latin-1")) else None
+
+    if PROFILE_SAMPLE_RATE > 0 and scope["path"].startswith(tuple(PROFILE_SAMPLE_PATHS)):
+        if random.random() < PROFILE_SAMPLE_RATE:
+            return "sampled"
+    return None
+
+
+# =========================
+# SAMPLING
+# =========================
+
+class RequestProfile:
+    def __init__(self, scope, trigger: str, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.id = uuid.uuid4().hex
+        self.scope = scope
+        self.trigger = trigger
+        self.interval = interval
+        self.started_at = datetime.utcnow()
+        self.duration = 0.0
+        self.status_code = None
+        self.samples = 0
+        self.stacks = Counter()
+        self.thread_ids = set()
+        self._stop_event = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.id[:8]}", daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _endpoint_code(self):
+        # Set by the router once the request has been matched
+        endpoint = self.scope.get("endpoint")
+        return getattr(endpoint, "__code__", None)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            endpoint_code = self._endpoint_code()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collect(frame, endpoint_code, thread_id in self.thread_ids)
+                if stack:
+                    self.stacks[stack] += 1
+            self.samples += 1
+
+    def top_functions(self) -> list:
+        """Functions by self time (leaf samples) and total time"""
+        self_counts, total_counts = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            for frame in set(stack):
+                total_counts[frame] += count
+        return [
+            {"function": name, "self": count, "total": total_counts[name]}
+            for name, count in self_counts.most_common(TOP_FUNCTIONS)
+        ]
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common())
+
+    def to_dict(self) -> dict:
+        route = self.scope.get("route")
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "method": self.scope["method"],
+            "path": self.scope["path"],
+            "route": getattr(route, "path", None),
+            "status": self.status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 2),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "top": self.top_functions(),
+            "collapsed": self.collapsed(),
+        }
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(BASE_DIR):
+        filename = os.path.relpath(filename, BASE_DIR)
+    else:
+        filename = "/".join(filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _collect(frame, endpoint_code, registered: bool) -> Optional[tuple]:
+    """Root-first stack labels if this thread is working on the request"""
+    codes = []
+    while frame is not None and len(codes) < MAX_STACK_DEPTH:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+
+    in_endpoint = endpoint_code is not None and endpoint_code in codes
+    if not in_endpoint and not (
+        registered and any(code.co_filename.startswith(APP_DIR) for code in codes)
+    ):
+        # Idle threadpool worker, or a thread serving another request
+        return None
+    return tuple(_label(code) for code in reversed(codes))
+
+
+current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+def mark_thread():
+    """Include the calling thread in the active request profile, if any"""
+    profile = current_profile.get()
+    if profile is not None:
+        profile.thread_ids.add(threading.get_ident())
+
+
+# =========================
+# STORAGE
+# =========================
+
+def save_profile(profile: RequestProfile):
+    data = profile.to_dict()
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.setex(f"{PROFILE_KEY_PREFIX}{profile.id}", PROFILE_TTL_SECONDS, json.dumps(data))
+            pipe.zadd(PROFILE_INDEX_KEY, {profile.id: time.time()})
+            pipe.zremrangebyrank(PROFILE_INDEX_KEY, 0, -MAX_INDEXED_PROFILES - 1)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning("Profile store error, writing to disk: %s", e)
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(os.path.join(PROFILE_DIR, f"{profile.id}.json"), "w") as f:
+        json.dump(data, f)
+
+
+def _stop_and_save(profile: RequestProfile):
+    profile.stop()
+    save_profile(profile)
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    if not profile_id.isalnum():
+        return None
+
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            data = redis_client.get(f"{PROFILE_KEY_PREFIX}{profile_id}")
+            if data:
+                return json.loads(data)
+        except Exception as e:
+            logger.warning("Profile load error: %s", e)
+
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return None
+
+
+def list_profiles(limit: int = 50) -> list:
+    """Most recent first, without the stacks"""
+    ids = []
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            ids = redis_client.zrevrange(PROFILE_INDEX_KEY, 0, limit - 1)
+        except Exception as e:
+            logger.warning("Profile index error: %s", e)
+
+    if not ids and os.path.isdir(PROFILE_DIR):
+        files = sorted(
+            (entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+        ids = [entry.name[:-5] for entry in files[:limit]]
+
+    profiles = []
+    for profile_id in ids:
+        data = load_profile(profile_id)
+        if data:  # expired ids stay in the index until trimmed
+            data.pop("collapsed", None)
+            data.pop("top", None)
+            profiles.append(data)
+    return profiles
+
+
+# =========================
+# MIDDLEWARE
+# =========================
+
+class ProfilerMiddleware:
+    """Run triggered requests under the sampling profiler"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = should_profile(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope, trigger)
+        token = current_profile.set(profile)
+
+        finished = False
+
+        async def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            # stop() joins the sampler (up to one interval): off the event loop
+            await run_in_threadpool(_stop_and_save, profile)
+            logger.info(
+                "Profiled %s %s (%s): %s samples, id=%s",
+                scope["method"], scope["path"], trigger, profile.samples, profile.id,
+            )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            # Stop sampling and store the profile with the last body chunk, not
+            # after background tasks, so X-Profile-Id resolves once it's received
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                await finish()
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            await finish()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "sign":
+        lifetime = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+        print(f"X-Profile: {sign_profile_token(lifetime)}")
+    else:
+        print("usage: python -m app.utils.profiler sign [seconds]")
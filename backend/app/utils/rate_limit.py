@@ -0,0 +1,227 @@
+"""
+Rate Limiting and Load Shedding
+- Per-route token buckets (RATE_LIMIT_RULES) keyed by client IP or by the
+  JWT email, kept in Redis and updated by one atomic Lua call per request
+  so every worker shares the same budget
+- If Redis is unavailable the same buckets are kept in-process (per
+  worker), so limits degrade instead of disappearing
+- A per-worker concurrency cap (MAX_CONCURRENT_REQUESTS) answers 503
+  immediately once that many requests are in flight, instead of queueing
+  them behind the threadpool and letting tail latency grow without bound
+
+Rejections are 429 / 503 with Retry-After and never reach the route.
+"""
+
+import re
+import threading
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import RATE_LIMIT_RULES, MAX_CONCURRENT_REQUESTS
+from app.utils.jwt import verify_token
+from app.utils.redis_client import get_script
+from app.utils.responses import FastJSONResponse
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Probes and metrics scrapes must keep working while shedding load
+EXEMPT_PREFIXES = ("/health", "/metrics")
+MAX_LOCAL_BUCKETS = 50_000
+
+# KEYS[1] = bucket hash {tokens, ts}
+# ARGV[1] = capacity, ARGV[2] = refill rate (tokens per second)
+# Returns {allowed, retry_after_ms, tokens_left}; the clock is Redis TIME so
+# all workers agree on it
+TOKEN_BUCKET_LUA = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2]) / 1000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now_ms
+tokens = math.min(capacity, tokens + math.max(0, now_ms - ts) * rate)
+local allowed = 0
+local retry_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_ms = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry_ms, math.floor(tokens)}
+"""
+
+RULE_RE = re.compile(r"^([A-Z]+)\s+(\S+)\s+(\d+)/(\d+)s\s+(ip|user)$")
+
+
+class Rule:
+    __slots__ = ("method", "path", "prefix", "capacity", "rate", "identity", "name")
+
+    def __init__(self, method: str, path: str, capacity: int, period: int, identity: str):
+        self.method = method
+        self.prefix = path.endswith("*")
+        self.path = path.rstrip("*")
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.identity = identity
+        self.name = f"{method} {path}"
+
+
+def parse_rules(spec: str) -> list:
+    rules = []
+    for part in spec.split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        match = RULE_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid RATE_LIMIT_RULES entry: {part!r}")
+        method, path, limit, period, identity = match.groups()
+        rules.append(Rule(method, path, int(limit), int(period), identity))
+    return rules
+
+
+def match_rule(rules: list, method: str, path: str) -> Optional[Rule]:
+    for rule in rules:
+        if rule.method != method:
+            continue
+        if rule.prefix:
+            if path.startswith(rule.path):
+                return rule
+        elif path == rule.path or path.rstrip("/") == rule.path.rstrip("/"):
+            return rule
+    return None
+
+
+def client_identity(scope, rule: Rule) -> str:
+    """JWT email for "user" rules (IP if unauthenticated), otherwise the IP"""
+    if rule.identity == "user":
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                payload = verify_token(token) if scheme.lower() == "bearer" else None
+                if payload and payload.get("email"):
+                    return f"user:{payload['email']}"
+                break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+# =========================
+# BUCKETS
+# =========================
+
+class LocalBuckets:
+    """In-process token buckets, used while Redis is unavailable"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> tuple:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                allowed, retry_ms = True, 0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_ms = False, int((1 - tokens) / rate * 1000) + 1
+            if len(self._buckets) > MAX_LOCAL_BUCKETS:
+                self._evict(now)
+        return allowed, retry_ms
+
+    def _evict(self, now: float):
+        # Buckets idle for a minute are (nearly) full again: forget them
+        self._buckets = {
+            key: state for key, state in self._buckets.items() if now - state[1] < 60
+        }
+
+
+local_buckets = LocalBuckets()
+
+
+def take_token(rule: Rule, identity: str) -> tuple:
+    """(allowed, retry_after_ms) for one request"""
+    key = f"ratelimit:{rule.name}:{identity}"
+    script = get_script(TOKEN_BUCKET_LUA)
+    if script is not None:
+        try:
+            allowed, retry_ms, _ = script(keys=[key], args=[rule.capacity, rule.rate])
+            return bool(allowed), int(retry_ms)
+        except Exception as e:
+            logger.warning("Rate limit via Redis failed, using local buckets: %s", e)
+    return local_buckets.take(key, rule.capacity, rule.rate)
+
+
+# =========================
+# MIDDLEWARE
+# =========================
+
+async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: int):
+    response = FastJSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(retry_after, 1))},
+    )
+    await response(scope, receive, send)
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, rules: Optional[list] = None, max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+        self.app = app
+        self.rules = parse_rules(RATE_LIMIT_RULES) if rules is None else rules
+        self.max_concurrent = max_concurrent
+        # Only touched on the event loop thread, no lock needed
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            await _reject(scope, receive, send, 503, "Server busy, please retry", 1)
+            return
+
+        rule = match_rule(self.rules, scope["method"], scope["path"])
+        if rule is not None:
+            identity = client_identity(scope, rule)
+            # Redis call off the event loop, like the routes' own calls
+            allowed, retry_ms = await run_in_threadpool(take_token, rule, identity)
+            if not allowed:
+                await _reject(
+                    scope, receive, send, 429,
+                    "Too many requests, please slow down",
+                    -(-retry_ms // 1000),
+                )
+                return
+
+        self.in_flight += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight -= 1
+
+        async def send_wrapper(message):
+            await send(message)
+            # Free the slot when the body is out, not after background tasks
+            # (checkout queues auto_progress_order, which runs for minutes)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
@@ -0,0 +1,112 @@
+"""
+Read Preference Routing
+Lets read-heavy routes be served by replica set secondaries while keeping
+read-your-writes for the user who just changed something.
+
+- Routes opt in with @secondary_reads(max_staleness=...). While such a
+  route runs, every collection handle from app.database reads with
+  secondaryPreferred + maxStalenessSeconds; writes still go to the primary
+  (read preference never affects writes). Everything else reads from the
+  primary, as before.
+- A mutating request (anything but GET/HEAD/OPTIONS) pins its user to the
+  primary for READ_PIN_SECONDS. The pin is a Redis key that is read in
+  the auth MGET and written in the response pipeline (request_redis), so
+  it costs no extra round trip. Pinned users get primary reads everywhere.
+- Background threads, workers and scripts never route: they have no route
+  preference, so they keep reading from the primary.
+
+On a standalone server the preference is ignored by the driver, so the
+decorators are harmless outside a replica set.
+
+Usage:
+    @router.get("/")
+    @secondary_reads()
+    def get_menu(): ...
+"""
+
+import asyncio
+import contextvars
+import functools
+from contextlib import contextmanager
+from typing import Optional
+
+from pymongo.read_preferences import SecondaryPreferred
+
+from app.config import READ_FROM_SECONDARIES, READ_MAX_STALENESS_SECONDS, READ_PIN_SECONDS
+from app.utils.request_redis import current_batch
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_route_preference: contextvars.ContextVar = contextvars.ContextVar(
+    "route_read_preference", default=None
+)
+
+
+def read_pin_key(email: str) -> str:
+    return f"readpin:{email}"
+
+
+@contextmanager
+def use_preference(preference):
+    token = _route_preference.set(preference)
+    try:
+        yield
+    finally:
+        _route_preference.reset(token)
+
+
+def secondary_reads(max_staleness: int = READ_MAX_STALENESS_SECONDS):
+    """Allow this route's reads to go to secondaries lagging at most `max_staleness` s"""
+    preference = SecondaryPreferred(max_staleness=max(max_staleness, 90))
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with use_preference(preference):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with use_preference(preference):
+                    return func(*args, **kwargs)
+
+        # get_current_user reads it to route the principal lookup too
+        wrapper.read_preference = preference
+        return wrapper
+    return decorator
+
+
+def note_user(method: str, email: str):
+    """
+    Called by get_current_user after the auth MGET (which included the pin
+    key). Pins the user on writes, and marks the request pinned if the user
+    wrote recently.
+    """
+    batch = current_batch.get()
+    if batch is None or not READ_FROM_SECONDARIES:
+        return
+    key = read_pin_key(email)
+    if method not in SAFE_METHODS:
+        batch.read_pinned = True
+        batch.defer_set(key, READ_PIN_SECONDS, b"1")
+    else:
+        batch.read_pinned = bool(batch.lookup(key)[1])
+
+
+def current_read_preference():
+    """Read preference for collection handles right now (None = primary)"""
+    if not READ_FROM_SECONDARIES:
+        return None
+    preference = _route_preference.get()
+    if preference is None:
+        return None
+    batch = current_batch.get()
+    # Outside a request, or the user wrote recently: primary
+    if batch is None or batch.read_pinned:
+        return None
+    return preference
+
+
+def endpoint_preference(endpoint) -> Optional[SecondaryPreferred]:
+    return getattr(endpoint, "read_preference", None)
@@ -1,20 +1,40 @@
+import logging
+import os
+import time
+
 import redis
-from app.config import REDIS_HOST, REDIS_PORT, REDIS_ENABLED
+from app.config import REDIS_HOST, REDIS_PORT, REDIS_ENABLED, METRICS_ENABLED
+from app.utils.logger import get_logger, log_event
+from app.utils.metrics import InstrumentedRedis
+
+logger = get_logger(__name__)
+
+# After a failed connect, don't retry (and block for the timeout) on every call
+RETRY_AFTER_SECONDS = 10
 
 _redis_client = None
+_scripts = {}
+_last_failure = 0.0
+_disabled_logged = False
 
 
 def get_redis():
-    global _redis_client
+    global _redis_client, _last_failure, _disabled_logged
 
     if not REDIS_ENABLED:
-        print("⚠ Redis is DISABLED in config (REDIS_ENABLED=false)")
+        if not _disabled_logged:
+            logger.warning("Redis is DISABLED in config (REDIS_ENABLED=false)")
+            _disabled_logged = True
         return None
 
     if _redis_client is None:
+        if _last_failure and time.monotonic() - _last_failure < RETRY_AFTER_SECONDS:
+            return None
+
         try:
-            print(f"🔄 Attempting Redis connection to {REDIS_HOST}:{REDIS_PORT}...")
-            _redis_client = redis.Redis(
+            log_event(logger, logging.INFO, "redis_connecting", host=REDIS_HOST, port=REDIS_PORT)
+            redis_class = InstrumentedRedis if METRICS_ENABLED else redis.Redis
+            _redis_client = redis_class(
                 host=REDIS_HOST,
                 port=REDIS_PORT,
                 decode_responses=True,
@@ -22,18 +42,50 @@ def get_redis():
                 socket_timeout=2,
             )
             _redis_client.ping()
-            print(f"✅ Redis connected successfully to {REDIS_HOST}:{REDIS_PORT}")
+            _last_failure = 0.0
+            log_event(logger, logging.INFO, "redis_connected", host=REDIS_HOST, port=REDIS_PORT)
         except ConnectionRefusedError as e:
-            print(f"❌ Redis connection refused - Server not running on {REDIS_HOST}:{REDIS_PORT}")
-            print(f"   Error: {e}")
+            log_event(logger, logging.ERROR, "redis_connection_refused",
+                      host=REDIS_HOST, port=REDIS_PORT, error=str(e))
             _redis_client = None
         except TimeoutError as e:
-            print(f"❌ Redis connection timeout - Server not responding")
-            print(f"   Error: {e}")
+            log_event(logger, logging.ERROR, "redis_connection_timeout",
+                      host=REDIS_HOST, port=REDIS_PORT, error=str(e))
             _redis_client = None
         except Exception as e:
-            print(f"❌ Redis connection failed: {e}")
-            print(f"   Host: {REDIS_HOST}, Port: {REDIS_PORT}")
+            log_event(logger, logging.ERROR, "redis_connection_failed",
+                      host=REDIS_HOST, port=REDIS_PORT, error=str(e))
             _redis_client = None
 
+        if _redis_client is None:
+            _last_failure = time.monotonic()
+
     return _redis_client
+
+
+def _reset_after_fork():
+    # Connections inherited from the parent must not be shared with it
+    global _redis_client, _scripts, _last_failure
+    _redis_client = None
+    _scripts = {}
+    _last_failure = 0.0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_script(source: str):
+    """
+    Return a registered Lua script for the shared client (None if Redis is off).
+    Scripts are sent with EVALSHA and reloaded transparently by redis-py.
+    """
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+
+    script = _scripts.get(source)
+    if script is None or script.registered_client is not redis_client:
+        script = redis_client.register_script(source)
+        _scripts[source] = script
+    return script
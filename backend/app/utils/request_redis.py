@@ -0,0 +1,162 @@
+"""
+Request-Scoped Redis Batching
+Collapses the Redis traffic of one request into (at most) two round trips:
+
+- Reads known up front are fetched with a single MGET during auth: the
+  token blacklist key plus the cache keys the route declares with
+  @prefetch(...). cached_response() then finds its key already loaded.
+- Cache writes and invalidations made while handling the request are
+  queued and sent as one pipeline just before the response starts, so
+  the next request from the same client already sees them. Other
+  fire-and-forget commands (counters) can ride along via defer_commands.
+
+Outside a request (background tasks, workers, scripts) there is no batch
+and the cache helpers talk to Redis directly, as before.
+
+Usage:
+    @router.get("/")
+    @prefetch(lambda email, params, query: [f"orders:list:{email}"])
+    def get_my_orders(user=Depends(get_current_user)): ...
+"""
+
+import contextvars
+from typing import Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.redis_client import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RequestRedis:
+    """Prefetched values and deferred writes of one request"""
+
+    __slots__ = ("values", "pending_sets", "pending_deletes", "pending_commands", "read_pinned")
+
+    def __init__(self):
+        self.values = {}
+        self.pending_sets = {}
+        self.pending_deletes = set()
+        self.pending_commands = []
+        # Set by read_routing.note_user: this user must read from the primary
+        self.read_pinned = False
+
+    def prefetch(self, keys: list) -> list:
+        """MGET the keys in one round trip; returns raw bytes / None per key"""
+        redis_client = get_redis()
+        if redis_client:
+            try:
+                fetched = redis_client.execute_command("MGET", *keys, NEVER_DECODE=True)
+                self.values.update(zip(keys, fetched))
+            except Exception as e:
+                logger.warning("Redis prefetch error: %s", e)
+        return [self.lookup(key)[1] for key in keys]
+
+    def lookup(self, key: str) -> tuple:
+        """(known, value), taking this request's own pending writes into account"""
+        if key in self.pending_deletes:
+            return True, None
+        if key in self.pending_sets:
+            return True, self.pending_sets[key][1]
+        if key in self.values:
+            return True, self.values[key]
+        return False, None
+
+    def defer_set(self, key: str, expire_time: int, body):
+        self.pending_deletes.discard(key)
+        self.pending_sets[key] = (expire_time, body)
+
+    def defer_delete(self, keys):
+        for key in keys:
+            self.pending_sets.pop(key, None)
+            self.pending_deletes.add(key)
+
+    def defer_commands(self, commands: list):
+        """Raw commands, e.g. ("HINCRBY", key, field, 1); results are discarded"""
+        self.pending_commands.extend(commands)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.pending_sets or self.pending_deletes or self.pending_commands)
+
+    def flush(self):
+        """Send every queued write in one pipeline"""
+        if not self.dirty:
+            return
+        sets, deletes, commands = self.pending_sets, self.pending_deletes, self.pending_commands
+        self.pending_sets, self.pending_deletes, self.pending_commands = {}, set(), []
+
+        redis_client = get_redis()
+        if not redis_client:
+            return
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            if deletes:
+                pipe.delete(*deletes)
+            for key, (expire_time, body) in sets.items():
+                pipe.setex(key, expire_time, body)
+            for command in commands:
+                pipe.execute_command(*command)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Redis flush error: %s", e)
+
+
+current_batch: contextvars.ContextVar[Optional[RequestRedis]] = contextvars.ContextVar(
+    "current_redis_batch", default=None
+)
+
+
+def prefetch(build: Callable[[str, dict, dict], list]):
+    """Declare the cache keys a route reads: build(email, path_params, query_params)"""
+    def decorator(func):
+        func.prefetch_keys = build
+        return func
+    return decorator
+
+
+def prefetch_for_request(request, token: str, email: str, extra_keys: tuple = ()) -> bool:
+    """
+    Load the blacklist entry, `extra_keys` and the route's declared cache
+    keys together. Returns True if the token has been revoked.
+    """
+    keys = [f"blacklist:{token}", *extra_keys]
+    build = getattr(request.scope.get("endpoint"), "prefetch_keys", None)
+    if build is not None:
+        keys.extend(build(email, request.path_params, request.query_params))
+
+    batch = current_batch.get()
+    if batch is None:
+        # Not behind the middleware: still one round trip for this call
+        batch = RequestRedis()
+    return bool(batch.prefetch(keys)[0])
+
+
+class RedisBatchMiddleware:
+    """Open a RequestRedis per request and flush it before the response starts"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        batch = RequestRedis()
+        token = current_batch.set(batch)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and batch.dirty:
+                await run_in_threadpool(batch.flush)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_batch.reset(token)
+            # Writes made by a handler that failed before responding
+            if batch.dirty:
+                await run_in_threadpool(batch.flush)
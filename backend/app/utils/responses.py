@@ -0,0 +1,48 @@
+"""
+Fast JSON Responses
+orjson-backed encoding (stdlib json fallback) and a response class for
+bodies that are already serialized, e.g. straight out of the cache.
+"""
+
+import json
+from typing import Any
+
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, stdlib json always works
+    orjson = None
+
+
+def _default(value: Any):
+    # ObjectId, Decimal, ... -> same behaviour as json.dumps(default=str)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize to compact JSON bytes (datetimes as ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Pre-serialized JSON body, sent as-is without parsing or re-encoding"""
+
+    media_type = "application/json"
@@ -0,0 +1,166 @@
+"""
+Static File Serving
+Serves precompressed .br/.gz siblings, zero-copy sends large files and
+sets long-lived cache headers for content-hashed assets
+"""
+
+import os
+import re
+import mimetypes
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Receive, Scope, Send
+
+from app.config import STATIC_MAX_AGE, STATIC_SENDFILE_MIN_SIZE
+
+# Encodings we look for next to the original file, in order of preference
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Matches fingerprinted names like app.3f9a1c2b.js or logo-3f9a1c2b7d.png
+HASHED_ASSET_RE = re.compile(r"[.-][0-9a-fA-F]{8,}\.[A-Za-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def accepted_encodings(headers: Headers) -> set:
+    """Parse Accept-Encoding into a set of codings the client will take"""
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class SendfileResponse(FileResponse):
+    """
+    FileResponse that hands large files to the server for zero-copy sending.
+
+    Uses the ASGI ``http.response.zerocopysend`` extension when the server
+    advertises it; otherwise falls back to Starlette's own path (which uses
+    ``http.response.pathsend`` where available) with a larger chunk size.
+    """
+
+    chunk_size = 1024 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        if (
+            scope["type"] != "http"
+            or scope.get("method") == "HEAD"
+            or "http.response.zerocopysend" not in extensions
+            or "range" in Headers(scope=scope)
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            count = os.fstat(fd).st_size
+            await send({
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            })
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": fd,
+                "offset": 0,
+                "count": count,
+                "more_body": False,
+            })
+        finally:
+            os.close(fd)
+
+        if self.background is not None:
+            await self.background()
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Drop-in replacement for StaticFiles.
+
+    - Serves ``<file>.br`` / ``<file>.gz`` when present and accepted by the client
+    - Sends files above STATIC_SENDFILE_MIN_SIZE with SendfileResponse
+    - Marks fingerprinted assets as immutable, others get STATIC_MAX_AGE
+    """
+
+    def __init__(self, *args, max_age: int = STATIC_MAX_AGE,
+                 sendfile_min_size: int = STATIC_SENDFILE_MIN_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+        self.sendfile_min_size = sendfile_min_size
+
+    def cache_control_for(self, full_path: str) -> str:
+        if HASHED_ASSET_RE.search(os.path.basename(full_path)):
+            return IMMUTABLE_CACHE_CONTROL
+        return f"public, max-age={self.max_age}"
+
+    def find_precompressed(self, full_path: str, request_headers: Headers):
+        """Return (encoding, path, stat) of the best precompressed sibling, if any"""
+        # Byte ranges refer to the identity representation
+        if "range" in request_headers:
+            return None
+
+        accepted = accepted_encodings(request_headers)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            candidate = full_path + suffix
+            try:
+                candidate_stat = os.stat(candidate)
+            except OSError:
+                continue
+            return encoding, candidate, candidate_stat
+        return None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ):
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type: Optional[str] = mimetypes.guess_type(full_path)[0] or "text/plain"
+        has_variants = False
+
+        serve_path, serve_stat, encoding = full_path, stat_result, None
+        precompressed = self.find_precompressed(full_path, request_headers)
+        if precompressed:
+            encoding, serve_path, serve_stat = precompressed
+        else:
+            has_variants = any(
+                os.path.exists(full_path + suffix) for _, suffix in PRECOMPRESSED_ENCODINGS
+            )
+
+        response_class = (
+            SendfileResponse if serve_stat.st_size >= self.sendfile_min_size else FileResponse
+        )
+        response = response_class(
+            serve_path,
+            status_code=status_code,
+            stat_result=serve_stat,
+            media_type=media_type,
+        )
+        response.headers["Cache-Control"] = self.cache_control_for(full_path)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if encoding or has_variants:
+            response.headers["Vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Delivery Batching Benchmark
+Plans rider batches for generated open orders (several zones, a few
+delivery windows, clustered pincodes and shared addresses), then measures
+incremental re-planning as single orders arrive or get cancelled.
+
+Usage:
+    python benchmarks/bench_batching.py [--orders 5000] [--zones 8] [--windows 4] [--updates 500]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import DELIVERY_WINDOW_MINUTES, DELIVERY_BATCH_MAX_ORDERS, DELIVERY_BATCH_MAX_ITEMS
+from app.services.delivery_batching import DeliveryPlanner
+
+
+def make_orders(rng: random.Random, count: int, zones: int, windows: int, start: datetime) -> list:
+    # Each zone covers a run of neighbouring pincodes with a few busy buildings
+    zone_pins = {f"zone-{z}": [411001 + z * 40 + p for p in range(rng.randint(8, 30))] for z in range(zones)}
+    buildings = {zone: [f"{rng.randint(1, 400)} Building {b}" for b in range(60)] for zone in zone_pins}
+    orders = []
+    for i in range(count):
+        zone = rng.choice(list(zone_pins))
+        created = start + timedelta(minutes=rng.uniform(0, windows * DELIVERY_WINDOW_MINUTES))
+        orders.append(make_order(rng, i, zone, zone_pins[zone], buildings[zone], created))
+    return orders
+
+
+def make_order(rng: random.Random, i: int, zone: str, pins: list, buildings: list, created: datetime) -> dict:
+    return {
+        "order_id": f"ORD-{i:08X}",
+        "status": "PLACED",
+        "delivery_zone": zone,
+        "delivery_address": {"addressLine": rng.choice(buildings), "city": "Pune", "pincode": str(rng.choice(pins))},
+        "items": [{"quantity": rng.randint(1, 3)} for _ in range(rng.randint(1, 3))],
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+def percentile(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=5000, help="open orders")
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--windows", type=int, default=4, help=f"{DELIVERY_WINDOW_MINUTES}-minute windows")
+    parser.add_argument("--updates", type=int, default=500, help="incremental arrivals/cancellations")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start = datetime(2026, 1, 5, 6, 0)
+    orders = make_orders(rng, args.orders, args.zones, args.windows, start)
+
+    planner = DeliveryPlanner()
+    began = time.perf_counter()
+    for order in orders:
+        planner.upsert(order)
+    loaded = time.perf_counter()
+    groups = planner.plan()
+    planned = time.perf_counter()
+
+    batches = planner.current_batches()
+    sizes = [batch["orders"] for batch in batches]
+    assert sum(sizes) == args.orders
+    assert all(len(batch["stops"]) <= DELIVERY_BATCH_MAX_ORDERS for batch in batches)
+    over = sum(batch["items"] > DELIVERY_BATCH_MAX_ITEMS for batch in batches)
+
+    print(f"{args.orders:,} open orders, {len(planner.groups)} zone/window groups, capacity "
+          f"{DELIVERY_BATCH_MAX_ORDERS} orders / {DELIVERY_BATCH_MAX_ITEMS} items")
+    print(f"Full plan:    load {1000 * (loaded - began):7.1f} ms   plan {1000 * (planned - loaded):7.1f} ms "
+          f"({groups} groups)")
+    print(f"Batches:      {len(batches)}  orders/batch mean {statistics.mean(sizes):.1f} "
+          f"min {min(sizes)} max {max(sizes)}  stops/batch mean "
+          f"{statistics.mean(len(batch['stops']) for batch in batches):.1f}  over item capacity: {over}")
+
+    # Incremental: each arrival or cancellation is applied and re-planned on its own
+    zone_pins = {}
+    for order in orders:
+        zone_pins.setdefault(order["delivery_zone"], []).append(order)
+    timings = []
+    open_ids = [order["order_id"] for order in orders]
+    for n in range(args.updates):
+        began = time.perf_counter()
+        if n % 4 == 3:
+            victim = open_ids.pop(rng.randrange(len(open_ids)))
+            planner.upsert({"order_id": victim, "status": "CANCELLED"})
+        else:
+            template = rng.choice(orders)
+            created = start + timedelta(minutes=rng.uniform(0, args.windows * DELIVERY_WINDOW_MINUTES))
+            order = {**template, "order_id": f"NEW-{n:06d}", "created_at": created, "updated_at": created}
+            planner.upsert(order)
+            open_ids.append(order["order_id"])
+        planner.plan()
+        timings.append(1000 * (time.perf_counter() - began))
+
+    print(f"Incremental:  {args.updates} updates  p50 {percentile(timings, 0.5):.2f} ms  "
+          f"p99 {percentile(timings, 0.99):.2f} ms  max {max(timings):.2f} ms")
+    assert sum(batch["orders"] for batch in planner.current_batches()) == len(open_ids)
+
+
+if __name__ == "__main__":
+    main()
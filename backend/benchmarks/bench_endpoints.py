@@ -0,0 +1,368 @@
+#!/usr/bin/env python
+"""
+Endpoint Benchmark
+Boots app.main:app in-process (httpx ASGITransport, no sockets) against
+local stand-ins for MongoDB and Redis and drives scripted scenarios at a
+fixed concurrency. Per scenario it reports p50/p95/p99 latency of one
+iteration and throughput, and compares them with a saved JSON baseline.
+
+Scenarios:
+    login          POST /auth/login (bcrypt verify)
+    menu           GET /menu
+    checkout       POST /payment/checkout
+    order_history  GET /orders/
+    address_crud   POST + PUT + DELETE /addresses/
+
+Usage:
+    python benchmarks/bench_endpoints.py                       # compare with baseline
+    python benchmarks/bench_endpoints.py --save-baseline       # record a new baseline
+    python benchmarks/bench_endpoints.py --scenarios menu,checkout -c 32 -n 2000
+    python benchmarks/bench_endpoints.py --backend servers     # mongod/redis-server on PATH
+    python benchmarks/bench_endpoints.py --backend replset     # + 3-member replica set,
+                                                               #   prints reads per member
+
+Exits with status 1 if any scenario regressed by more than --tolerance.
+Compare only runs made with the same backend, concurrency and machine.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path so we can import app modules
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks import standins  # noqa: E402  (must run before `app` imports)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+PASSWORD = "bench-password"
+MENU_ITEMS = 60
+ORDERS_PER_USER = 40
+
+
+# =========================
+# APP + DATA
+# =========================
+
+async def run_lifespan(app):
+    """Drive the ASGI lifespan protocol (ASGITransport does not)"""
+    to_app, from_app = asyncio.Queue(), asyncio.Queue()
+    await to_app.put({"type": "lifespan.startup"})
+
+    async def receive():
+        return await to_app.get()
+
+    async def send(message):
+        await from_app.put(message)
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send))
+    message = await from_app.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"Startup failed: {message}")
+
+    async def shutdown():
+        await to_app.put({"type": "lifespan.shutdown"})
+        await from_app.get()
+        await task
+
+    return shutdown
+
+
+def seed(users: int) -> list:
+    """Menu, users and order history; returns the user emails"""
+    from app.database import db, menu_col, orders_col, users_col
+    from app.utils.password import hash_password
+    from app.utils.cache import clear_all_cache
+
+    for name in ("menu", "users", "orders", "addresses"):
+        db[name].delete_many({})
+    clear_all_cache()
+
+    categories = ["thali", "biryani", "south-indian", "snacks", "desserts"]
+    menu_col.insert_many([
+        {
+            "name": f"Item {i}",
+            "category": categories[i % len(categories)],
+            "price": 60 + (i * 7) % 200,
+            "rating": 3.5 + (i % 15) / 10,
+            "img": f"images/item-{i}.jpg",
+        }
+        for i in range(MENU_ITEMS)
+    ])
+
+    password_hash = hash_password(PASSWORD)  # bcrypt once, shared by all users
+    emails = [f"bench{i}@example.com" for i in range(users)]
+    users_col.insert_many([{"email": email, "password": password_hash} for email in emails])
+
+    start = datetime(2026, 1, 1, 12, 30)
+    orders_col.insert_many([
+        {
+            "order_id": f"ORD-{u:04d}{i:04d}",
+            "user_email": email,
+            "items": [{"id": f"MENU-{i % MENU_ITEMS:06d}", "name": f"Item {i % MENU_ITEMS}",
+                       "price": 120.0, "quantity": 1 + i % 3, "image_url": None}],
+            "total_amount": 120.0 * (1 + i % 3),
+            "discount_amount": 0,
+            "final_amount": 120.0 * (1 + i % 3),
+            "coupon_code": None,
+            "payment_method": "upi",
+            "delivery_address": {"label": "Home", "addressLine": "12 MG Road", "city": "Pune"},
+            "payment_gateway": "DUMMY",
+            "payment_status": "SUCCESS",
+            "status": "DELIVERED",
+            "cancel_reason": None,
+            "created_at": start + timedelta(hours=i),
+            "updated_at": start + timedelta(hours=i),
+        }
+        for u, email in enumerate(emails)
+        for i in range(ORDERS_PER_USER)
+    ])
+    return emails
+
+
+# =========================
+# SCENARIOS
+# =========================
+# One call = one measured iteration; raise on unexpected status codes
+
+def _check(response, *expected):
+    if response.status_code not in (expected or (200,)):
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} -> {response.status_code}")
+    return response
+
+
+async def scenario_login(client, user):
+    _check(await client.post("/auth/login", json={"email": user["email"], "password": PASSWORD}))
+
+
+async def scenario_menu(client, user):
+    _check(await client.get("/menu"))
+
+
+async def scenario_checkout(client, user):
+    _check(await client.post("/payment/checkout", headers=user["headers"], json={
+        "items": [
+            {"id": "MENU-000001", "name": "Item 1", "price": 120.0, "quantity": 2},
+            {"id": "MENU-000007", "name": "Item 7", "price": 90.0, "quantity": 1},
+        ],
+        "total_amount": 330.0,
+        "payment_method": "upi",
+        "delivery_address": {"label": "Home", "addressLine": "12 MG Road", "city": "Pune", "pincode": "411001"},
+    }))
+
+
+async def scenario_order_history(client, user):
+    _check(await client.get("/orders/", headers=user["headers"]))
+
+
+async def scenario_address_crud(client, user):
+    created = _check(await client.post("/addresses/", headers=user["headers"], json={
+        "label": "Office", "addressLine": "4th Floor, Baner Road", "city": "Pune",
+        "state": "MH", "pincode": "411045", "isDefault": True,
+    })).json()
+    _check(await client.put(f"/addresses/{created['id']}", headers=user["headers"], json={
+        "label": "Office", "addressLine": "5th Floor, Baner Road", "city": "Pune",
+        "state": "MH", "pincode": "411045", "isDefault": True,
+    }))
+    _check(await client.delete(f"/addresses/{created['id']}", headers=user["headers"]))
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "menu": scenario_menu,
+    "checkout": scenario_checkout,
+    "order_history": scenario_order_history,
+    "address_crud": scenario_address_crud,
+}
+
+
+# =========================
+# RUNNER
+# =========================
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def run_scenario(client, scenario, users: list, iterations: int, concurrency: int, warmup: int) -> dict:
+    for i in range(warmup):
+        await scenario(client, users[i % len(users)])
+
+    latencies, errors = [], []
+    remaining = iter(range(iterations))
+
+    async def worker(worker_id: int):
+        user = users[worker_id % len(users)]
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await scenario(client, user)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run(args, servers=None) -> dict:
+    import httpx
+
+    from app.main import app
+    from app.routes import payment_routes
+    from app.utils.jwt import create_token
+
+    # The order lifecycle task sleeps for 25 minutes; ASGITransport would wait for it
+    payment_routes.auto_progress_order = lambda order_id: None
+
+    shutdown = await run_lifespan(app)
+    try:
+        emails = seed(args.users)
+        if servers:
+            # Secondary reads must see the seed data
+            servers.wait_for_replication()
+        users = [
+            {"email": email, "headers": {"Authorization": f"Bearer {create_token({'email': email})}"}}
+            for email in emails
+        ]
+
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                iterations = args.requests if name != "login" else max(args.requests // 10, 1)
+                results[name] = await run_scenario(
+                    client, SCENARIOS[name], users, iterations, args.concurrency, args.warmup
+                )
+                print(_format_row(name, results[name]), flush=True)
+        return results
+    finally:
+        await shutdown()
+
+
+# =========================
+# BASELINE
+# =========================
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios that are slower (p95) or have less throughput than allowed"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']}/s -> {current['throughput_rps']}/s"
+            )
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors ({current['first_error']})")
+    return regressions
+
+
+def _format_row(name: str, result: dict) -> str:
+    return (
+        f"{name:<15} {result['throughput_rps']:>9.1f}/s  p50 {result['p50_ms']:>8.2f}ms  "
+        f"p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}"
+    )
+
+
+def print_read_distribution(before: dict, after: dict):
+    reads = {member: after[member][1] - before.get(member, (None, 0))[1] for member in after}
+    total = sum(reads.values()) or 1
+    print("\nReads per replica set member:")
+    for member, count in reads.items():
+        print(f"  {member:<18} {after[member][0]:<10} {count:>9,} ({count / total:.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "servers", "replset"], default="memory")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        type=lambda value: [name.strip() for name in value.split(",") if name.strip()])
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-n", "--requests", type=int, default=500,
+                        help="iterations per scenario (login runs a tenth: bcrypt is slow)")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative change before flagging a regression")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    servers = standins.install(args.backend)
+    try:
+        reads_before = servers.read_counts() if servers else {}
+        results = asyncio.run(run(args, servers))
+        if servers and servers.replica_set:
+            print_read_distribution(reads_before, servers.read_counts())
+    finally:
+        if servers:
+            servers.stop()
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "scenarios": results,
+    }
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("meta", {}).get("backend") != args.backend:
+        print("\nWarning: baseline was recorded with a different backend")
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline.name} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Serialization Benchmark
+Compares the old cache-hit path (json.loads -> jsonable_encoder -> json.dumps)
+with the raw-bytes path on a 500-order history, plus the encoder used on
+cache misses.
+
+Usage:
+    python benchmarks/bench_serialization.py [--orders 500] [--repeat 200]
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from app.utils.responses import dumps, RawJSONResponse
+
+
+def make_history(n_orders: int) -> dict:
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1, 12, 30)
+    orders = []
+    for i in range(n_orders):
+        items = [
+            {
+                "id": f"MENU-{rng.randrange(16**6):06x}",
+                "name": rng.choice(["Veg Thali", "Paneer Butter Masala", "Masala Dosa", "Chicken Biryani"]),
+                "price": float(rng.choice([80, 120, 150, 220])),
+                "quantity": rng.randint(1, 3),
+                "image_url": "/static/images/biryani/Chicken-Biryani-hyd.jpg",
+            }
+            for _ in range(rng.randint(1, 4))
+        ]
+        total = sum(item["price"] * item["quantity"] for item in items)
+        created = start + timedelta(minutes=37 * i)
+        orders.append({
+            "order_id": f"ORD-{i:08X}",
+            "user_email": "bench@example.com",
+            "items": items,
+            "total_amount": total,
+            "discount_amount": 0,
+            "final_amount": total,
+            "coupon_code": None,
+            "payment_method": "upi",
+            "delivery_address": {"label": "Home", "addressLine": "12 MG Road", "city": "Pune", "pincode": "411001"},
+            "payment_gateway": "DUMMY",
+            "payment_status": "SUCCESS",
+            "status": "DELIVERED",
+            "cancel_reason": None,
+            "created_at": created,
+            "updated_at": created,
+        })
+    return {"count": len(orders), "orders": orders}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache-hit serialization benchmark")
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    history = make_history(args.orders)
+    # What Redis holds for the old path (json.dumps default=str) and the new one
+    old_cached = json.dumps(history, default=str)
+    new_cached = dumps(history)
+
+    def old_hit():
+        value = json.loads(old_cached)
+        return JSONResponse(jsonable_encoder(value)).body
+
+    def new_hit():
+        return RawJSONResponse(new_cached).body
+
+    def old_miss():
+        return JSONResponse(jsonable_encoder(history)).body
+
+    def new_miss():
+        # cached_response serializes the loaded value exactly once
+        return RawJSONResponse(dumps(history)).body
+
+    print(f"📦 {args.orders} orders, {len(new_cached) / 1024:.1f} KiB body, {args.repeat} runs each\n")
+    results = {}
+    for name, fn in [
+        ("cache hit  - parse + re-encode (old)", old_hit),
+        ("cache hit  - raw bytes (new)", new_hit),
+        ("cache miss - jsonable_encoder + json (old)", old_miss),
+        ("cache miss - single dumps (new)", new_miss),
+    ]:
+        seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        results[name] = seconds
+        print(f"   {name:<44} {seconds * 1000:9.3f} ms/request")
+
+    hit_speedup = results["cache hit  - parse + re-encode (old)"] / results["cache hit  - raw bytes (new)"]
+    miss_speedup = results["cache miss - jsonable_encoder + json (old)"] / results["cache miss - single dumps (new)"]
+    print(f"\n🚀 Cache hit speedup: {hit_speedup:.0f}x, cache miss speedup: {miss_speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
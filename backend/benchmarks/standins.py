@@ -0,0 +1,228 @@
+"""
+Local Stand-ins for MongoDB and Redis
+Lets the benchmarks boot `app.main:app` without any network service.
+
+- "memory":  mongomock + fakeredis (Lua via lupa), patched in before the
+             app is imported; everything stays in-process
+- "servers": throwaway mongod / redis-server processes on free localhost
+             ports with temporary data directories (binaries must be on PATH)
+- "replset": same, with a 3-member MongoDB replica set, so routes marked
+             @secondary_reads really read from secondaries
+
+Must be called before anything under `app` is imported, because the
+database and Redis clients are created at import time.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+
+DEFAULT_ENV = {
+    "SECRET_KEY": "bench-secret",
+    "ADMIN_API_KEY": "bench-admin",
+    "ENVIRONMENT": "production",  # production log level / sampling
+    "METRICS_SERVER_TIMING": "false",
+    "LOG_LEVEL": "WARNING",
+    # The scenarios deliberately exceed the per-user limits
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not come up")
+
+
+# =========================
+# IN-PROCESS
+# =========================
+
+def _mongomock_bulk_write(self, requests, ordered=True, **kwargs):
+    # mongomock's bulk_write rejects the `sort` argument newer pymongo
+    # operations carry; replay them one by one instead
+    from pymongo.results import BulkWriteResult
+
+    counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": []}
+
+    def updated(result):
+        counts["nMatched"] += result.matched_count
+        counts["nModified"] += result.modified_count
+        if result.upserted_id is not None:
+            counts["upserted"].append({"index": index, "_id": result.upserted_id})
+            counts["nUpserted"] += 1
+
+    for index, op in enumerate(requests):
+        kind = type(op).__name__
+        if kind == "InsertOne":
+            self.insert_one(op._doc)
+            counts["nInserted"] += 1
+        elif kind == "UpdateOne":
+            updated(self.update_one(op._filter, op._doc, upsert=op._upsert))
+        elif kind == "UpdateMany":
+            updated(self.update_many(op._filter, op._doc, upsert=op._upsert))
+        elif kind == "ReplaceOne":
+            updated(self.replace_one(op._filter, op._doc, upsert=op._upsert))
+        elif kind == "DeleteOne":
+            counts["nRemoved"] += self.delete_one(op._filter).deleted_count
+        elif kind == "DeleteMany":
+            counts["nRemoved"] += self.delete_many(op._filter).deleted_count
+        else:
+            raise NotImplementedError(kind)
+    return BulkWriteResult(counts, True)
+
+
+def install_memory():
+    import fakeredis
+    import mongomock
+    import pymongo
+    import redis
+
+    server = fakeredis.FakeServer()
+
+    class StandInRedis(fakeredis.FakeRedis):
+        def __init__(self, *args, **kwargs):
+            for option in ("host", "port", "socket_connect_timeout", "socket_timeout"):
+                kwargs.pop(option, None)
+            super().__init__(*args, server=server, **kwargs)
+
+    mongomock.collection.Collection.bulk_write = _mongomock_bulk_write
+    pymongo.MongoClient = mongomock.MongoClient
+    redis.Redis = StandInRedis
+    os.environ.setdefault("MONGO_URL", "mongodb://standin")
+
+
+# =========================
+# LOCAL SERVER BINARIES
+# =========================
+
+class LocalServers:
+    REPLICA_SET = "bench-rs"
+
+    def __init__(self, mongo_members: int = 1):
+        self.processes = []
+        self.data_dir = None
+        self.mongo_members = mongo_members
+        self.mongo_ports = []
+
+    def start(self):
+        for binary in ("mongod", "redis-server"):
+            if not shutil.which(binary):
+                raise RuntimeError(f"{binary} not found on PATH")
+
+        self.data_dir = tempfile.mkdtemp(prefix="bench-")
+        self.mongo_ports = [_free_port() for _ in range(self.mongo_members)]
+        redis_port = _free_port()
+
+        for port in self.mongo_ports:
+            command = ["mongod", "--dbpath", os.path.join(self.data_dir, str(port)),
+                       "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"]
+            if self.replica_set:
+                command += ["--replSet", self.REPLICA_SET]
+            os.makedirs(command[2])
+            self.processes.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+        self.processes.append(subprocess.Popen(
+            ["redis-server", "--port", str(redis_port), "--bind", "127.0.0.1",
+             "--save", "", "--appendonly", "no"],
+            stdout=subprocess.DEVNULL,
+        ))
+        for port in self.mongo_ports:
+            _wait_for_port(port)
+        _wait_for_port(redis_port)
+
+        hosts = ",".join(f"127.0.0.1:{port}" for port in self.mongo_ports)
+        if self.replica_set:
+            self._initiate()
+            os.environ["MONGO_URL"] = f"mongodb://{hosts}/?replicaSet={self.REPLICA_SET}"
+        else:
+            os.environ["MONGO_URL"] = f"mongodb://{hosts}"
+        os.environ["REDIS_HOST"] = "127.0.0.1"
+        os.environ["REDIS_PORT"] = str(redis_port)
+        return self
+
+    @property
+    def replica_set(self) -> bool:
+        return self.mongo_members > 1
+
+    def _member(self, port: int):
+        from pymongo import MongoClient
+        return MongoClient("127.0.0.1", port, directConnection=True, serverSelectionTimeoutMS=5000)
+
+    def _initiate(self, timeout: float = 60):
+        members = [
+            # First member is the preferred primary
+            {"_id": i, "host": f"127.0.0.1:{port}", "priority": 2 if i == 0 else 1}
+            for i, port in enumerate(self.mongo_ports)
+        ]
+        with self._member(self.mongo_ports[0]) as client:
+            client.admin.command("replSetInitiate", {"_id": self.REPLICA_SET, "members": members})
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if client.admin.command("hello").get("isWritablePrimary"):
+                    return
+                time.sleep(0.2)
+        raise RuntimeError("Replica set did not elect a primary")
+
+    def wait_for_replication(self, timeout: float = 10):
+        """Block until every secondary has applied the primary's last write"""
+        if not self.replica_set:
+            return
+        with self._member(self.mongo_ports[0]) as client:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                status = client.admin.command("replSetGetStatus")
+                optimes = {member["optimeDate"] for member in status["members"]}
+                if len(optimes) == 1:
+                    return
+                time.sleep(0.1)
+
+    def read_counts(self) -> dict:
+        """{member: (state, query opcounter)}: where reads are being served"""
+        counts = {}
+        for port in self.mongo_ports:
+            with self._member(port) as client:
+                hello = client.admin.command("hello")
+                state = "primary" if hello.get("isWritablePrimary") else "secondary"
+                counts[f"127.0.0.1:{port}"] = (state, client.admin.command("serverStatus")["opcounters"]["query"])
+        return counts
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+        if self.data_dir:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+def install(backend: str = "memory"):
+    """Configure the environment; returns LocalServers to stop, or None"""
+    for key, value in DEFAULT_ENV.items():
+        os.environ.setdefault(key, value)
+
+    if backend == "memory":
+        install_memory()
+        return None
+    if backend == "servers":
+        return LocalServers().start()
+    if backend == "replset":
+        return LocalServers(mongo_members=3).start()
+    raise ValueError(f"Unknown backend: {backend}")
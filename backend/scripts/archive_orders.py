@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Archive Orders
+Moves DELIVERED / CANCELLED orders that have not changed for
+--older-than-days out of the hot `orders` collection into `orders_archive`
+(see app/services/order_archive.py). Order history endpoints read both
+tiers, so nothing disappears for users.
+
+Safe to run repeatedly (e.g. nightly from cron) and to interrupt: each
+batch is copied before it is deleted.
+
+Usage:
+    python scripts/archive_orders.py --dry-run
+    python scripts/archive_orders.py [--older-than-days 90] [--batch-size 1000] [--pause 0.2]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import ORDER_ARCHIVE_AFTER_DAYS, ORDER_ARCHIVE_BATCH_SIZE
+from app.database import check_connection, ensure_indexes
+from app.services.order_archive import archive_orders, pending_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-days", type=int, default=ORDER_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ORDER_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None, help="stop after this many batches")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="only count eligible orders")
+    args = parser.parse_args()
+
+    check_connection()
+    pending = pending_count(args.older_than_days)
+    print(f"{pending:,} orders older than {args.older_than_days} days are eligible for archiving")
+    if args.dry_run or not pending:
+        return
+
+    # Creates the compressed archive collection and its indexes if missing
+    ensure_indexes()
+    started = time.perf_counter()
+
+    def progress(batches: int, moved: int):
+        print(f"  {moved:,} orders archived ({batches} batches)", flush=True)
+
+    moved = archive_orders(
+        older_than_days=args.older_than_days,
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+        pause=args.pause,
+        on_batch=progress,
+    )
+    print(f"Archived {moved:,} orders in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
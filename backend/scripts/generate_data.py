@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+"""
+Synthetic Data Generator
+Bulk-loads a large, realistic dataset for benchmarking indexes, pagination
+and caching: users (with their address books), orders and reviews on top
+of the menu.
+
+- Deterministic: every batch draws from its own RNG seeded with
+  (--seed, collection, batch number), so the same arguments always produce
+  the same documents no matter how batches are scheduled
+- Parallel: batches are generated and written with insert_many(ordered=False)
+  by --workers processes, each with its own MongoClient
+- Skewed: a Zipf distribution over users (a few heavy subscribers order
+  daily, most users rarely) and over menu items; order times follow lunch
+  and dinner spikes; recent orders are still PLACED / PREPARING
+
+All generated users share the password "password123" (hashed once) and use
+the @synthetic.test domain, which is what --drop removes. If the menu is
+empty it is seeded from the images under static/images.
+
+Usage:
+    python scripts/generate_data.py --users 100000 --orders 5000000 --reviews 500000
+    python scripts/generate_data.py --users 1000 --orders 50000 --drop --seed 7
+"""
+
+import argparse
+import bisect
+import itertools
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+from app.config import MONGO_URL, MONGO_DB_NAME, STATIC_DIR, REVIEW_SUMMARY_LATEST
+
+EMAIL_DOMAIN = "synthetic.test"
+PASSWORD = "password123"
+
+# Relative order volume per hour of day: lunch and dinner rushes
+HOUR_WEIGHTS = [
+    0.2, 0.1, 0.05, 0.05, 0.05, 0.1, 0.3, 0.8, 1.5, 1.5, 1.2, 3.0,
+    8.0, 9.0, 5.0, 1.5, 1.0, 1.2, 2.5, 5.0, 6.5, 5.0, 2.0, 0.6,
+]
+CITIES = [
+    ("Pune", "Maharashtra", "411"), ("Mumbai", "Maharashtra", "400"),
+    ("Bengaluru", "Karnataka", "560"), ("Hyderabad", "Telangana", "500"),
+    ("Chennai", "Tamil Nadu", "600"), ("Delhi", "Delhi", "110"),
+]
+STREETS = ["MG Road", "Station Road", "FC Road", "Park Street", "Link Road", "Ring Road", "Main Street"]
+LABELS = ["Home", "Office", "Hostel", "Parents"]
+PAYMENT_METHODS = ["upi", "upi", "upi", "card", "card", "net", "cod"]
+COMMENTS = [
+    "Tasty and fresh", "Arrived hot, good portion", "A bit too spicy for me",
+    "Best thali in the area", "Delivery was late but food was good",
+    "Average taste", "Will order again", "Not worth the price", "Loved it!",
+]
+# Ratings skew positive, like real review data
+RATING_WEIGHTS = [3, 5, 12, 35, 45]
+
+
+# =========================
+# DISTRIBUTIONS
+# =========================
+
+def zipf_cumulative(n: int, exponent: float) -> list:
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def pick(rng: random.Random, cumulative: list) -> int:
+    return bisect.bisect_left(cumulative, rng.random() * cumulative[-1])
+
+
+def batch_rng(seed: int, name: str, batch: int) -> random.Random:
+    return random.Random(f"{seed}:{name}:{batch}")
+
+
+def user_email(index: int) -> str:
+    return f"user{index:07d}@{EMAIL_DOMAIN}"
+
+
+# =========================
+# WORKER PROCESSES
+# =========================
+
+_db = None
+_ctx = None
+
+
+def init_worker(mongo_url: str, db_name: str, ctx: dict):
+    global _db, _ctx
+    _db = MongoClient(mongo_url)[db_name]
+    _ctx = dict(ctx)
+    _ctx["user_weights"] = zipf_cumulative(ctx["users"], ctx["skew"])
+    _ctx["item_weights"] = zipf_cumulative(len(ctx["menu"]), 1.0)
+
+
+def _order_time(rng: random.Random) -> datetime:
+    day = rng.randrange(_ctx["days"])
+    hour = rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+    return _ctx["end"] - timedelta(days=day, hours=_ctx["end"].hour - hour, minutes=rng.randrange(60))
+
+
+def make_users(batch: int, start: int, count: int) -> list:
+    rng = batch_rng(_ctx["seed"], "users", batch)
+    # Separate stream so address data doesn't shift when user fields change
+    address_rng = batch_rng(_ctx["seed"], "addresses", batch)
+    docs = []
+    for index in range(start, start + count):
+        doc = {"email": user_email(index), "password": _ctx["password_hash"]}
+        if rng.random() < 0.8:
+            doc["phone"] = f"9{rng.randrange(10**9):09d}"
+            doc["phone_verified"] = True
+        doc["addresses"] = make_address_book(address_rng)
+        if doc["addresses"]:
+            doc["defaultAddressId"] = doc["addresses"][0]["id"]
+        docs.append(doc)
+    return docs
+
+
+def make_address_book(rng: random.Random) -> list:
+    """Embedded address book (see app/routes/address_routes.py)"""
+    addresses = []
+    for n in range(rng.choices([0, 1, 2, 3], weights=[10, 55, 25, 10])[0]):
+        city, state, pin_prefix = rng.choice(CITIES)
+        addresses.append({
+            "id": str(ObjectId(rng.randbytes(12))),
+            "label": LABELS[n],
+            "addressLine": f"{rng.randint(1, 250)}, {rng.choice(STREETS)}",
+            "city": city,
+            "state": state,
+            "pincode": f"{pin_prefix}{rng.randrange(1000):03d}",
+        })
+    return addresses
+
+
+def make_orders(batch: int, start: int, count: int) -> list:
+    rng = batch_rng(_ctx["seed"], "orders", batch)
+    menu, coupons = _ctx["menu"], _ctx["coupons"]
+    docs = []
+    for index in range(start, start + count):
+        items = {}
+        for _ in range(rng.choices([1, 2, 3, 4, 5], weights=[35, 30, 20, 10, 5])[0]):
+            item = menu[pick(rng, _ctx["item_weights"])]
+            line = items.setdefault(item["id"], {**item, "quantity": 0})
+            line["quantity"] += rng.choice([1, 1, 1, 2, 3])
+        total = sum(line["price"] * line["quantity"] for line in items.values())
+
+        coupon_code, discount = None, 0
+        if coupons and rng.random() < 0.12:
+            coupon = rng.choice(coupons)
+            if total >= coupon.get("min_order", 0):
+                coupon_code = coupon["code"]
+                if coupon["discount_type"] == "percentage":
+                    discount = total * coupon["discount_value"] / 100
+                    if coupon.get("max_discount"):
+                        discount = min(discount, coupon["max_discount"])
+                else:
+                    discount = coupon["discount_value"]
+                discount = round(min(discount, total), 2)
+
+        created = _order_time(rng)
+        age = _ctx["end"] - created
+        if age < timedelta(minutes=5):
+            status = "PLACED"
+        elif age < timedelta(minutes=25):
+            status = "PREPARING"
+        else:
+            status = "CANCELLED" if rng.random() < 0.05 else "DELIVERED"
+
+        city, state, pin_prefix = rng.choice(CITIES)
+        docs.append({
+            "order_id": f"ORD-{index:08X}",
+            "user_email": user_email(pick(rng, _ctx["user_weights"])),
+            "items": list(items.values()),
+            "total_amount": total,
+            "discount_amount": discount,
+            "final_amount": round(total - discount, 2),
+            "coupon_code": coupon_code,
+            "payment_method": rng.choice(PAYMENT_METHODS),
+            "delivery_address": {
+                "label": "Home",
+                "addressLine": f"{rng.randint(1, 250)}, {rng.choice(STREETS)}",
+                "city": city,
+                "state": state,
+                "pincode": f"{pin_prefix}{rng.randrange(1000):03d}",
+            },
+            "payment_gateway": "DUMMY",
+            "payment_status": "SUCCESS",
+            "status": status,
+            "cancel_reason": "Changed my mind" if status == "CANCELLED" else None,
+            "created_at": created,
+            "updated_at": created + timedelta(minutes=25) if status == "DELIVERED" else created,
+        })
+    return docs
+
+
+def make_reviews(batch: int, start: int, count: int) -> list:
+    rng = batch_rng(_ctx["seed"], "reviews", batch)
+    menu = _ctx["menu"]
+    docs = []
+    for _ in range(start, start + count):
+        docs.append({
+            "review_id": rng.randbytes(16).hex(),
+            "item_id": menu[pick(rng, _ctx["item_weights"])]["id"],
+            "order_id": None,
+            "user_email": user_email(pick(rng, _ctx["user_weights"])),
+            "rating": rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+            "comment": rng.choice(COMMENTS),
+            "created_at": _order_time(rng),
+            "summarized": True,
+        })
+    return docs
+
+
+GENERATORS = {
+    "users": make_users,
+    "orders": make_orders,
+    "reviews": make_reviews,
+}
+
+
+def load_batch(collection: str, batch: int, start: int, count: int) -> int:
+    docs = GENERATORS[collection](batch, start, count)
+    if docs:
+        _db[collection].insert_many(docs, ordered=False)
+    return len(docs)
+
+
+# =========================
+# SETUP (main process)
+# =========================
+
+def ensure_menu(db, rng: random.Random) -> list:
+    """Menu items as order lines; seeds the menu from static/images if empty"""
+    if db.menu.count_documents({}) == 0:
+        docs = []
+        for image in sorted(Path(STATIC_DIR, "images").glob("*/*")):
+            name = image.stem.replace("-", " ").replace("_", " ").replace(".", " ").strip().title()
+            docs.append({
+                "_id": ObjectId(rng.randbytes(12)),
+                "name": name,
+                "category": image.parent.name,
+                "price": rng.choice([80, 99, 120, 149, 180, 220, 260]),
+                "rating": round(rng.uniform(3.5, 4.9), 1),
+                "img": image.relative_to(STATIC_DIR).as_posix(),
+            })
+        if docs:
+            db.menu.insert_many(docs)
+            print(f"Seeded menu with {len(docs)} items from {STATIC_DIR}/images")
+
+    # Same id / image format the menu endpoint returns
+    return [
+        {
+            "id": f"MENU-{str(item['_id'])[-6:]}",
+            "name": item["name"],
+            "price": float(item["price"]),
+            "image_url": f"/static/{item['img'].lstrip('/')}" if item.get("img") else None,
+        }
+        for item in db.menu.find().sort("_id", 1)
+    ]
+
+
+def drop_synthetic(db):
+    pattern = {"$regex": f"@{EMAIL_DOMAIN}$"}
+    for name in ("users", "addresses", "orders", "reviews"):
+        result = db[name].delete_many({"email" if name == "users" else "user_email": pattern})
+        print(f"Dropped {result.deleted_count} synthetic {name}")
+
+
+def rebuild_review_summaries(db):
+    """Recompute review_summaries for every item (reviews bypassed the write path)"""
+    stats = db.reviews.aggregate([
+        {"$group": {
+            "_id": {"item_id": "$item_id", "rating": "$rating"},
+            "count": {"$sum": 1},
+        }},
+    ])
+    summaries = {}
+    for row in stats:
+        item_id, rating = row["_id"]["item_id"], row["_id"]["rating"]
+        if not item_id:
+            continue
+        summary = summaries.setdefault(item_id, {"count": 0, "rating_sum": 0, "stars": {}})
+        summary["count"] += row["count"]
+        summary["rating_sum"] += rating * row["count"]
+        summary["stars"][str(rating)] = row["count"]
+
+    for item_id, summary in summaries.items():
+        latest = list(
+            db.reviews.find(
+                {"item_id": item_id},
+                {"_id": 0, "review_id": 1, "rating": 1, "comment": 1, "created_at": 1},
+            ).sort("created_at", -1).limit(REVIEW_SUMMARY_LATEST)
+        )
+        db.review_summaries.replace_one(
+            {"item_id": item_id},
+            {"item_id": item_id, **summary, "latest": latest, "updated_at": datetime.utcnow()},
+            upsert=True,
+        )
+    print(f"Rebuilt review summaries for {len(summaries)} items")
+
+
+def run_collection(pool, name: str, total: int, batch_size: int):
+    if total <= 0:
+        return
+    started = time.perf_counter()
+    futures = [
+        pool.submit(load_batch, name, batch, start, min(batch_size, total - start))
+        for batch, start in enumerate(range(0, total, batch_size))
+    ]
+    inserted = 0
+    for done, future in enumerate(as_completed(futures), 1):
+        inserted += future.result()
+        if done % 20 == 0 or done == len(futures):
+            rate = inserted / (time.perf_counter() - started)
+            print(f"  {name}: {inserted:,} docs ({done}/{len(futures)} batches, {rate:,.0f}/s)", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=180, help="order history window")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf exponent for user activity (higher = heavier top subscribers)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=max(multiprocessing.cpu_count() - 1, 1))
+    parser.add_argument("--mongo-url", default=MONGO_URL)
+    parser.add_argument("--db", default=MONGO_DB_NAME)
+    parser.add_argument("--drop", action="store_true", help="remove previously generated data first")
+    args = parser.parse_args()
+
+    from app.utils.password import hash_password
+
+    db = MongoClient(args.mongo_url)[args.db]
+    if args.drop:
+        drop_synthetic(db)
+
+    menu = ensure_menu(db, random.Random(f"{args.seed}:menu"))
+    if not menu:
+        sys.exit("Menu is empty and no images were found to seed it")
+
+    # Fixed "now" so reruns with the same seed produce identical timestamps
+    end = datetime(2026, 1, 1) + timedelta(days=args.seed % 365)
+    ctx = {
+        "seed": args.seed,
+        "users": args.users,
+        "skew": args.skew,
+        "days": args.days,
+        "end": end.replace(hour=23, minute=59),
+        "menu": menu,
+        # Seeded by the API on first start; without them orders carry no coupon
+        "coupons": list(db.coupons.find(
+            {"active": {"$ne": False}},
+            {"_id": 0, "code": 1, "discount_type": 1, "discount_value": 1,
+             "min_order": 1, "max_discount": 1},
+        ).sort("code", 1)),
+        "password_hash": hash_password(PASSWORD),
+    }
+
+    print(f"Generating into {args.db}: {args.users:,} users, {args.orders:,} orders, "
+          f"{args.reviews:,} reviews with {args.workers} workers (seed {args.seed})")
+    started = time.perf_counter()
+
+    # spawn: MongoClient must not be shared across fork
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(args.mongo_url, args.db, ctx),
+    ) as pool:
+        run_collection(pool, "users", args.users, args.batch_size)
+        run_collection(pool, "orders", args.orders, args.batch_size)
+        run_collection(pool, "reviews", args.reviews, args.batch_size)
+
+    if args.reviews:
+        rebuild_review_summaries(db)
+    print(f"Done in {time.perf_counter() - started:.1f}s. Restart the API (or flush Redis) "
+          f"so cached pages pick up the new data.")
+
+
+if __name__ == "__main__":
+    main()
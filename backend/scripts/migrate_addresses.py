@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Migrate Addresses
+Moves rows of the legacy `addresses` collection into the embedded address
+book on each user document (`addresses` array + `defaultAddressId`, see
+app/routes/address_routes.py).
+
+- Streams the collection in (user_email, _id) order, reads the batch's
+  user documents and writes one batch of bulk updates per --batch-size users
+- Legacy rows are put in front of any addresses the user already added
+  through the new API; the merged book is capped at MAX_ADDRESSES, keeping
+  the default and then the newest addresses. Everything over the cap is
+  counted as dropped
+- A user's existing defaultAddressId wins; otherwise the newest row marked
+  isDefault becomes the default (the old code could leave several)
+- Each user is written only if their book is still the one that was read;
+  users who changed it meanwhile are reported and picked up by a re-run
+- Idempotent: migrated users are flagged with addressesMigrated and skipped
+  on a re-run. The legacy collection is only dropped with --drop-legacy
+
+Usage:
+    python scripts/migrate_addresses.py --dry-run
+    python scripts/migrate_addresses.py [--batch-size 1000] [--drop-legacy]
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+# Add backend directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pymongo import MongoClient, UpdateOne
+
+from app.config import MONGO_URL, MONGO_DB_NAME, MAX_ADDRESSES
+
+ADDRESS_FIELDS = ("id", "label", "addressLine", "city", "state", "pincode")
+
+
+def build_address_book(rows: list, existing: list = (), default_id=None) -> tuple:
+    """
+    (addresses, default_id, dropped) for one user: the legacy rows (oldest
+    first) in front of the `existing` book, capped at MAX_ADDRESSES
+    """
+    ids = {address["id"] for address in existing}
+    legacy, legacy_default = [], None
+    for row in rows:
+        address = {field: str(row.get(field) or "") for field in ADDRESS_FIELDS}
+        # Very old rows may predate the "id" field
+        address["id"] = address["id"] or str(row["_id"])
+        if address["id"] in ids:
+            continue  # already in the book
+        ids.add(address["id"])
+        legacy.append(address)
+        if row.get("isDefault"):
+            legacy_default = address["id"]
+
+    if default_id not in ids:
+        default_id = legacy_default
+    book = legacy + list(existing)
+    if len(book) > MAX_ADDRESSES:
+        newest = [address for address in reversed(book) if address["id"] != default_id]
+        kept = {address["id"] for address in newest[:MAX_ADDRESSES - (1 if default_id else 0)]}
+        book = [address for address in book if address["id"] == default_id or address["id"] in kept]
+    return book, default_id, len(legacy) + len(existing) - len(book)
+
+
+def migration_op(user: dict, addresses: list, default_id) -> UpdateOne:
+    # Only if the book is still the one the merge was built from
+    return UpdateOne(
+        {"_id": user["_id"], "addressesMigrated": {"$ne": True},
+         "addresses": user.get("addresses"), "defaultAddressId": user.get("defaultAddressId")},
+        {"$set": {"addresses": addresses, "defaultAddressId": default_id, "addressesMigrated": True}},
+    )
+
+
+def migrate(db, batch_size: int, dry_run: bool) -> dict:
+    stats = {"users": 0, "addresses": 0, "dropped": 0, "skipped": 0, "no_account": 0, "changed": 0}
+    rows = db.addresses.find({}).sort([("user_email", 1), ("_id", 1)])
+    by_user = itertools.groupby(rows, key=lambda row: row.get("user_email"))
+
+    while True:
+        # Each group's rows must be read before groupby moves on to the next
+        chunk = [(email, list(user_rows)) for email, user_rows in itertools.islice(by_user, batch_size)]
+        if not chunk:
+            break
+
+        users = {
+            user["email"]: user
+            for user in db.users.find(
+                {"email": {"$in": [email for email, _ in chunk if email]}, "addressesMigrated": {"$ne": True}},
+                {"email": 1, "addresses": 1, "defaultAddressId": 1},
+            )
+        }
+
+        ops = []
+        for email, user_rows in chunk:
+            if not email:
+                stats["skipped"] += 1
+                continue
+            user = users.get(email)
+            if user is None:
+                # Migrated on an earlier run, or rows of a deleted account
+                stats["no_account"] += 1
+                continue
+            addresses, default_id, dropped = build_address_book(
+                user_rows, user.get("addresses") or [], user.get("defaultAddressId"),
+            )
+            ops.append(migration_op(user, addresses, default_id))
+            stats["users"] += 1
+            stats["addresses"] += len(addresses)
+            stats["dropped"] += dropped
+
+        if ops and not dry_run:
+            result = db.users.bulk_write(ops, ordered=False)
+            stats["changed"] += len(ops) - result.matched_count
+        print(f"  {stats['users']:,} users, {stats['addresses']:,} addresses", flush=True)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="users per bulk write")
+    parser.add_argument("--mongo-url", default=MONGO_URL)
+    parser.add_argument("--db", default=MONGO_DB_NAME)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be migrated, write nothing")
+    parser.add_argument("--drop-legacy", action="store_true", help="drop the addresses collection afterwards")
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_url)[args.db]
+    started = time.perf_counter()
+    stats = migrate(db, args.batch_size, args.dry_run)
+
+    print(f"{'Would migrate' if args.dry_run else 'Processed'} {stats['addresses']:,} addresses "
+          f"for {stats['users']:,} users in {time.perf_counter() - started:.1f}s")
+    if stats["dropped"]:
+        print(f"Dropped {stats['dropped']:,} addresses over the {MAX_ADDRESSES}-per-user limit")
+    if stats["skipped"]:
+        print(f"Skipped {stats['skipped']:,} rows without user_email")
+    if stats["no_account"]:
+        print(f"Skipped {stats['no_account']:,} emails already migrated or without an account")
+    if stats["changed"]:
+        print(f"{stats['changed']:,} users changed their addresses during the run; run again to migrate them")
+
+    if args.drop_legacy and not args.dry_run:
+        db.addresses.drop()
+        print("Dropped the legacy addresses collection")
+
+
+if __name__ == "__main__":
+    main()
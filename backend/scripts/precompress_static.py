@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Precompress Static Assets
+Writes .br / .gz siblings next to compressible files in the static directory
+so PrecompressedStaticFiles can serve them without compressing per request.
+
+Usage:
+    python scripts/precompress_static.py [--dir static] [--force]
+"""
+
+import argparse
+import gzip
+import mimetypes
+import os
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Formats that are already compressed gain nothing from another pass
+SKIP_SUFFIXES = {
+    ".br", ".gz", ".zip", ".jpg", ".jpeg", ".jfif", ".png", ".gif", ".webp",
+    ".avif", ".woff", ".woff2", ".mp4", ".webm", ".mp3", ".ogg",
+}
+MIN_SIZE = 1024
+# Only keep a variant if it saves at least this fraction of the original
+MIN_SAVING = 0.1
+
+
+def is_compressible(path: Path) -> bool:
+    if path.suffix.lower() in SKIP_SUFFIXES:
+        return False
+    media_type = mimetypes.guess_type(path.name)[0] or ""
+    return not media_type.startswith(("image/", "video/", "audio/")) or media_type == "image/svg+xml"
+
+
+def write_variant(source: Path, suffix: str, data: bytes, force: bool) -> bool:
+    target = source.with_name(source.name + suffix)
+    if not force and target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+        return False
+
+    original_size = source.stat().st_size
+    if len(data) > original_size * (1 - MIN_SAVING):
+        # Not worth serving, drop any stale variant
+        if target.exists():
+            target.unlink()
+        return False
+
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+    # Keep mtimes aligned so Last-Modified matches the original
+    stat = source.stat()
+    os.utime(target, (stat.st_atime, stat.st_mtime))
+    return True
+
+
+def precompress(directory: Path, force: bool = False) -> dict:
+    stats = {"scanned": 0, "gzip": 0, "br": 0}
+    for path in sorted(directory.rglob("*")):
+        if not path.is_file() or not is_compressible(path):
+            continue
+        if path.stat().st_size < MIN_SIZE:
+            continue
+
+        stats["scanned"] += 1
+        raw = path.read_bytes()
+        if write_variant(path, ".gz", gzip.compress(raw, compresslevel=9, mtime=0), force):
+            stats["gzip"] += 1
+        if brotli is not None and write_variant(path, ".br", brotli.compress(raw, quality=11), force):
+            stats["br"] += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompress static assets")
+    parser.add_argument("--dir", default=None, help="Static directory (default: STATIC_DIR)")
+    parser.add_argument("--force", action="store_true", help="Rebuild up-to-date variants")
+    args = parser.parse_args()
+
+    if args.dir:
+        directory = Path(args.dir)
+    else:
+        directory = Path(os.getenv("STATIC_DIR", "static"))
+    if not directory.is_dir():
+        print(f"❌ Static directory not found: {directory}")
+        sys.exit(1)
+
+    if brotli is None:
+        print("⚠ brotli not installed - only .gz variants will be written")
+
+    stats = precompress(directory, force=args.force)
+    print(
+        f"✓ Scanned {stats['scanned']} files, "
+        f"wrote {stats['gzip']} .gz and {stats['br']} .br variants"
+    )
+
+
+if __name__ == "__main__":
+    main()
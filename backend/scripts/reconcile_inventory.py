@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Reconcile Inventory
+Recounts the portions sold per item from the day's orders, stores them on
+the inventory documents and repairs the live Redis counts (see
+app/services/inventory.py). Run it every few minutes from cron; a surplus
+reservation is only released once two consecutive runs have seen it.
+
+Usage:
+    python scripts/reconcile_inventory.py [--day 2026-01-05]
+"""
+
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add backend directory to path so we can import app modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import check_connection
+from app.services.inventory import reconcile, today
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="local day, default today")
+    args = parser.parse_args()
+
+    check_connection()
+    day = args.day.isoformat() if args.day else today()
+    report = reconcile(day)
+
+    print(f"Inventory for {day}: {len(report)} tracked items")
+    for entry in report:
+        reserved = "-" if entry["reserved"] is None else entry["reserved"]
+        fixed = ""
+        if entry["raised"]:
+            fixed = f"  raised by {entry['raised']}"
+        elif entry["released"]:
+            fixed = f"  released {entry['released']}"
+        print(f"  {entry['item_id']:<16} stock {entry['stock']:>5}  sold {entry['sold']:>5}  reserved {reserved:>5}{fixed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Test Setup
+The app runs against the in-process stand-ins from benchmarks/standins.py
+(mongomock, fakeredis with Lua), installed before anything under `app` is
+imported. Every test starts with an empty database, an empty Redis and
+fresh per-worker caches.
+
+    cd backend
+    pip install -r tests/requirements.txt
+    python -m pytest -q
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "benchmarks"))
+
+import standins  # noqa: E402
+
+for name, value in standins.DEFAULT_ENV.items():
+    os.environ.setdefault(name, value)
+os.environ.setdefault("STATIC_DIR", str(BACKEND_DIR / "static"))
+standins.install_memory()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.background import BackgroundTask  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.config import ADMIN_API_KEY, MONGO_DB_NAME  # noqa: E402
+from app.database import ensure_indexes, get_client, users_col  # noqa: E402
+from app.main import app  # noqa: E402
+from app.routes import payment_routes  # noqa: E402
+from app.services import coupon_engine, delivery_batching, serviceability  # noqa: E402
+from app.utils.jwt import create_token  # noqa: E402
+from app.utils.redis_client import get_redis  # noqa: E402
+
+ADMIN_HEADERS = {"X-Admin-Key": ADMIN_API_KEY}
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    get_client().drop_database(MONGO_DB_NAME)
+    ensure_indexes()
+    get_redis().flushall()
+    monkeypatch.setattr(coupon_engine, "_table", None)
+    monkeypatch.setattr(serviceability, "_table", None)
+    monkeypatch.setattr(delivery_batching, "_planner", None)
+    monkeypatch.setattr(delivery_batching, "_seen_until", None)
+    # The real task sleeps for 25 minutes; TestClient would wait for it
+    monkeypatch.setattr(payment_routes, "auto_progress_order", lambda order_id: None)
+    yield
+
+
+@pytest.fixture
+def redis_client():
+    return get_redis()
+
+
+@pytest.fixture
+def client():
+    # No `with`: the lifespan (warm-up, review worker) isn't needed here
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def make_user():
+    def make(email: str = "asha@example.com") -> dict:
+        users_col.insert_one({"email": email, "password": "x"})
+        return {"email": email, "headers": {"Authorization": f"Bearer {create_token({'email': email})}"}}
+    return make
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+def cart(*lines, price: float = 100) -> list:
+    """Checkout items from (item_id, quantity) pairs"""
+    return [{"id": item_id, "name": item_id.title(), "price": price, "quantity": quantity}
+            for item_id, quantity in lines]
+
+
+def checkout(client, user: dict, items: list, **fields):
+    body = {"items": items, "total_amount": sum(i["price"] * i["quantity"] for i in items), **fields}
+    return client.post("/payment/checkout", headers=user["headers"], json=body)
+
+
+# =========================
+# RAW ASGI
+# =========================
+# For middleware whose per-request state must end when the response body is
+# sent, not when the ASGI call returns (background tasks run inside it)
+
+def slow_task_app(release: asyncio.Event) -> Starlette:
+    """GET /work responds at once, then runs a background task until `release`"""
+    async def endpoint(request):
+        return JSONResponse({"ok": True}, background=BackgroundTask(release.wait))
+    return Starlette(routes=[Route("/work", endpoint)])
+
+
+def http_scope(path: str = "/work", headers: list = ()) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": list(headers),
+        "client": ("127.0.0.1", 5000), "server": ("testserver", 80),
+    }
+
+
+async def start_request(app, scope: dict) -> tuple:
+    """Run `app` until the response body is out; returns (task, messages)"""
+    messages, body_sent = [], asyncio.Event()
+
+    async def receive():
+        await asyncio.sleep(3600)  # a client that never disconnects
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            body_sent.set()
+
+    task = asyncio.create_task(app(scope, receive, send))
+    await asyncio.wait_for(body_sent.wait(), 5)
+    return task, messages
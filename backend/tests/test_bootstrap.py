@@ -0,0 +1,54 @@
+from app.database import menu_col, users_col
+from app.routes import bootstrap_routes
+from app.services import inventory
+from conftest import cart, checkout
+
+SECTIONS = ["profile", "default_address", "menu", "orders", "coupons"]
+
+
+def test_requires_authentication(client):
+    assert client.get("/bootstrap").status_code in (401, 403)
+
+
+def test_loads_every_section_in_one_call(client, user):
+    menu_col.insert_one({"name": "Dal Tadka", "price": 120, "category": "main"})
+    users_col.update_one({"email": user["email"]}, {"$set": {
+        "addresses": [{"id": "home", "addressLine": "1 MG Road", "city": "Pune", "pincode": "411001"}],
+        "defaultAddressId": "home",
+    }})
+    inventory.set_stock(inventory.today(), {"dal": 3})
+    assert checkout(client, user, cart(("dal", 1))).status_code == 200
+
+    response = client.get("/bootstrap", headers=user["headers"])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert list(data) == SECTIONS + ["errors"]
+    assert data["errors"] == {}
+    assert data["profile"]["email"] == user["email"]
+    assert data["default_address"]["id"] == "home"
+    assert [item["name"] for item in data["menu"]["menu"]] == ["Dal Tadka"]
+    assert data["menu"]["availability"]["remaining"] == {"dal": 2}
+    assert len(data["orders"]["orders"]) == 1
+    assert {coupon["name"] for coupon in data["coupons"]["coupons"]} >= {"WELCOME10", "FLAT50"}
+
+
+def test_subset_and_unknown_sections(client, user):
+    data = client.get("/bootstrap?sections=profile,coupons", headers=user["headers"]).json()
+    assert list(data) == ["profile", "coupons", "errors"]
+
+    response = client.get("/bootstrap?sections=profile,wallet", headers=user["headers"])
+    assert response.status_code == 400
+    assert "wallet" in response.json()["detail"]
+
+
+def test_failing_section_is_null_and_reported(monkeypatch, client, user):
+    def broken(user):
+        raise RuntimeError("coupons unavailable")
+    monkeypatch.setitem(bootstrap_routes.SECTIONS, "coupons", (broken, True))
+
+    data = client.get("/bootstrap", headers=user["headers"]).json()
+
+    assert data["coupons"] is None
+    assert data["errors"] == {"coupons": "unavailable"}
+    assert data["profile"]["email"] == user["email"]
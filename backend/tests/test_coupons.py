@@ -0,0 +1,201 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import coupons_col, orders_col
+from app.routes import payment_routes
+from app.services import coupon_engine, inventory
+from conftest import cart, checkout
+
+
+def add_coupon(code: str = "TEST10", **fields):
+    coupons_col.insert_one({
+        "code": code, "discount_type": "flat", "discount_value": 10, "min_order": 0,
+        "active": True, "redeemed_count": 0, **fields,
+    })
+    coupon_engine.get_rule_table(force=True)
+
+
+def _try_redeem(email: str) -> bool:
+    try:
+        coupon_engine.redeem_coupon("TEST10", email)
+        return True
+    except HTTPException as e:
+        assert e.status_code == 409
+        return False
+
+
+def redeemed_count(code: str = "TEST10") -> int:
+    return coupons_col.find_one({"code": code})["redeemed_count"]
+
+
+def test_global_limit_holds_under_concurrency():
+    add_coupon(max_uses=5)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(_try_redeem, [f"user{i}@example.com" for i in range(40)]))
+
+    assert sum(results) == 5
+    assert redeemed_count() == 5
+
+
+def test_per_user_limit():
+    add_coupon(per_user_limit=1)
+    coupon_engine.redeem_coupon("TEST10", "a@example.com")
+    with pytest.raises(HTTPException) as error:
+        coupon_engine.redeem_coupon("TEST10", "a@example.com")
+
+    assert error.value.detail == "You have already used this coupon"
+    coupon_engine.redeem_coupon("TEST10", "b@example.com")
+
+
+def test_release_gives_the_use_back():
+    add_coupon(max_uses=1, per_user_limit=1)
+    coupon_engine.redeem_coupon("TEST10", "a@example.com")
+    coupon_engine.release_coupon("TEST10", "a@example.com")
+    coupon_engine.release_coupon("TEST10", "a@example.com")
+
+    coupon_engine.redeem_coupon("TEST10", "a@example.com")
+    assert redeemed_count() == 1
+
+
+def test_counters_are_seeded_from_mongo_after_redis_loss(redis_client):
+    add_coupon(max_uses=3, per_user_limit=1, redeemed_count=2)
+    orders_col.insert_one({"order_id": "A", "user_email": "a@example.com", "coupon_code": "TEST10", "status": "PLACED"})
+    redis_client.flushall()
+
+    assert not _try_redeem("a@example.com")
+    assert _try_redeem("b@example.com")
+    assert not _try_redeem("c@example.com")
+    assert int(redis_client.get(coupon_engine.uses_key("TEST10"))) == 3
+
+
+class _FailingCollection:
+    """Collection stand-in whose writes fail, reads pass through"""
+
+    def __init__(self, collection, method: str):
+        self.collection = collection
+        self.method = method
+
+    def __getattr__(self, attr):
+        if attr == self.method:
+            def fail(*args, **kwargs):
+                raise RuntimeError("MongoDB unavailable")
+            return fail
+        return getattr(self.collection, attr)
+
+
+def test_failed_durable_count_rolls_back_redis(monkeypatch, redis_client):
+    add_coupon(max_uses=1, per_user_limit=1)
+    monkeypatch.setattr(coupon_engine, "coupons_col", _FailingCollection(coupons_col, "update_one"))
+
+    with pytest.raises(RuntimeError):
+        coupon_engine.redeem_coupon("TEST10", "a@example.com")
+
+    assert int(redis_client.get(coupon_engine.uses_key("TEST10"))) == 0
+    assert int(redis_client.get(coupon_engine.user_uses_key("TEST10", "a@example.com"))) == 0
+
+
+def test_failed_order_insert_gives_coupon_and_stock_back(monkeypatch, client, user, redis_client):
+    add_coupon(max_uses=1, per_user_limit=1)
+    inventory.set_stock(inventory.today(), {"dal": 2})
+    monkeypatch.setattr(payment_routes, "orders_col", _FailingCollection(orders_col, "insert_one"))
+
+    response = checkout(client, user, cart(("dal", 2)), coupon_code="TEST10")
+
+    assert response.status_code == 500
+    assert redeemed_count() == 0
+    assert int(redis_client.get(coupon_engine.uses_key("TEST10"))) == 0
+    assert inventory.remaining() == {"dal": 2}
+
+    monkeypatch.setattr(payment_routes, "orders_col", orders_col)
+    response = checkout(client, user, cart(("dal", 2)), coupon_code="TEST10")
+    assert response.status_code == 200
+    assert response.json()["final_amount"] == 190
+    assert redeemed_count() == 1
+
+
+# =========================
+# MONGODB FALLBACK
+# =========================
+
+def redis_down(monkeypatch):
+    monkeypatch.setattr(coupon_engine, "get_script", lambda source: None)
+
+
+def test_fallback_per_user_limit_holds_under_concurrency(monkeypatch):
+    add_coupon(per_user_limit=2)
+    redis_down(monkeypatch)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(_try_redeem, ["a@example.com"] * 20))
+
+    assert sum(results) == 2
+    assert redeemed_count() == 2
+
+
+def test_fallback_counts_uses_claimed_through_redis(monkeypatch):
+    add_coupon(per_user_limit=1)
+    assert coupon_engine.redeem_coupon("TEST10", "a@example.com") == "redis"
+
+    redis_down(monkeypatch)
+    assert not _try_redeem("a@example.com")  # its order isn't written yet
+    assert coupon_engine.redeem_coupon("TEST10", "b@example.com") == "mongo"
+
+
+def test_release_only_touches_the_claiming_path(monkeypatch, redis_client):
+    add_coupon(max_uses=5, per_user_limit=1)
+    coupon_engine.redeem_coupon("TEST10", "a@example.com")
+    redis_down(monkeypatch)
+    via = coupon_engine.redeem_coupon("TEST10", "b@example.com")
+    monkeypatch.undo()
+
+    # Cancelled after Redis came back: its counters never held this use
+    coupon_engine.release_coupon("TEST10", "b@example.com", via)
+    assert int(redis_client.get(coupon_engine.uses_key("TEST10"))) == 1
+    assert redeemed_count() == 1
+    assert _try_redeem("b@example.com")
+
+
+def test_cancelled_order_releases_its_claiming_path(client, user, redis_client):
+    add_coupon(per_user_limit=1)
+    order_id = checkout(client, user, cart(("dal", 1)), coupon_code="TEST10").json()["order_id"]
+    assert orders_col.find_one({"order_id": order_id})["coupon_claimed_via"] == "redis"
+
+    client.post(f"/orders/{order_id}/cancel", headers=user["headers"], json={"reason": "test"})
+    assert int(redis_client.get(coupon_engine.user_uses_key("TEST10", user["email"]))) == 0
+    assert checkout(client, user, cart(("dal", 1)), coupon_code="TEST10").status_code == 200
+
+
+# =========================
+# BEST OFFER
+# =========================
+
+def best(client, amount: float, headers: dict = None) -> dict:
+    return client.post("/coupons/best", json={"order_amount": amount}, headers=headers or {}).json()
+
+
+def test_offers_are_priced_like_checkout(client):
+    coupons_col.delete_many({})
+    add_coupon("PCT", discount_type="percentage", discount_value=30, max_discount=40)
+    add_coupon("FLAT", discount_value=150)
+    add_coupon("LATER", discount_value=5, min_order=500)
+
+    data = best(client, 120)
+    for offer in data["offers"]:
+        rule = coupon_engine.get_rule_table().get(offer["name"])
+        assert offer["discount_amount"] == round(coupon_engine.compute_discount(rule, 120), 2)
+    assert [(o["name"], o["discount_amount"]) for o in data["offers"]] == [("FLAT", 120), ("PCT", 36)]
+    assert [(o["name"], o["add_amount"]) for o in data["locked"]] == [("LATER", 380)]
+
+
+def test_used_up_coupons_are_not_offered(client, user, make_user):
+    coupons_col.delete_many({})
+    add_coupon("ONCE", per_user_limit=1)
+    add_coupon("GONE", max_uses=1)
+    coupon_engine.redeem_coupon("ONCE", user["email"])
+    coupon_engine.redeem_coupon("GONE", "ravi@example.com")
+
+    assert [o["name"] for o in best(client, 100, user["headers"])["offers"]] == []
+    other = make_user("meera@example.com")
+    assert [o["name"] for o in best(client, 100, other["headers"])["offers"]] == ["ONCE"]
+    assert [o["name"] for o in best(client, 100)["offers"]] == ["ONCE"]
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from app.database import orders_col
+from app.services.delivery_batching import DeliveryPlanner, build_batches, order_entry
+from conftest import ADMIN_HEADERS
+
+CREATED = datetime(2026, 1, 5, 6, 0)
+
+
+def order(order_id: str, pincode: str = "411001", address: str = "1 MG Road", items: int = 1,
+          zone: str = "pune-central", created: datetime = CREATED, status: str = "PLACED") -> dict:
+    return {
+        "order_id": order_id,
+        "user_email": f"{order_id}@example.com",
+        "status": status,
+        "delivery_zone": zone,
+        "delivery_address": {"addressLine": address, "city": "Pune", "pincode": pincode},
+        "items": [{"quantity": items}],
+        "created_at": created,
+        "updated_at": created,
+    }
+
+
+def test_batches_respect_capacity_and_keep_addresses_together():
+    docs = [order(f"A{i}", pincode=str(411001 + i % 5), address=f"{i % 5} Lane") for i in range(23)]
+    batches = build_batches([order_entry(doc) for doc in docs], max_orders=6, max_items=10)
+
+    # Five addresses with 4-5 orders each: a stop never shares a 6-order batch
+    assert len(batches) == 5
+    assert all(sum(len(stop) for stop in batch) <= 6 for batch in batches)
+    assert sorted(entry["order_id"] for batch in batches for stop in batch for entry in stop) == \
+        sorted(doc["order_id"] for doc in docs)
+    stops = [(stop[0]["pincode"], stop[0]["address_key"]) for batch in batches for stop in batch]
+    assert stops == sorted(stops)
+
+
+def test_oversized_stop_is_split():
+    docs = [order(f"A{i}", address="Office Tower") for i in range(8)]
+    batches = build_batches([order_entry(doc) for doc in docs], max_orders=6, max_items=100)
+
+    assert sorted(sum(len(stop) for stop in batch) for batch in batches) == [2, 6]
+
+
+def test_batches_are_balanced():
+    docs = [order(f"A{i}", address=f"{i} Lane") for i in range(7)]
+    batches = build_batches([order_entry(doc) for doc in docs], max_orders=6, max_items=100)
+
+    assert sorted(len(batch) for batch in batches) == [3, 4]  # not 6 + 1
+
+
+def test_planner_only_replans_changed_groups():
+    planner = DeliveryPlanner(max_orders=4, max_items=20)
+    for i in range(6):
+        planner.upsert(order(f"A{i}", zone="north"))
+    planner.upsert(order("B0", zone="south"))
+    assert planner.plan() == 2
+
+    cancelled = order("A0", zone="north", status="CANCELLED")
+    cancelled["updated_at"] = CREATED + timedelta(minutes=1)
+    planner.upsert(cancelled)
+    assert planner.plan() == 1
+    assert sum(batch["orders"] for batch in planner.current_batches(zone="north")) == 5
+
+
+def test_deliveries_endpoint_follows_order_changes(client):
+    now = datetime.utcnow()
+    orders_col.insert_many([order(f"A{i}", created=now, items=2) for i in range(5)])
+
+    assert client.get("/admin/deliveries").status_code == 403
+    plan = client.get("/admin/deliveries", headers=ADMIN_HEADERS).json()
+    assert plan["open_orders"] == 5
+    assert sum(batch["orders"] for batch in plan["batches"]) == 5
+    assert plan["batches"][0]["stops"][0]["order_ids"] == [f"A{i}" for i in range(5)]
+
+    orders_col.update_one({"order_id": "A0"}, {"$set": {"status": "DELIVERED", "updated_at": datetime.utcnow()}})
+    plan = client.get("/admin/deliveries", headers=ADMIN_HEADERS).json()
+    assert plan["open_orders"] == 4
+    assert plan["orders_read"] >= 1
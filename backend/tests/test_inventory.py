@@ -0,0 +1,178 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.database import orders_col
+from app.services import inventory
+from conftest import ADMIN_HEADERS, cart, checkout
+
+DAY = "2026-01-05"
+
+
+def _try_reserve(items):
+    try:
+        return inventory.reserve(items, DAY)
+    except HTTPException as e:
+        assert e.status_code == 409
+        return None
+
+
+def redis_down(monkeypatch):
+    monkeypatch.setattr(inventory, "get_redis", lambda: None)
+    monkeypatch.setattr(inventory, "get_script", lambda source: None)
+
+
+def test_concurrent_buyers_never_oversell():
+    inventory.set_stock(DAY, {"dal": 5})
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(_try_reserve, [cart(("dal", 1))] * 60))
+
+    assert sum(result is not None for result in results) == 5
+    assert inventory.remaining(DAY) == {"dal": 0}
+
+
+def test_reservation_is_all_or_nothing():
+    inventory.set_stock(DAY, {"dal": 5, "roti": 1})
+    with pytest.raises(HTTPException) as error:
+        inventory.reserve(cart(("dal", 2), ("roti", 2)), DAY)
+
+    assert error.value.status_code == 409
+    assert "Only 1 portion of Roti" in error.value.detail
+    assert inventory.remaining(DAY) == {"dal": 5, "roti": 1}
+
+
+def test_only_tracked_items_are_reserved():
+    inventory.set_stock(DAY, {"dal": 5})
+    assert inventory.reserve(cart(("dal", 2), ("rice", 9), ("dal", 1)), DAY) == (DAY, {"dal": 3}, "redis")
+
+
+def test_double_release_never_goes_below_zero(redis_client):
+    inventory.set_stock(DAY, {"dal": 5})
+    _, taken, via = inventory.reserve(cart(("dal", 2)), DAY)
+    inventory.release(DAY, taken, via)
+    inventory.release(DAY, taken, via)
+
+    assert inventory.remaining(DAY) == {"dal": 5}
+    assert int(redis_client.hget(inventory.reserved_key(DAY), "dal")) == 0
+
+
+def test_lost_day_is_rebuilt_from_orders(redis_client):
+    inventory.set_stock(DAY, {"dal": 5})
+    orders_col.insert_many([
+        {"order_id": "A", "inventory_day": DAY, "reserved_stock": {"dal": 3}, "status": "PLACED"},
+        {"order_id": "B", "inventory_day": DAY, "reserved_stock": {"dal": 2}, "status": "CANCELLED"},
+    ])
+    redis_client.flushall()
+
+    assert inventory.remaining(DAY) == {"dal": 2}
+    with pytest.raises(HTTPException):
+        inventory.reserve(cart(("dal", 3)), DAY)
+
+
+def test_load_does_not_overwrite_a_loaded_day(redis_client):
+    inventory.set_stock(DAY, {"dal": 5})
+    inventory.reserve(cart(("dal", 4)), DAY)
+    # A second worker loading the same day must not reset the reservations
+    inventory.get_script(inventory.LOAD_LUA)(
+        keys=[inventory.stock_key(DAY), inventory.reserved_key(DAY)], args=[60, "dal", 5, 0]
+    )
+
+    assert inventory.remaining(DAY) == {"dal": 1}
+
+
+def test_mongo_fallback_without_redis(monkeypatch):
+    inventory.set_stock(DAY, {"dal": 3})
+    redis_down(monkeypatch)
+
+    _, taken, via = inventory.reserve(cart(("dal", 3)), DAY)
+    assert via == "mongo"
+    with pytest.raises(HTTPException):
+        inventory.reserve(cart(("dal", 1)), DAY)
+    inventory.release(DAY, taken, via)
+    inventory.release(DAY, taken, via)
+
+    assert inventory.remaining(DAY) == {"dal": 3}
+
+
+def test_mongo_fallback_counts_what_redis_sold(monkeypatch):
+    inventory.set_stock(DAY, {"dal": 3})
+    _, taken, via = inventory.reserve(cart(("dal", 2)), DAY)
+    orders_col.insert_one({"order_id": "A", "inventory_day": DAY, "reserved_stock": taken,
+                           "reserved_via": via, "status": "PLACED"})
+
+    redis_down(monkeypatch)
+    with pytest.raises(HTTPException) as error:
+        inventory.reserve(cart(("dal", 2)), DAY)
+    assert "Only 1 portion" in error.value.detail
+    assert inventory.reserve(cart(("dal", 1)), DAY)[1:] == ({"dal": 1}, "mongo")
+
+
+def test_release_goes_back_to_the_reserving_store(monkeypatch, redis_client):
+    inventory.set_stock(DAY, {"dal": 5})
+    inventory.reserve(cart(("dal", 2)), DAY)
+    monkeypatch.setattr(inventory, "get_script", lambda source: None)
+    _, taken, via = inventory.reserve(cart(("dal", 1)), DAY)
+    monkeypatch.undo()
+
+    # Cancelled after Redis came back: Redis keeps its own reservation
+    inventory.release(DAY, taken, via)
+    assert int(redis_client.hget(inventory.reserved_key(DAY), "dal")) == 2
+    assert inventory.stock_report(DAY)[0]["sold"] == 0
+
+
+def test_reconcile_keeps_concurrent_fallback_reservations(monkeypatch):
+    inventory.set_stock(DAY, {"dal": 5})
+    orders_col.insert_one({"order_id": "A", "inventory_day": DAY, "reserved_stock": {"dal": 2}, "status": "PLACED"})
+    original = inventory.sold_from_orders
+
+    def sold_during_fallback(day):
+        # A fallback checkout takes a portion between reconcile's reads and its write
+        inventory.inventory_col.update_one({"day": day, "item_id": "dal"}, {"$inc": {"sold": 1}})
+        return original(day)
+    monkeypatch.setattr(inventory, "sold_from_orders", sold_during_fallback)
+    inventory.reconcile(DAY)
+
+    assert inventory.stock_report(DAY)[0]["sold"] == 3
+
+
+def test_reconcile_releases_a_leaked_reservation_on_the_second_run():
+    inventory.set_stock(DAY, {"dal": 5})
+    inventory.reserve(cart(("dal", 2)), DAY)  # checkout died before the order was written
+
+    assert inventory.reconcile(DAY)[0]["released"] == 0
+    assert inventory.reconcile(DAY)[0]["released"] == 2
+    assert inventory.remaining(DAY) == {"dal": 5}
+
+
+# =========================
+# ENDPOINTS
+# =========================
+
+def test_inventory_admin_requires_key(client):
+    assert client.get("/admin/inventory").status_code == 403
+    assert client.put("/admin/inventory", json={"stock": {"dal": 1}}).status_code == 403
+
+
+def test_inventory_admin_sets_and_reports_stock(client):
+    response = client.put("/admin/inventory", headers=ADMIN_HEADERS, json={"day": DAY, "stock": {"dal": 4}})
+    assert response.status_code == 200
+
+    items = client.get(f"/admin/inventory?day={DAY}", headers=ADMIN_HEADERS).json()["items"]
+    assert [(item["item_id"], item["stock"], item["remaining"]) for item in items] == [("dal", 4, 4)]
+
+    response = client.put("/admin/inventory", headers=ADMIN_HEADERS, json={"stock": {"dal": -1}})
+    assert response.status_code == 400
+
+
+def test_checkout_sells_out_and_cancel_gives_stock_back(client, user):
+    inventory.set_stock(inventory.today(), {"dal": 2})
+
+    first = checkout(client, user, cart(("dal", 2)))
+    assert first.status_code == 200
+    assert checkout(client, user, cart(("dal", 1))).status_code == 409
+
+    order_id = first.json()["order_id"]
+    response = client.post(f"/orders/{order_id}/cancel", headers=user["headers"], json={"reason": "test"})
+    assert response.status_code == 200
+    assert inventory.remaining() == {"dal": 2}
@@ -0,0 +1,73 @@
+from bson import ObjectId
+
+from app.database import get_db, users_col
+from scripts import migrate_addresses
+from scripts.migrate_addresses import migrate
+
+
+def legacy(email: str, count: int, default: int = None) -> list:
+    rows = [{"_id": ObjectId(), "user_email": email, "id": f"old{i}", "addressLine": f"{i} Old Lane",
+             "city": "Pune", "pincode": "411001", "isDefault": i == default} for i in range(count)]
+    get_db().addresses.insert_many(rows)
+    return rows
+
+
+def book(email: str = "asha@example.com") -> tuple:
+    user = users_col.find_one({"email": email})
+    return [address["id"] for address in user["addresses"]], user.get("defaultAddressId")
+
+
+def test_legacy_rows_are_merged_in_front_of_the_new_book(monkeypatch):
+    monkeypatch.setattr(migrate_addresses, "MAX_ADDRESSES", 4)
+    legacy("asha@example.com", 3, default=0)
+    users_col.insert_one({"email": "asha@example.com", "defaultAddressId": "new1",
+                          "addresses": [{"id": "new0"}, {"id": "new1"}]})
+
+    stats = migrate(get_db(), batch_size=10, dry_run=False)
+
+    # The newest addresses (added through the API) and the default survive the cap
+    assert book() == (["old1", "old2", "new0", "new1"], "new1")
+    assert stats["dropped"] == 1
+
+
+def test_default_is_never_dropped(monkeypatch):
+    monkeypatch.setattr(migrate_addresses, "MAX_ADDRESSES", 3)
+    legacy("asha@example.com", 3, default=0)
+    users_col.insert_one({"email": "asha@example.com", "defaultAddressId": None,
+                          "addresses": [{"id": "new0"}, {"id": "new1"}]})
+
+    stats = migrate(get_db(), batch_size=10, dry_run=False)
+
+    assert book() == (["old0", "new0", "new1"], "old0")
+    assert stats["dropped"] == 2
+
+
+class _RacingDatabase:
+    """Ravi adds an address between the migration's read of the users and its write"""
+
+    def __init__(self, db):
+        self.db = db
+        self.users = self
+
+    def __getattr__(self, name):
+        # db.addresses and db.users.bulk_write pass through
+        return getattr(self.db.users, name) if name == "bulk_write" else getattr(self.db, name)
+
+    def find(self, *args, **kwargs):
+        found = list(self.db.users.find(*args, **kwargs))
+        self.db.users.update_one({"email": "ravi@example.com"}, {"$push": {"addresses": {"id": "new0"}}})
+        return found
+
+
+def test_rerun_and_concurrent_changes_lose_nothing():
+    legacy("asha@example.com", 2)
+    legacy("ravi@example.com", 1)
+    users_col.insert_many([{"email": "asha@example.com", "addresses": []},
+                           {"email": "ravi@example.com", "addresses": []}])
+
+    assert migrate(_RacingDatabase(get_db()), batch_size=10, dry_run=False)["changed"] == 1
+    assert book() == (["old0", "old1"], None)
+
+    stats = migrate(get_db(), batch_size=10, dry_run=False)
+    assert (stats["users"], stats["no_account"]) == (1, 1)
+    assert book("ravi@example.com") == (["old0", "new0"], None)
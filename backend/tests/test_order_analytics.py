@@ -0,0 +1,94 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.database import orders_archive_col, orders_col
+from app.services import order_analytics
+from app.services.order_analytics import LOCAL_OFFSET_SECONDS, export_orders, read_manifest, run_report
+from conftest import ADMIN_HEADERS
+
+PLACED = datetime(2026, 1, 5, 6, 30)  # UTC
+
+
+@pytest.fixture(autouse=True)
+def analytics_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(order_analytics, "ANALYTICS_DIR", str(tmp_path))
+    monkeypatch.setattr(order_analytics, "ANALYTICS_EXPORT_LAG_SECONDS", 0)
+    monkeypatch.setattr(order_analytics, "_snapshot", None)
+    return tmp_path
+
+
+def order(email: str = "asha@example.com", quantity: int = 2, coupon: str = None,
+          status: str = "DELIVERED", when: datetime = PLACED) -> dict:
+    gross = 100.0 * quantity + 30.0
+    discount = 20.0 if coupon else 0.0
+    return {
+        "_id": ObjectId(), "user_email": email, "status": status, "coupon_code": coupon,
+        "items": [{"id": "dal", "name": "Dal", "price": 100.0, "quantity": quantity},
+                  {"id": "roti", "name": "Roti", "price": 30.0, "quantity": 1}],
+        "total_amount": gross, "discount_amount": discount, "delivery_fee": 0.0,
+        "final_amount": gross - discount, "delivery_address": {"pincode": "411001"},
+        "created_at": when, "updated_at": when,
+    }
+
+
+def test_export_writes_a_snapshot_the_reports_read():
+    orders_col.insert_many([order(), order(email="ravi@example.com", quantity=1, coupon="SAVE20")])
+    orders_archive_col.insert_one(order(when=PLACED - timedelta(days=1)))
+
+    manifest = export_orders()
+    assert manifest["rows"] == 3
+    assert read_manifest()["version"] == 1
+
+    daily = run_report("daily")["rows"]
+    assert [(row["orders"], row["revenue"], row["customers"]) for row in daily] == [(1, 230.0, 1), (2, 340.0, 2)]
+
+    hour = (PLACED.hour * 3600 + PLACED.minute * 60 + LOCAL_OFFSET_SECONDS) // 3600 % 24
+    hourly = run_report("hourly", start=date(2026, 1, 5), end=date(2026, 1, 5))["rows"]
+    assert hourly[hour] == {"hour": hour, "orders": 2, "revenue": 340.0}
+
+    items = run_report("items")["rows"]
+    assert [(row["id"], row["quantity"]) for row in items] == [("dal", 5), ("roti", 3)]
+
+    coupons = run_report("coupons")
+    assert coupons["without_coupon"]["orders"] == 2
+    assert [(row["coupon"], row["orders"], row["discount"]) for row in coupons["rows"]] == [("SAVE20", 1, 20.0)]
+
+    assert run_report("basket")["orders"] == 3
+
+
+def test_reexported_order_supersedes_its_old_row():
+    doc = order()
+    orders_col.insert_many([doc, order(email="ravi@example.com")])
+    export_orders()
+    assert run_report("basket")["orders"] == 2
+
+    orders_col.update_one({"_id": doc["_id"]}, {"$set": {
+        "status": "CANCELLED", "updated_at": datetime.utcnow() - timedelta(seconds=1)}})
+    manifest = export_orders()
+
+    assert manifest["version"] == 2
+    assert manifest["rows"] == 3  # appended, not rewritten
+    assert run_report("basket")["orders"] == 1
+    assert run_report("basket", include_cancelled=True)["orders"] == 2
+
+    assert export_orders(rebuild=True)["rows"] == 2
+
+
+def test_report_endpoints(client):
+    assert client.get("/admin/reports").status_code == 403
+    assert client.get("/admin/reports", headers=ADMIN_HEADERS).json()["snapshot"] is None
+    assert client.get("/admin/reports/daily", headers=ADMIN_HEADERS).status_code == 503
+    assert client.get("/admin/reports/nope", headers=ADMIN_HEADERS).status_code == 404
+    assert client.get("/admin/reports/daily?start=2026-01-06&end=2026-01-05",
+                      headers=ADMIN_HEADERS).status_code == 400
+
+    orders_col.insert_one(order())
+    export_orders()
+
+    listing = client.get("/admin/reports", headers=ADMIN_HEADERS).json()
+    assert "coupons" in listing["reports"]
+    assert listing["snapshot"]["orders"] == 1
+    report = client.get("/admin/reports/pincode", headers=ADMIN_HEADERS).json()
+    assert report["rows"] == [{"pincode": "411001", "orders": 1, "revenue": 230.0, "average_order": 230.0}]
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from app.database import orders_archive_col, orders_col
+from app.services.order_archive import archive_orders, count_orders, find_order, list_user_orders, pending_count
+
+OLD = datetime.utcnow() - timedelta(days=400)
+
+
+def order(order_id: str, status: str = "DELIVERED", when: datetime = OLD, email: str = "asha@example.com") -> dict:
+    return {"order_id": order_id, "user_email": email, "status": status, "coupon_code": "SAVE20",
+            "items": [], "created_at": when, "updated_at": when}
+
+
+def seed():
+    orders_col.insert_many([
+        order("OLD-1"),
+        order("OLD-2", status="CANCELLED"),
+        order("OLD-OPEN", status="PLACED"),           # never archived while it can change
+        order("NEW-1", when=datetime.utcnow()),
+        order("OTHER", email="ravi@example.com"),
+    ])
+
+
+def test_archives_only_old_finished_orders_in_batches():
+    seed()
+    batches = []
+    assert pending_count(older_than_days=30) == 3
+
+    moved = archive_orders(older_than_days=30, batch_size=2, on_batch=lambda n, total: batches.append(total))
+
+    assert moved == 3
+    assert batches == [2, 3]
+    assert sorted(o["order_id"] for o in orders_col.find()) == ["NEW-1", "OLD-OPEN"]
+    assert orders_archive_col.count_documents({}) == 3
+    assert pending_count(older_than_days=30) == 0
+
+
+def test_history_reads_see_both_tiers():
+    seed()
+    archive_orders(older_than_days=30)
+
+    assert [o["order_id"] for o in list_user_orders("asha@example.com")] == ["OLD-1", "OLD-2", "OLD-OPEN", "NEW-1"]
+    assert find_order({"order_id": "OLD-1"})["status"] == "DELIVERED"
+    assert count_orders({"user_email": "asha@example.com", "coupon_code": "SAVE20"}) == 4
+
+
+def test_interrupted_run_is_not_counted_twice():
+    seed()
+    # Copied to the archive but not yet deleted from the hot tier
+    orders_archive_col.insert_one(orders_col.find_one({"order_id": "OLD-1"}))
+
+    assert len(list_user_orders("asha@example.com")) == 4
+    assert count_orders({"user_email": "asha@example.com"}) == 4
+
+    assert archive_orders(older_than_days=30) == 3
+    assert orders_archive_col.count_documents({}) == 3
+
+
+def test_order_list_endpoint_includes_archived_history(client, user):
+    orders_col.insert_one(order("OLD-1", email=user["email"]))
+    archive_orders(older_than_days=30)
+
+    data = client.get("/orders/", headers=user["headers"]).json()
+    assert [o["order_id"] for o in data["orders"]] == ["OLD-1"]
+    assert client.get("/orders/OLD-1", headers=user["headers"]).status_code == 200
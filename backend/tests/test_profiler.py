@@ -0,0 +1,41 @@
+import asyncio
+
+from app.utils.profiler import ProfilerMiddleware, load_profile, sign_profile_token, verify_profile_token
+from conftest import http_scope, slow_task_app, start_request
+
+
+def test_signed_header_is_verified():
+    token = sign_profile_token(60)
+    expires_at, signature = token.split(".")
+
+    assert verify_profile_token(token)
+    assert not verify_profile_token(f"{expires_at}.{'0' * len(signature)}")
+    assert not verify_profile_token(sign_profile_token(-1))
+
+
+def test_unsigned_request_is_not_profiled():
+    async def scenario():
+        release = asyncio.Event()
+        release.set()
+        task, messages = await start_request(ProfilerMiddleware(slow_task_app(release)), http_scope())
+        await task
+        assert b"x-profile-id" not in dict(messages[0]["headers"])
+
+    asyncio.run(scenario())
+
+
+def test_profile_is_saved_before_background_tasks():
+    async def scenario():
+        release = asyncio.Event()
+        middleware = ProfilerMiddleware(slow_task_app(release))
+        scope = http_scope(headers=[(b"x-profile", sign_profile_token(60).encode())])
+
+        task, messages = await start_request(middleware, scope)
+        profile_id = dict(messages[0]["headers"])[b"x-profile-id"].decode()
+        assert not task.done()  # background task still running
+        assert load_profile(profile_id)["status"] == 200
+
+        release.set()
+        await task
+
+    asyncio.run(scenario())
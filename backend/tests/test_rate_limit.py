@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.utils.rate_limit import RateLimitMiddleware, parse_rules
+from conftest import http_scope, slow_task_app, start_request
+
+
+def test_concurrency_slot_is_freed_before_background_tasks():
+    async def scenario():
+        release = asyncio.Event()
+        middleware = RateLimitMiddleware(slow_task_app(release), rules=[], max_concurrent=1)
+
+        first, _ = await start_request(middleware, http_scope())
+        assert not first.done()  # background task still running
+        assert middleware.in_flight == 0
+
+        second, messages = await start_request(middleware, http_scope())
+        assert messages[0]["status"] == 200
+
+        release.set()
+        await asyncio.gather(first, second)
+        assert middleware.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_token_bucket_limits_per_identity():
+    async def scenario():
+        release = asyncio.Event()
+        release.set()
+        middleware = RateLimitMiddleware(slow_task_app(release), rules=parse_rules("GET /work 2/60s ip"))
+
+        statuses = []
+        for client in ("10.0.0.1", "10.0.0.1", "10.0.0.1", "10.0.0.2"):
+            scope = {**http_scope(), "client": (client, 5000)}
+            task, messages = await start_request(middleware, scope)
+            await task
+            statuses.append(messages[0]["status"])
+
+        assert statuses == [200, 200, 429, 200]
+
+    asyncio.run(scenario())
+
+
+def test_probes_are_exempt_from_shedding():
+    async def scenario():
+        release = asyncio.Event()
+        middleware = RateLimitMiddleware(slow_task_app(release), rules=[], max_concurrent=1)
+        middleware.in_flight = 1  # worker saturated
+
+        task, messages = await start_request(middleware, http_scope())
+        assert messages[0]["status"] == 503
+        await task
+
+        probe, messages = await start_request(middleware, http_scope("/health/live"))
+        assert messages[0]["status"] == 404  # reached the app, not shed
+        await probe
+
+    asyncio.run(scenario())
+
+
+def test_invalid_rule_is_rejected():
+    with pytest.raises(ValueError):
+        parse_rules("GET /work lots")
@@ -0,0 +1,86 @@
+import pytest
+from pymongo.read_preferences import SecondaryPreferred
+
+from app import database
+from app.utils import read_routing
+from app.utils.read_routing import current_read_preference, note_user, read_pin_key, use_preference
+from app.utils.request_redis import RequestRedis, current_batch
+
+PREFERENCE = SecondaryPreferred(max_staleness=90)
+
+
+@pytest.fixture
+def batch():
+    batch = RequestRedis()
+    token = current_batch.set(batch)
+    yield batch
+    current_batch.reset(token)
+
+
+@pytest.fixture
+def seen_preferences(monkeypatch):
+    """Read preference of every orders_col handle, in order"""
+    seen = []
+    original = database._collection
+
+    def recording(name):
+        collection = original(name)
+        if name == "orders":
+            seen.append(collection.read_preference.mongos_mode)
+        return collection
+    monkeypatch.setattr(database, "_collection", recording)
+    return seen
+
+
+def test_primary_outside_routes_and_requests(batch):
+    assert current_read_preference() is None
+    current_batch.set(None)
+    with use_preference(PREFERENCE):
+        assert current_read_preference() is None  # background work: no request
+
+
+def test_secondary_inside_routes_unless_pinned(batch):
+    with use_preference(PREFERENCE):
+        assert current_read_preference() is PREFERENCE
+        batch.read_pinned = True
+        assert current_read_preference() is None
+
+
+def test_disabled_by_config(monkeypatch, batch):
+    monkeypatch.setattr(read_routing, "READ_FROM_SECONDARIES", False)
+    with use_preference(PREFERENCE):
+        assert current_read_preference() is None
+
+
+def test_write_pins_the_user_and_later_reads_see_the_pin(batch):
+    note_user("POST", "asha@example.com")
+    assert batch.read_pinned
+    assert batch.lookup(read_pin_key("asha@example.com")) == (True, b"1")
+
+    reader = RequestRedis()
+    reader.values[read_pin_key("asha@example.com")] = b"1"
+    token = current_batch.set(reader)
+    note_user("GET", "asha@example.com")
+    current_batch.reset(token)
+    assert reader.read_pinned
+
+
+def test_user_who_wrote_reads_from_the_primary(client, user, make_user, redis_client, seen_preferences):
+    assert client.get("/orders/", headers=user["headers"]).status_code == 200
+    assert seen_preferences[-1] == "secondaryPreferred"
+
+    response = client.post("/addresses/", headers=user["headers"],
+                           json={"addressLine": "1 MG Road", "city": "Pune", "pincode": "411001"})
+    assert response.status_code == 200
+    assert 0 < redis_client.ttl(read_pin_key(user["email"])) <= read_routing.READ_PIN_SECONDS
+
+    redis_client.delete(f"orders:list:{user['email']}")
+    seen_preferences.clear()
+    client.get("/orders/", headers=user["headers"])
+    assert seen_preferences and set(seen_preferences) == {"primary"}
+
+    # Other users are unaffected
+    other = make_user("ravi@example.com")
+    seen_preferences.clear()
+    client.get("/orders/", headers=other["headers"])
+    assert seen_preferences[-1] == "secondaryPreferred"
@@ -0,0 +1,91 @@
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.utils.redis_client import get_redis
+from app.utils.request_redis import RedisBatchMiddleware, RequestRedis, current_batch
+
+
+class CountingPipelines:
+    """Wraps the Redis client and counts pipelines that were executed"""
+
+    def __init__(self, client):
+        self.client = client
+        self.executed = 0
+
+    def pipeline(self, *args, **kwargs):
+        pipe = self.client.pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        def counted(*a, **k):
+            self.executed += 1
+            return execute(*a, **k)
+        pipe.execute = counted
+        return pipe
+
+    def __getattr__(self, attr):
+        return getattr(self.client, attr)
+
+
+def test_flush_sends_every_deferred_write_in_one_pipeline(monkeypatch, redis_client):
+    from app.utils import request_redis
+    counting = CountingPipelines(redis_client)
+    monkeypatch.setattr(request_redis, "get_redis", lambda: counting)
+    redis_client.set("stale", "1")
+
+    batch = RequestRedis()
+    batch.defer_set("menu", 60, b"[]")
+    batch.defer_delete(["stale"])
+    batch.defer_commands([("HINCRBY", "sales", "orders", 1), ("HINCRBY", "sales", "orders", 2)])
+    batch.flush()
+    batch.flush()  # nothing left to send
+
+    assert counting.executed == 1
+    assert redis_client.get("menu") == "[]"
+    assert 0 < redis_client.ttl("menu") <= 60
+    assert redis_client.exists("stale") == 0
+    assert redis_client.hget("sales", "orders") == "3"
+    assert not batch.dirty
+
+
+def test_pending_writes_shadow_prefetched_values(redis_client):
+    redis_client.mset({"a": "1", "b": "2"})
+    batch = RequestRedis()
+
+    assert batch.prefetch(["a", "b", "missing"]) == [b"1", b"2", None]
+    batch.defer_delete(["a"])
+    batch.defer_set("b", 60, b"new")
+
+    assert batch.lookup("a") == (True, None)
+    assert batch.lookup("b") == (True, b"new")
+    assert batch.lookup("unknown") == (False, None)
+
+
+def test_middleware_flushes_before_the_response_starts(redis_client):
+    def endpoint(request):
+        current_batch.get().defer_set("written", 60, b"yes")
+        return JSONResponse({"ok": True})
+
+    seen_at_start = []
+    app = RedisBatchMiddleware(Starlette(routes=[Route("/", endpoint)]))
+
+    async def observing(scope, receive, send):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                seen_at_start.append(get_redis().get("written"))
+            await send(message)
+        await app(scope, receive, send_wrapper)
+
+    assert TestClient(observing).get("/").status_code == 200
+    assert seen_at_start == ["yes"]
+
+
+def test_middleware_flushes_writes_of_a_failed_handler(redis_client):
+    def endpoint(request):
+        current_batch.get().defer_commands([("SET", "attempted", "1")])
+        raise RuntimeError("handler failed")
+
+    app = RedisBatchMiddleware(Starlette(routes=[Route("/", endpoint)]))
+    assert TestClient(app, raise_server_exceptions=False).get("/").status_code == 500
+    assert redis_client.get("attempted") == "1"
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+from app.routes import review_routes
+from app.services.review_ingest import ReviewIngestWorker, write_batch
+from app.services.reviews import save_review
+
+
+def review(review_id: str, rating: int = 5, item_id: str = "MENU-abc123") -> dict:
+    return {
+        "review_id": review_id, "item_id": item_id, "order_id": None,
+        "user_email": "asha@example.com", "rating": rating, "comment": "Lovely dal",
+        "created_at": datetime(2026, 1, 5, 12, 0),
+    }
+
+
+def test_submitted_review_updates_the_item_summary(client, user):
+    for rating in (5, 4, 4):
+        response = client.post("/reviews/", headers=user["headers"],
+                               json={"rating": rating, "comment": "Very good", "item_id": "MENU-abc123"})
+        assert response.status_code == 200
+
+    summary = client.get("/reviews/item/MENU-abc123/summary").json()
+    assert summary["count"] == 3
+    assert summary["average"] == 4.33
+    assert summary["histogram"] == {"1": 0, "2": 0, "3": 0, "4": 2, "5": 1}
+    assert len(summary["latest"]) == 3
+
+
+def test_item_reviews_are_keyset_paginated(client):
+    for i in range(5):
+        save_review(review(f"r{i}"))
+    save_review(review("other", item_id="MENU-zzz999"))
+
+    seen, cursor = [], None
+    while True:
+        page = client.get("/reviews/item/MENU-abc123", params={"limit": 2, "cursor": cursor}).json()
+        seen += [r["review_id"] for r in page["reviews"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["r4", "r3", "r2", "r1", "r0"]
+    assert client.get("/reviews/item/MENU-abc123", params={"cursor": "nope"}).status_code == 400
+
+
+def test_first_page_cache_is_invalidated_by_a_new_review(client):
+    save_review(review("r0"))
+    assert len(client.get("/reviews/item/MENU-abc123").json()["reviews"]) == 1
+
+    save_review(review("r1"))
+    assert len(client.get("/reviews/item/MENU-abc123").json()["reviews"]) == 2
+
+
+# =========================
+# WRITE-BEHIND INGEST
+# =========================
+
+def test_ingested_reviews_hide_the_summarized_flag(client, user):
+    write_batch([review("r1"), review("r2", rating=3)])
+
+    for path, headers in (("/reviews/item/MENU-abc123", {}), ("/reviews/", user["headers"])):
+        reviews = client.get(path, headers=headers).json()["reviews"]
+        assert [r["review_id"] for r in reviews] == ["r2", "r1"]
+        assert all("summarized" not in r and "_id" not in r for r in reviews)
+
+
+def test_redelivered_batch_is_summarized_once(client):
+    write_batch([review("r1")])
+    fresh = write_batch([review("r1"), review("r2", rating=1)])
+    assert [r["review_id"] for r in fresh] == ["r2"]
+
+    summary = client.get("/reviews/item/MENU-abc123/summary").json()
+    assert summary["count"] == 2
+
+
+def test_queued_review_is_written_by_the_worker(monkeypatch, client, user, redis_client):
+    monkeypatch.setattr(review_routes, "REVIEW_WRITE_BEHIND", True)
+    response = client.post("/reviews/", headers=user["headers"],
+                           json={"rating": 4, "comment": "Queued one", "item_id": "MENU-abc123"})
+    assert response.json()["queued"] is True
+
+    worker = ReviewIngestWorker("test-worker")
+    worker.ensure_group(redis_client)
+    assert worker.process(redis_client, worker.read_new(redis_client)) == 1
+
+    assert client.get("/reviews/item/MENU-abc123/summary").json()["count"] == 1
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from app.services.sales_counters import day_key, day_summary, local_slot, record_cancellation, record_order
+from conftest import ADMIN_HEADERS, cart, checkout
+
+PLACED = datetime(2026, 1, 5, 6, 30)  # UTC
+
+
+def order(email: str = "asha@example.com", quantity: int = 2, **fields) -> dict:
+    return {
+        "user_email": email, "created_at": PLACED,
+        "items": [{"id": "dal", "name": "Dal", "quantity": quantity}, {"id": "roti", "name": "Roti", "quantity": 1}],
+        "total_amount": 250.0, "discount_amount": 25.0, "delivery_fee": 20.0, "final_amount": 245.1,
+        **fields,
+    }
+
+
+def test_order_and_cancellation_are_counted_exactly():
+    day, hour = local_slot(PLACED)
+    record_order(order())
+    record_order(order(email="ravi@example.com", quantity=1))
+    record_cancellation(order(email="ravi@example.com", quantity=1))
+
+    summary = day_summary(day)
+    assert summary["orders"] == 1
+    assert summary["items"] == 3
+    assert summary["revenue"] == 245.1  # paise: no float drift
+    assert summary["discount"] == 25.0
+    assert summary["cancelled_orders"] == 1
+    assert summary["cancelled_revenue"] == 245.1
+    assert summary["unique_customers"] == 2  # a HyperLogLog can't forget
+    assert summary["top_items"] == [{"id": "dal", "name": "Dal", "quantity": 2},
+                                    {"id": "roti", "name": "Roti", "quantity": 1}]
+    assert summary["hourly"] == [{"hour": hour, "orders": 1, "revenue": 245.1}]
+
+
+def test_counters_expire(redis_client):
+    record_order(order())
+    day, _ = local_slot(PLACED)
+    assert redis_client.ttl(day_key(day)) > 0
+    assert redis_client.ttl(day_key(day, "customers")) > 0
+
+
+def test_checkout_and_cancel_update_todays_counters(client, user):
+    placed = checkout(client, user, cart(("dal", 2), price=100))
+    assert placed.status_code == 200
+    checkout(client, user, cart(("roti", 1), price=30))
+
+    sales = client.get("/admin/sales", headers=ADMIN_HEADERS).json()
+    assert (sales["orders"], sales["revenue"]) == (2, 230.0)
+
+    order_id = placed.json()["order_id"]
+    client.post(f"/orders/{order_id}/cancel", headers=user["headers"], json={"reason": "test"})
+    client.post(f"/orders/{order_id}/cancel", headers=user["headers"], json={"reason": "again"})
+
+    sales = client.get("/admin/sales", headers=ADMIN_HEADERS).json()
+    assert (sales["orders"], sales["revenue"], sales["cancelled_orders"]) == (1, 30.0, 1)
+
+    week = client.get("/admin/sales/range?days=7", headers=ADMIN_HEADERS).json()
+    assert len(week["days"]) == 7
+    assert (week["orders"], week["revenue"], week["unique_customers"]) == (1, 30.0, 1)
+
+
+def test_sales_admin_requires_key(client):
+    assert client.get("/admin/sales").status_code == 403
@@ -0,0 +1,65 @@
+from app.database import orders_col
+from conftest import ADMIN_HEADERS, cart, checkout
+
+ZONE = {
+    "zone_id": "pune-central", "name": "Pune Central",
+    "pincodes": ["411001"], "ranges": [["411030", "411048"]],
+    "delivery_fee": 20, "free_delivery_above": 300,
+}
+
+
+def check(client, *pincodes) -> list:
+    response = client.post("/serviceability/check", json={"pincodes": list(pincodes)})
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def add_zone(client, **fields):
+    response = client.put("/serviceability/admin/zones", headers=ADMIN_HEADERS, json={**ZONE, **fields})
+    assert response.status_code == 200
+
+
+def test_every_valid_pincode_is_served_without_zones(client):
+    results = check(client, "411001", "560001", "12345")
+    assert [result["serviceable"] for result in results] == [True, True, False]
+    assert [result["valid"] for result in results] == [True, True, False]
+
+
+def test_zone_lookup_by_list_and_range(client):
+    add_zone(client)
+    results = check(client, "411001", "411030", "411048", "411049", "560001")
+
+    assert [result["serviceable"] for result in results] == [True, True, True, False, False]
+    assert results[1]["zone_id"] == "pune-central"
+    assert results[1]["delivery_fee"] == 20
+
+
+def test_zone_admin_requires_key_and_validates(client):
+    assert client.put("/serviceability/admin/zones", json=ZONE).status_code == 403
+    response = client.put("/serviceability/admin/zones", headers=ADMIN_HEADERS,
+                          json={**ZONE, "pincodes": ["41100"]})
+    assert response.status_code == 400
+
+
+def test_checkout_applies_zone_fee_and_rejects_other_pincodes(client, user):
+    add_zone(client)
+    address = {"addressLine": "1 MG Road", "city": "Pune", "pincode": "411001"}
+
+    response = checkout(client, user, cart(("dal", 1)), delivery_address=address)
+    assert response.status_code == 200
+    assert response.json()["delivery_fee"] == 20
+    order = orders_col.find_one({"order_id": response.json()["order_id"]})
+    assert order["delivery_zone"] == "pune-central"
+
+    response = checkout(client, user, cart(("dal", 3)), delivery_address=address)
+    assert response.json()["delivery_fee"] == 0  # free above 300
+
+    response = checkout(client, user, cart(("dal", 1)), delivery_address={**address, "pincode": "560001"})
+    assert response.status_code == 400
+
+
+def test_deactivated_zone_stops_serving(client):
+    add_zone(client)
+    assert client.delete("/serviceability/admin/zones/pune-central", headers=ADMIN_HEADERS).status_code == 200
+    assert client.delete("/serviceability/admin/zones/missing", headers=ADMIN_HEADERS).status_code == 404
+    assert check(client, "411001")[0]["serviceable"] is True  # no active zones left